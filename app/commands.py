@@ -0,0 +1,63 @@
+# app/commands.py
+import click
+from extensions import db
+
+
+@click.command('search-index')
+@click.option('--rebuild', is_flag=True, help='SQLite: isi ulang tabel FTS5 dari tabel asli')
+def search_index_command(rebuild):
+    """Buat index full-text search (GIN di Postgres, FTS5 di SQLite)"""
+    from utils.search_index import ensure_search_index
+
+    documents = ensure_search_index(db.engine, rebuild=rebuild)
+    if not documents:
+        click.echo(f"⚠️  Full-text index not supported on {db.engine.dialect.name}, search uses ILIKE")
+        return
+    click.echo(f"✅ Search index ready ({db.engine.dialect.name}): {', '.join(documents)}")
+
+
+@click.command('seed-perf')
+@click.option('--seed', default=42, show_default=True, help='seed random, data identik untuk seed yang sama')
+@click.option('--scale', default=1.0, show_default=True, help='pengali volume dosen/mahasiswa/permohonan (0.01 = 20k permohonan)')
+@click.option('--fakultas', default=5, show_default=True)
+@click.option('--prodi', default=50, show_default=True)
+@click.option('--dosen', default=2000, show_default=True)
+@click.option('--mahasiswa', default=60000, show_default=True)
+@click.option('--permohonan', default=2000000, show_default=True)
+@click.option('--batch-size', default=10000, show_default=True, help='row per COPY / executemany')
+@click.option('--files/--no-files', default=True, show_default=True, help='simpan contoh PDF & TTD di storage')
+@click.option('--reset', is_flag=True, help='hapus data sintetis sebelumnya (user @perf.invalid) dulu')
+@click.option('--yes', is_flag=True, help='lewati konfirmasi')
+def seed_perf_command(seed, scale, fakultas, prodi, dosen, mahasiswa, permohonan, batch_size, files, reset, yes):
+    """Isi database dengan data sintetis deterministik untuk load & scaling test"""
+    import time
+    from flask import current_app
+    from utils.perf_seed import PerfSeeder
+
+    volumes = {
+        'fakultas': fakultas,
+        'prodi': max(prodi, fakultas),
+        'dosen': max(int(dosen * scale), fakultas),
+        'mahasiswa': max(int(mahasiswa * scale), 1),
+        'permohonan': int(permohonan * scale),
+    }
+    click.echo(f"🌱 Seeding {db.engine.url.render_as_string(hide_password=True)} (seed={seed}): "
+               + ', '.join(f"{name}={count}" for name, count in volumes.items()))
+    if not yes:
+        click.confirm('Insert synthetic data into this database?', abort=True)
+
+    started = time.perf_counter()
+    seeder = PerfSeeder(current_app, seed=seed, volumes=volumes, batch_size=batch_size,
+                        with_files=files, echo=click.echo)
+    try:
+        counts = seeder.run(reset=reset)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"✅ Seeded in {time.perf_counter() - started:.1f}s: "
+               + ', '.join(f"{name}={count}" for name, count in counts.items()))
+
+
+def register_commands(app):
+    app.cli.add_command(search_index_command)
+    app.cli.add_command(seed_perf_command)
@@ -1,10 +1,13 @@
-from flask import Blueprint,request,g
+import os
+from datetime import datetime
+from flask import Blueprint,request,g,Response,stream_with_context,current_app,send_file
 from utils.jwt_utils import role_required, get_current_user,jwt_required
+from utils.query_budget import query_budget
 from utils.response_utils import success_response, error_response
 from app.services.history_service import HistoryService
 from app.services.user_service import UserService
 from schemas.permohonan_schema import PermohonanSchema
-from app.services.view_user_service import ViewRepositoryDosen, ViewRepositoryMahasiswa
+from app.services.view_user_service import ViewRepositoryDosen, ViewRepositoryMahasiswa, UserDirectoryService
 
 admin_bp = Blueprint('admin', __name__)
 service_history = HistoryService()
@@ -12,6 +15,7 @@ service_user = UserService()
 permohonan_schema = PermohonanSchema()
 view_mhs_service = ViewRepositoryMahasiswa()
 view_dosen_service = ViewRepositoryDosen()
+directory_service = UserDirectoryService()
 
 def get_current_user_and_role_by_role_req():
     current_user = g.current_user
@@ -24,10 +28,8 @@ def get_current_user_and_role_by_role_req():
 def get_all_users():
     """Get all users (admin only)"""
     try:        
-        users, _ = service_user.get_all()  # unpack tuple
-
-        # ubah ke list of dicts
-        users_list = [user.to_dict() for user in users]
+        # projection kolom to_dict (tanpa load entity User)
+        users_list, _ = service_user.get_all_summary()
 
         return success_response("Users retrieved", users_list)
     except Exception as e:
@@ -52,6 +54,54 @@ def get_users_by_role(role):
         return error_response("Failed to get users by role", str(e), 500)
     
 
+@admin_bp.route('/users/directory', methods=['GET'])
+@role_required('admin')
+@query_budget(3)
+def get_user_directory():
+    """
+    Directory user (admin only) dengan filter server-side dan keyset paging
+
+    Query params:
+        role, is_active, fakultas_id, program_studi_id, semester: filter
+        sort: nama | nomor_induk | created_at | last_login | semester (default nama)
+        order: asc | desc
+        limit: max 500 (default 50)
+        cursor: next_cursor dari halaman sebelumnya
+    """
+    try:
+        result, error = directory_service.get_page(request.args)
+        if error:
+            return error_response(error, status_code=400)
+
+        return success_response("User directory retrieved", result)
+    except Exception as e:
+        return error_response("Failed to get user directory", str(e), 500)
+
+
+@admin_bp.route('/users/directory/export', methods=['GET'])
+@role_required('admin')
+def export_user_directory():
+    """
+    Export directory user (admin only), di-stream per batch
+    Query params sama dengan /users/directory + format=ndjson|csv
+    """
+    try:
+        export_format = request.args.get('format', 'csv').lower()
+        chunks, error = directory_service.export(request.args, export_format)
+        if error:
+            return error_response(error, status_code=400)
+
+        mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+        filename = f"users_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    except Exception as e:
+        return error_response("Failed to export user directory", str(e), 500)
+
+
 @admin_bp.route('/users/<user_id>/<action>', methods=['POST'])
 @role_required('admin')
 def toggle_user_status(user_id,action):
@@ -112,4 +162,102 @@ def get_all_permohonan(status):
 
     except Exception as e:
         return error_response("Failed to retrieve data", str(e), 500)
-    
+
+
+@admin_bp.route('/rate-limit/stats', methods=['GET'])
+@role_required('admin')
+def rate_limit_stats():
+    """
+    Counter request allowed/rejected per scope rate limit (worker ini)
+    Contoh response:
+    {
+        "verify:ip": {"allowed": 120, "rejected": 4}
+    }
+    """
+    try:
+        from utils.rate_limit_utils import rate_limiter
+        return success_response("Rate limit stats retrieved", rate_limiter.stats())
+    except Exception as e:
+        return error_response("Failed to get rate limit stats", str(e), 500)
+
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@role_required('admin')
+def slow_queries():
+    """
+    Top offender slow query log (SLOW_QUERY_LOG_ENABLED), digabung per fingerprint SQL
+
+    Query params:
+        sort: total (default) / max / count / avg
+        limit: default 20, max 200
+    """
+    try:
+        from utils.slow_query_log import slow_query_log
+        sort = request.args.get('sort', 'total')
+        if sort not in ('total', 'max', 'count', 'avg'):
+            return error_response("sort must be one of total, max, count, avg", status_code=400)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+        return success_response("Slow queries retrieved", {
+            'enabled': current_app.config.get('SLOW_QUERY_LOG_ENABLED', False),
+            'threshold_ms': current_app.config.get('SLOW_QUERY_THRESHOLD_MS'),
+            'offenders': slow_query_log.top_offenders(limit, sort),
+        })
+    except Exception as e:
+        return error_response("Failed to get slow queries", str(e), 500)
+
+
+@admin_bp.route('/profiles/token', methods=['POST'])
+@role_required('admin')
+def create_profile_token():
+    """
+    Buat token untuk mem-profile satu request
+
+    Body (opsional): {"path": "/api/permohonan/batch-sign"} -> token hanya berlaku untuk path tersebut
+    Kirim request target dengan header X-Profile-Token: <token> (sekali pakai),
+    id hasil ada di header response X-Profile-Id
+    """
+    try:
+        from utils.request_profiler import request_profiler, PROFILE_HEADER
+        if not current_app.config.get('PROFILER_ENABLED', True):
+            return error_response("Profiler is disabled", status_code=404)
+
+        data = request.get_json(silent=True) or {}
+        token = request_profiler.create_token(g.current_user.id, data.get('path'))
+        return success_response("Profile token created", {
+            'token': token,
+            'header': PROFILE_HEADER,
+            'expires_in': current_app.config.get('PROFILER_TOKEN_TTL', 600),
+        }, 201)
+    except Exception as e:
+        return error_response("Failed to create profile token", str(e), 500)
+
+
+@admin_bp.route('/profiles', methods=['GET'])
+@role_required('admin')
+def list_profiles():
+    """List profile request tersimpan (terbaru dulu)"""
+    try:
+        from utils.request_profiler import request_profiler
+        return success_response("Profiles retrieved", request_profiler.list_profiles())
+    except Exception as e:
+        return error_response("Failed to get profiles", str(e), 500)
+
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@role_required('admin')
+def download_profile(profile_id):
+    """
+    Download hasil profile
+
+    Query params:
+        format: speedscope (default, buka di https://www.speedscope.app) / collapsed (flamegraph.pl)
+    """
+    try:
+        from utils.request_profiler import request_profiler
+        found = request_profiler.profile_path(profile_id, request.args.get('format', 'speedscope'))
+        if found is None:
+            return error_response("Profile not found", status_code=404)
+        path, mimetype = found
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=os.path.basename(path))
+    except Exception as e:
+        return error_response("Failed to download profile", str(e), 500)
@@ -12,6 +12,7 @@ from schemas.auth_manual_schema import (
 )
 from schemas.user_schema import UserSchema
 from utils.response_utils import success_response, error_response
+from utils.rate_limit_utils import rate_limit, request_email
 from schemas.otp_schema import VerifyOTPSchema,ResendOTPSchema
 
 auth_manual_bp = Blueprint('auth_manual', __name__)
@@ -30,6 +31,8 @@ resend_otp_schema = ResendOTPSchema()
 
 
 @auth_manual_bp.route('/register/check-email', methods=['POST'])
+@rate_limit('check_email:ip', 'RATE_LIMIT_CHECK_EMAIL_IP')
+@rate_limit('check_email:email', 'RATE_LIMIT_CHECK_EMAIL_EMAIL', key_func=request_email)
 def check_email():
     """
     Check email eligibility for registration
@@ -151,6 +154,8 @@ def verify_otp():
 
 
 @auth_manual_bp.route('/register/resend-otp', methods=['POST'])
+@rate_limit('resend_otp:ip', 'RATE_LIMIT_RESEND_OTP_IP')
+@rate_limit('resend_otp:email', 'RATE_LIMIT_RESEND_OTP_EMAIL', key_func=request_email)
 def resend_otp():
     """
     Resend OTP to email
@@ -6,7 +6,6 @@ from flask_jwt_extended import jwt_required,get_jwt_identity
 from utils.response_utils import success_response, error_response
 from utils.file_utils import save_uploaded_file
 from utils.jwt_utils import role_required
-from PIL import Image
 
 dosen_bp = Blueprint("dosen", __name__)
 dosen_service = DosenService()
@@ -1,33 +1,80 @@
-from flask import send_from_directory, current_app, Blueprint, abort
-import os
+from flask import current_app, Blueprint, redirect, abort
+from werkzeug.security import safe_join
+from app.repositories.permohonan_repository import PermohonanRepository
+from app.services.permohonan_state import UPLOAD_STATUSES
+from utils.file_delivery import serve_file
+from utils.response_utils import error_response
+from utils.storage import storage
 
 file_bp = Blueprint('files', __name__)
 
+
+def _serve_from_storage(area, filename, internal_prefix, max_age=None):
+    """
+    Storage lokal: kirim file (Range/304/offload proxy)
+    Storage object (S3): redirect ke presigned URL, byte tidak lewat app server
+    """
+    if safe_join('/', filename) is None:
+        abort(404)
+    # File tersembunyi (staging lama, .tmp_ dari put_bytes) tidak pernah di-serve
+    if any(part.startswith('.') for part in filename.split('/')):
+        abort(404)
+
+    presigned_url = storage.presigned_url(area, filename)
+    if presigned_url:
+        return redirect(presigned_url, code=302)
+
+    return serve_file(storage.local_root(area), filename, internal_prefix, max_age)
+
 # Route yang sudah ada
 @file_bp.route('/uploads/<path:filename>', methods=['GET'])
 def serve_uploaded_file(filename):
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    full_path = os.path.join(upload_folder, filename)
-    if not os.path.exists(full_path):
-        abort(404)
-    return send_from_directory(upload_folder, filename, as_attachment=False)
+    return _serve_from_storage(
+        'uploads',
+        filename,
+        current_app.config.get('FILE_ACCEL_UPLOADS_PREFIX')
+    )
 
 # TAMBAHKAN ROUTE BARU INI
 @file_bp.route('/signed/<path:filename>', methods=['GET'])
 def serve_signed_file(filename):
     """Serve signed PDF files"""
-    try:
-        signed_folder = current_app.config['UPLOAD_SIGNED']
-        full_path = os.path.join(signed_folder, filename)
-        
-        if not os.path.exists(full_path):
-            abort(404)
-        
-        directory = os.path.dirname(full_path)
-        filename_only = os.path.basename(full_path)
-        
-        return send_from_directory(directory, filename_only, as_attachment=False)
-        
-    except Exception as e:
-        print(f"Error serving signed file: {e}")
-        abort(404)
\ No newline at end of file
+    return _serve_from_storage(
+        'signed',
+        filename,
+        current_app.config.get('FILE_ACCEL_SIGNED_PREFIX')
+    )
+
+
+@file_bp.route('/previews/<string:permohonan_id>', methods=['GET'])
+def serve_permohonan_preview(permohonan_id):
+    """
+    Thumbnail halaman pertama PDF permohonan (JPEG beberapa KB) untuk list view
+    Header X-Page-Count berisi jumlah halaman dokumen
+    """
+    preview = PermohonanRepository().get_preview_projection(permohonan_id)
+    if not preview:
+        return error_response("Permohonan not found", status_code=404)
+
+    if not preview['thumbnail_path'] and preview['status_permohonan'] not in UPLOAD_STATUSES:
+        # File asli sudah dilepas setelah sign / reject, preview tidak akan dibuat lagi
+        return error_response("Preview not available", status_code=404)
+
+    if not preview['thumbnail_path']:
+        # Masih diproses background worker (atau tidak ada renderer)
+        response, status_code = error_response("Preview not ready", status_code=404)
+        response.headers['Retry-After'] = '5'
+        if preview['page_count'] is not None:
+            response.headers['X-Page-Count'] = str(preview['page_count'])
+        return response, status_code
+
+    # Thumbnail content-addressed (nama = sha256), aman di-cache lama
+    response = _serve_from_storage(
+        'uploads',
+        preview['thumbnail_path'],
+        current_app.config.get('FILE_ACCEL_UPLOADS_PREFIX'),
+        max_age=current_app.config.get('PREVIEW_CACHE_MAX_AGE', 86400)
+    )
+    if preview['page_count'] is not None:
+        response.headers['X-Page-Count'] = str(preview['page_count'])
+    return response
@@ -16,7 +16,6 @@ def get_current_user_id_and_role_by_jwt_req():
     current_user = get_current_user()
     if not current_user:
         return None, None, None
-    print(current_user, current_user.id, current_user.role)
     return current_user, current_user.id, current_user.role
 
 @history_bp.route("/<string:status>", methods=["GET"])
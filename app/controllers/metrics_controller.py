@@ -0,0 +1,27 @@
+# controllers/metrics_controller.py
+import hmac
+from flask import Blueprint, Response, request, current_app
+from utils.metrics import metrics, PROMETHEUS_AVAILABLE
+from utils.response_utils import error_response
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """
+    Prometheus scrape endpoint
+
+    Jika METRICS_AUTH_TOKEN di-set, wajib header: Authorization: Bearer <token>
+    """
+    token = current_app.config.get('METRICS_AUTH_TOKEN')
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(provided.encode(), token.encode()):
+            return error_response('Unauthorized', status_code=401)
+
+    if not PROMETHEUS_AVAILABLE:
+        return error_response('prometheus_client is not installed', status_code=503)
+
+    payload, content_type = metrics.render()
+    return Response(payload, content_type=content_type)
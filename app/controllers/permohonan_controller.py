@@ -1,13 +1,16 @@
 # controllers/permohonan_controller.py
-from flask import Blueprint, request,g
+from flask import Blueprint, request, g, current_app
 from flask_jwt_extended import jwt_required
 from marshmallow import ValidationError
 
 from app.services.permohonan_service import PermohonanService
+from app.services.permohonan_state import CONFLICT_MESSAGE
 from schemas.permohonan_schema import PermohonanSchema, CreatePermohonanSchema, UpdatePermohonanSchema
 from utils.jwt_utils import role_required
+from utils.query_budget import query_budget
 from utils.response_utils import success_response, error_response, paginated_response
-from utils.file_utils import save_uploaded_file
+from utils.file_utils import ingest_uploaded_file
+from werkzeug.exceptions import RequestEntityTooLarge
 import traceback
 
 permohonan_bp = Blueprint('permohonan', __name__)
@@ -23,6 +26,10 @@ def get_current_user_by_role_required():
     current_user = g.current_user
     return current_user
 
+def transition_error_status(error):
+    """409 jika permohonan sudah diubah aksi lain (compare-and-set gagal)"""
+    return 409 if error == CONFLICT_MESSAGE else 400
+
 @permohonan_bp.route('/', methods=['POST'])
 @role_required('mahasiswa')
 def create_permohonan():
@@ -40,10 +47,12 @@ def create_permohonan():
         if 'file' in request.files:
             file = request.files['file']
             if file.filename != '':
-                file_path, error = save_uploaded_file(file, 'permohonan')
+                upload, error = ingest_uploaded_file(file, 'permohonan', dedup=True)
                 if error:
                     return error_response(f"Failed to save file: {error}", status_code=400)
+                file_path = upload['path']
                 permohonan_data['file_name'] = file.filename
+                permohonan_data['file_hash'] = upload['sha256']
         
         # Create permohonan
         permohonan, error = permohonan_service.create_permohonan(
@@ -58,6 +67,8 @@ def create_permohonan():
         
     except ValidationError as e:
         return error_response("Validation error", e.messages, 400)
+    except RequestEntityTooLarge:
+        return error_response("File too large", status_code=413)
     except Exception as e:
         return error_response("Failed to create permohonan", str(e), 500)
 
@@ -70,16 +81,15 @@ def reject_permohonan(permohonan_id):
         current_user = get_current_user_by_role_required()
         data = request.json or {}
         komentar_penolakan = data.get('komentar_penolakan')
-        print('komentar_penolakan',komentar_penolakan)
         if not komentar_penolakan:
             return error_response("Rejection comment is required", status_code=400)
         
         permohonan, error = permohonan_service.reject_permohonan(
-            permohonan_id, current_user.id, komentar_penolakan
+            permohonan_id, current_user.id, komentar_penolakan, data.get('version')
         )
         
         if error:
-            return error_response(error, status_code=400)
+            return error_response(error, status_code=transition_error_status(error))
         
         permohonan_data = permohonan_schema.dump(permohonan)
         return success_response("Permohonan rejected successfully", permohonan_data)
@@ -96,12 +106,14 @@ def sign_permohonan(permohonan_id):
         current_user = get_current_user_by_role_required()
         # Check if dosen has uploaded signature
         if not current_user.ttd_path:
-            print(current_user.ttd_path,'ttd_path')
             return error_response("Please upload your signature first", status_code=400)
         
-        permohonan, error = permohonan_service.sign_permohonan(permohonan_id, current_user.id)
+        data = request.get_json(silent=True) or {}
+        permohonan, error = permohonan_service.sign_permohonan(
+            permohonan_id, current_user.id, data.get('version')
+        )
         if error:
-            return error_response(error, status_code=400)
+            return error_response(error, status_code=transition_error_status(error))
         
         permohonan_data = permohonan_schema.dump(permohonan)
         return success_response("Permohonan signed successfully", permohonan_data)
@@ -113,6 +125,7 @@ def sign_permohonan(permohonan_id):
     
 @permohonan_bp.route('/dosen', methods=['GET'])
 @role_required('dosen')
+@query_budget(10)
 def get_permohonan_for_dosen():
     """Get permohonan list for dosen with optional status & jenis filter"""
     try:
@@ -168,6 +181,65 @@ def batch_sign_permohonan():
         return error_response("Failed to batch sign permohonan", str(e), 500)
 
 
+@permohonan_bp.route('/batch-reject', methods=['POST'])
+@role_required('dosen')
+def batch_reject_permohonan():
+    """
+    Batch reject multiple permohonan (dosen only)
+
+    Body:
+        {"permohonan_ids": [...], "komentar_penolakan": "..."}  komentar sama untuk semua
+        {"items": [{"id", "komentar_penolakan", "version"}], "komentar_penolakan": "..."}
+            komentar per item, field top-level jadi default
+    """
+    try:
+        current_user = get_current_user_by_role_required()
+        data = request.json or {}
+        shared_komentar = data.get('komentar_penolakan')
+        
+        raw_items = data.get('items')
+        if raw_items is None:
+            raw_items = [{'id': pid} for pid in data.get('permohonan_ids') or []] \
+                if isinstance(data.get('permohonan_ids'), list) else None
+        
+        if not raw_items or not isinstance(raw_items, list):
+            return error_response("items or permohonan_ids must be a non-empty array", status_code=400)
+        
+        items = {}
+        errors = {}
+        for idx, item in enumerate(raw_items):
+            if not isinstance(item, dict) or not item.get('id'):
+                errors[str(idx)] = "id is required"
+                continue
+            komentar = item.get('komentar_penolakan') or shared_komentar
+            if not komentar:
+                errors[str(item['id'])] = "Rejection comment is required"
+                continue
+            items[item['id']] = {
+                'id': item['id'],
+                'komentar_penolakan': komentar,
+                'version': item.get('version')
+            }
+        
+        if errors:
+            return error_response("Validation error", errors, 400)
+        
+        result, error = permohonan_service.batch_reject_permohonan(list(items.values()), current_user.id)
+        
+        if error:
+            return error_response(error, status_code=400)
+        
+        return success_response(
+            f"Batch reject completed: {len(result['success'])} success, {len(result['failed'])} failed",
+            result,
+            200
+        )
+        
+    except Exception as e:
+        current_app.logger.exception("Batch reject error")
+        return error_response("Failed to batch reject permohonan", str(e), 500)
+
+
 
 #belom digunakan
 # @permohonan_bp.route('/<int:permohonan_id>/approve', methods=['POST'])
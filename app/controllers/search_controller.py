@@ -0,0 +1,37 @@
+# controllers/search_controller.py
+from flask import Blueprint, request, g
+from app.services.search_service import SearchService
+from utils.jwt_utils import role_required
+from utils.response_utils import success_response, error_response
+
+search_bp = Blueprint('search', __name__)
+search_service = SearchService()
+
+
+@search_bp.route('', methods=['GET'])
+@role_required('admin', 'dosen', 'mahasiswa')
+def search():
+    """
+    Unified full-text search
+
+    Query params:
+        q: kata kunci (prefix match, semua kata wajib ada)
+        type: permohonan,dosen,jenis_permohonan,users (comma separated, default semua yang diizinkan)
+        page, per_page: pagination per type
+    """
+    try:
+        types = [name.strip() for name in request.args.get('type', '').split(',') if name.strip()]
+        results, error = search_service.search(
+            request.args.get('q', ''),
+            g.current_user,
+            types or None,
+            request.args.get('page', 1, type=int),
+            request.args.get('per_page', 20, type=int)
+        )
+        if error:
+            return error_response(error, status_code=400)
+
+        return success_response("Search results retrieved", results)
+
+    except Exception as e:
+        return error_response("Failed to search", str(e), 500)
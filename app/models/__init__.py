@@ -5,4 +5,7 @@ from .mahasiswa_model import Mahasiswa
 from .dosen_model import Dosen
 from .permohonan_model import JenisPermohonan, Permohonan
 from .history_model import History
-from .notification_model import Notification
\ No newline at end of file
+from .notification_model import Notification
+from .rate_limit_model import RateLimitBucket
+from .otp_model import OTPCode
+from .file_blob_model import FileBlob
\ No newline at end of file
@@ -0,0 +1,17 @@
+# models/file_blob_model.py
+from datetime import datetime
+from extensions import db
+
+class FileBlob(db.Model):
+    """Reference count file content-addressed (upload & signed PDF)"""
+    __tablename__ = 'file_blobs'
+
+    store = db.Column(db.String(20), primary_key=True)     # 'uploads' / 'signed'
+    path = db.Column(db.String(255), primary_key=True)     # relatif terhadap folder store
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, default=1, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<FileBlob {self.store}:{self.path} (refs={self.ref_count})>'
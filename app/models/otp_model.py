@@ -0,0 +1,17 @@
+# models/otp_model.py
+from datetime import datetime
+from extensions import db
+
+class OTPCode(db.Model):
+    """OTP registrasi yang dibagi antar worker (backend OTP 'database')"""
+    __tablename__ = 'otp_codes'
+
+    email = db.Column(db.String(255), primary_key=True)
+    otp_hash = db.Column(db.String(64), nullable=False)        # HMAC-SHA256 dari kode OTP
+    registration_data = db.Column(db.Text)                     # JSON
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<OTPCode {self.email} (attempts={self.attempts})>'
@@ -34,7 +34,10 @@ class Permohonan(BaseModel):
     deskripsi = db.Column(db.Text)
     file_path = db.Column(db.String(255))
     file_name = db.Column(db.String(255))
+    file_hash = db.Column(db.String(64), index=True)  # SHA-256 dihitung saat upload
     file_signed_path = db.Column(db.String(255))
+    page_count = db.Column(db.Integer)                  # diisi background preview worker
+    thumbnail_path = db.Column(db.String(255))          # relatif UPLOAD_FOLDER (previews/..)
     komentar = db.Column(db.Text)
     komentar_penolakan = db.Column(db.Text)
     qr_code_data = db.Column(db.Text)
@@ -47,10 +50,14 @@ class Permohonan(BaseModel):
     approved_at = db.Column(db.DateTime)
     signed_at = db.Column(db.DateTime)
     rejected_at = db.Column(db.DateTime)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # optimistic concurrency
     
     # Relationships
     history = db.relationship('History', backref='permohonan', cascade='all, delete-orphan')
     notifications = db.relationship('Notification', backref='permohonan', cascade='all, delete-orphan')
+
+    # Flush ORM juga compare-and-set terhadap version (StaleDataError jika bentrok)
+    __mapper_args__ = {'version_id_col': version}
     
     def __repr__(self):
         return f'<Permohonan {self.judul} - {self.status_permohonan}>'
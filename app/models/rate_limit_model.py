@@ -0,0 +1,13 @@
+# models/rate_limit_model.py
+from extensions import db
+
+class RateLimitBucket(db.Model):
+    """Token bucket bersama untuk rate limiting multi-worker"""
+    __tablename__ = 'rate_limit_buckets'
+
+    key = db.Column(db.String(255), primary_key=True)   # '<scope>:<ip|email>'
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)    # epoch seconds
+
+    def __repr__(self):
+        return f'<RateLimitBucket {self.key} ({self.tokens:.2f})>'
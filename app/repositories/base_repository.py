@@ -1,6 +1,7 @@
 # repositories/base_repository.py
 from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Query
+from sqlalchemy import inspect
 from sqlalchemy.exc import SQLAlchemyError
 from extensions import db
 
@@ -26,6 +27,17 @@ class BaseRepository:
         """Get record by ID"""
         return self.session.query(self.model).get(id)
     
+    def get_by_ids_ordered(self, ids: List[Any]) -> List[Any]:
+        """Get records by primary key, urutan mengikuti ids (misal hasil ranking search)"""
+        if not ids:
+            return []
+        primary_key = inspect(self.model).primary_key[0]
+        by_id = {
+            getattr(instance, primary_key.key): instance
+            for instance in self.session.query(self.model).filter(primary_key.in_(ids))
+        }
+        return [by_id[id] for id in ids if id in by_id]
+    
     def get_all(self, **filters) -> List[Any]:
         """Get all records with optional filters"""
         query = self.session.query(self.model)
@@ -1,5 +1,6 @@
 # repositories/dosen_repository.py
 from typing import Optional, List
+from sqlalchemy.orm import contains_eager
 from app.models.dosen_model import Dosen
 from app.models.user_model import User
 from app.models.fakultas_model import Fakultas
@@ -32,20 +33,18 @@ class DosenRepository(BaseRepository):
             .all()
     
     def search_dosen(self, search_term: str) -> List[Dosen]:
-        """Search dosen by name or gelar"""
-        return self.session.query(Dosen)\
-            .join(User)\
-            .filter(\
-                (User.nama.ilike(f'%{search_term}%')) |\
-                (Dosen.gelar_depan.ilike(f'%{search_term}%')) |\
-                (Dosen.gelar_belakang.ilike(f'%{search_term}%'))\
-            ).all()
+        """Search dosen by name, nomor induk or gelar (full-text, urut relevansi)"""
+        from .search_repository import SearchRepository
+
+        hits, _ = SearchRepository().dosen_ids(search_term)
+        return self.get_by_ids_ordered([hit_id for hit_id, _ in hits])
     
     def get_all(self) -> List[Dosen]:
         """Get all dosen with user relationship"""
         return (
             self.session.query(Dosen)
             .join(User)
+            .options(contains_eager(Dosen.user))
             .all()
         )
     
@@ -2,7 +2,6 @@
 from typing import Optional, List
 from app.models.permohonan_model import JenisPermohonan
 from .base_repository import BaseRepository
-from sqlalchemy import or_
 
 class JenisPermohonanRepository(BaseRepository):
     """Repository for JenisPermohonan operations"""
@@ -27,12 +26,11 @@ class JenisPermohonanRepository(BaseRepository):
             .first()
     
     def search(self, keyword: str) -> List[JenisPermohonan]:
-        """Search jenis permohonan by nama or deskripsi"""
-        return self.session.query(JenisPermohonan)\
-            .filter(or_(
-                JenisPermohonan.nama_jenis_permohonan.ilike(f"%{keyword}%"),
-                JenisPermohonan.deskripsi.ilike(f"%{keyword}%")
-            )).all()
+        """Search jenis permohonan by nama or deskripsi (full-text, urut relevansi)"""
+        from .search_repository import SearchRepository
+
+        hits, _ = SearchRepository().jenis_permohonan_ids(keyword)
+        return self.get_by_ids_ordered([hit_id for hit_id, _ in hits])
     
     def create(self, nama: str, deskripsi: str = None,route_path=str, is_active: bool = True) -> JenisPermohonan:
         """Create new jenis permohonan"""
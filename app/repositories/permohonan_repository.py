@@ -1,11 +1,13 @@
 # repositories/permohonan_repository.py
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update, values, column, bindparam
+from sqlalchemy.orm import aliased, contains_eager, joinedload
 from app.models.permohonan_model import Permohonan, JenisPermohonan
 from app.models.mahasiswa_model import Mahasiswa
 from app.models.dosen_model import Dosen
 from app.models.user_model import User
+from app.models.fakultas_model import Fakultas, ProgramStudi
 from .base_repository import BaseRepository
 
 
@@ -15,6 +17,20 @@ class PermohonanRepository(BaseRepository):
     def __init__(self):
         super().__init__(Permohonan)
     
+    @staticmethod
+    def _detail_options():
+        """Relasi yang di-dump PermohonanSchema, di-load dalam query yang sama (tanpa lazy load per baris)"""
+        mahasiswa = joinedload(Permohonan.mahasiswa)
+        dosen = joinedload(Permohonan.dosen)
+        return (
+            joinedload(Permohonan.jenis_permohonan),
+            mahasiswa.joinedload(Mahasiswa.user),
+            mahasiswa.joinedload(Mahasiswa.fakultas_mahasiswa),
+            mahasiswa.joinedload(Mahasiswa.program_studi).joinedload(ProgramStudi.fakultas),
+            dosen.joinedload(Dosen.user),
+            dosen.joinedload(Dosen.fakultas_dosen),
+        )
+
     def get_with_details(self, permohonan_id: int) -> Optional[Permohonan]:
         """Get permohonan with all related details"""
         return self.session.query(Permohonan)\
@@ -23,17 +39,100 @@ class PermohonanRepository(BaseRepository):
             .join(Dosen)\
             .filter(Permohonan.id == permohonan_id)\
             .first()
-    
-    def get_by_mahasiswa(self, mahasiswa_id: str, status: str = None) -> List[Permohonan]:
-        """Get permohonan by mahasiswa"""
+
+    def get_for_dump(self, permohonan_id: str) -> Optional[Permohonan]:
+        """Get permohonan dengan semua relasi yang di-dump PermohonanSchema (satu query)"""
+        return self.session.query(Permohonan)\
+            .options(*self._detail_options())\
+            .filter(Permohonan.id == permohonan_id)\
+            .first()
+
+    def get_verify_projection(self, permohonan_id: str) -> Optional[dict]:
+        """
+        Ambil data verifikasi QR dalam satu query (tanpa lazy load relasi)
+        Returns: dict kolom datar atau None jika tidak ditemukan
+        """
+        MahasiswaUser = aliased(User)
+        DosenUser = aliased(User)
+
+        row = self.session.query(
+                Permohonan.id.label("permohonan_id"),
+                Permohonan.judul,
+                Permohonan.deskripsi,
+                Permohonan.status_permohonan,
+                Permohonan.qr_code_data,
+                Permohonan.signed_at,
+                Permohonan.created_at,
+                JenisPermohonan.id.label("jenis_id"),
+                JenisPermohonan.nama_jenis_permohonan,
+                MahasiswaUser.nama.label("mahasiswa_nama"),
+                MahasiswaUser.nomor_induk.label("mahasiswa_nomor_induk"),
+                ProgramStudi.nama_prodi,
+                Fakultas.nama_fakultas,
+                DosenUser.nama.label("dosen_nama"),
+            )\
+            .outerjoin(JenisPermohonan, Permohonan.id_jenis_permohonan == JenisPermohonan.id)\
+            .outerjoin(Mahasiswa, Permohonan.id_mahasiswa == Mahasiswa.user_id)\
+            .outerjoin(MahasiswaUser, Mahasiswa.user_id == MahasiswaUser.id)\
+            .outerjoin(ProgramStudi, Mahasiswa.program_studi_id == ProgramStudi.id)\
+            .outerjoin(Fakultas, ProgramStudi.fakultas_id == Fakultas.id)\
+            .outerjoin(Dosen, Permohonan.id_dosen == Dosen.user_id)\
+            .outerjoin(DosenUser, Dosen.user_id == DosenUser.id)\
+            .filter(Permohonan.id == permohonan_id)\
+            .first()
+
+        return row._asdict() if row else None
+
+    def get_preview_projection(self, permohonan_id: str) -> Optional[dict]:
+        """Ambil kolom preview (thumbnail, page count) tanpa load entity"""
+        row = self.session.query(
+                Permohonan.id.label("permohonan_id"),
+                Permohonan.status_permohonan,
+                Permohonan.thumbnail_path,
+                Permohonan.page_count,
+            )\
+            .filter(Permohonan.id == permohonan_id)\
+            .first()
+
+        return row._asdict() if row else None
+
+    def get_transition_projection(self, permohonan_ids: List[str]) -> List[dict]:
+        """
+        Ambil kolom yang dibutuhkan validasi + notifikasi batch transition
+        (status, version, file, data mahasiswa) untuk banyak permohonan dalam satu query
+        """
+        rows = self.session.query(
+                Permohonan.id,
+                Permohonan.id_dosen,
+                Permohonan.judul,
+                Permohonan.status_permohonan,
+                Permohonan.version,
+                Permohonan.file_path,
+                JenisPermohonan.nama_jenis_permohonan,
+                User.nama.label("mahasiswa_nama"),
+                User.email.label("mahasiswa_email"),
+            )\
+            .outerjoin(JenisPermohonan, Permohonan.id_jenis_permohonan == JenisPermohonan.id)\
+            .outerjoin(User, Permohonan.id_mahasiswa == User.id)\
+            .filter(Permohonan.id.in_(permohonan_ids))\
+            .all()
+
+        return [row._asdict() for row in rows]
+
+    def get_by_mahasiswa(self, mahasiswa_id: str, status: str = None, with_details: bool = False) -> List[Permohonan]:
+        """Get permohonan by mahasiswa (with_details: eager load relasi untuk di-dump)"""
         query = self.session.query(Permohonan).filter_by(id_mahasiswa=mahasiswa_id)
+        if with_details:
+            query = query.options(*self._detail_options())
         if status:
             query = query.filter_by(status_permohonan=status)
         return query.order_by(Permohonan.created_at.desc()).all()
     
-    def get_by_dosen(self, dosen_id: str, status: str = None) -> List[Permohonan]:
-        """Get permohonan by dosen"""
+    def get_by_dosen(self, dosen_id: str, status: str = None, with_details: bool = False) -> List[Permohonan]:
+        """Get permohonan by dosen (with_details: eager load relasi untuk di-dump)"""
         query = self.session.query(Permohonan).filter_by(id_dosen=dosen_id)
+        if with_details:
+            query = query.options(*self._detail_options())
         if status:
             query = query.filter_by(status_permohonan=status)
         return query.order_by(Permohonan.created_at.desc()).all()
@@ -49,9 +148,12 @@ class PermohonanRepository(BaseRepository):
         # ubah semua hasil ke dict
         return [r.to_dict() for r in result]
     
-    def get_by_status(self, status: str) -> List[Permohonan]:
-        """Get permohonan by status"""
-        return self.session.query(Permohonan)\
+    def get_by_status(self, status: str, with_details: bool = False) -> List[Permohonan]:
+        """Get permohonan by status (with_details: eager load relasi untuk di-dump)"""
+        query = self.session.query(Permohonan)
+        if with_details:
+            query = query.options(*self._detail_options())
+        return query\
             .filter_by(status_permohonan=status)\
             .order_by(Permohonan.created_at.desc())\
             .all()
@@ -88,19 +190,12 @@ class PermohonanRepository(BaseRepository):
         return stats
     
     def search_permohonan(self, search_term: str, status: str = None) -> List[Permohonan]:
-        """Search permohonan by judul or mahasiswa name"""
-        query = self.session.query(Permohonan)\
-            .join(Mahasiswa)\
-            .join(User)\
-            .filter(\
-                (Permohonan.judul.ilike(f'%{search_term}%')) |\
-                (User.nama.ilike(f'%{search_term}%'))\
-            )
-        
-        if status:
-            query = query.filter(Permohonan.status_permohonan == status)
-        
-        return query.order_by(Permohonan.created_at.desc()).all()
+        """Search permohonan by judul/deskripsi or mahasiswa name (full-text, urut relevansi)"""
+        from .search_repository import SearchRepository
+
+        filters = (Permohonan.status_permohonan == status,) if status else ()
+        hits, _ = SearchRepository().permohonan_ids(search_term, filters)
+        return self.get_by_ids_ordered([hit_id for hit_id, _ in hits])
     
     def update_status(self, permohonan_id: int, status: str, **kwargs) -> Optional[Permohonan]:
         """Update permohonan status with timestamp"""
@@ -119,12 +214,111 @@ class PermohonanRepository(BaseRepository):
         
         return self.update(permohonan_id, **update_data)
     
+    def bulk_transition(self, rows: List[dict], from_statuses: List[str], to_status: str) -> List[str]:
+        """
+        Transisi status banyak permohonan sekaligus tanpa load entity
+        Baris hanya berubah jika statusnya masih di from_statuses (dan version sama,
+        jika row membawa 'version'), jadi transisi lain yang terjadi bersamaan tidak
+        tertimpa. Tidak commit (ikut transaksi session).
+
+        Args:
+            rows: [{'id': ..., 'version': ... (opsional), <kolom>: <nilai>, ...}],
+                kolom sama untuk semua baris
+        Returns: list id yang benar-benar bertransisi
+        """
+        if not rows:
+            return []
+
+        table = Permohonan.__table__
+        check_version = 'version' in rows[0]
+        columns = [name for name in rows[0] if name not in ('id', 'version')]
+        now = datetime.utcnow()
+        new_values = {'status_permohonan': to_status, 'updated_at': now, 'version': table.c.version + 1}
+
+        if self.session.get_bind().dialect.name == 'postgresql':
+            # UPDATE ... FROM (VALUES ...) RETURNING id: satu round-trip untuk seluruh batch
+            names = ['id'] + (['version'] if check_version else []) + columns
+            data = values(*[column(name, table.c[name].type) for name in names], name='v')\
+                .data([tuple(row[name] for name in names) for row in rows])
+            stmt = update(table)\
+                .where(table.c.id == data.c.id)\
+                .where(table.c.status_permohonan.in_(from_statuses))\
+                .values(**new_values, **{name: data.c[name] for name in columns})\
+                .returning(table.c.id)
+            if check_version:
+                stmt = stmt.where(table.c.version == data.c.version)
+            return [row.id for row in self.session.execute(stmt)]
+
+        # Dialek lain (SQLite): statement yang sama per baris, rowcount = berhasil/tidak
+        stmt = update(table)\
+            .where(table.c.id == bindparam('b_id'))\
+            .where(table.c.status_permohonan.in_(from_statuses))\
+            .values(**new_values, **{name: bindparam(f'b_{name}') for name in columns})
+        if check_version:
+            stmt = stmt.where(table.c.version == bindparam('b_version'))
+        transitioned = []
+        for row in rows:
+            result = self.session.execute(stmt, {f'b_{name}': value for name, value in row.items()})
+            if result.rowcount:
+                transitioned.append(row['id'])
+        return transitioned
+
+    def compare_and_set(self, permohonan_id: str, from_statuses, to_status: str,
+                        expected_version: Optional[int] = None, **values) -> bool:
+        """
+        UPDATE ... WHERE id AND status IN (from_statuses) [AND version = expected_version]
+        Version selalu dinaikkan. Tidak commit (ikut transaksi session).
+
+        Returns: True jika baris berubah, False jika status/version sudah berbeda
+        """
+        table = Permohonan.__table__
+        stmt = update(table)\
+            .where(table.c.id == permohonan_id)\
+            .where(table.c.status_permohonan.in_(list(from_statuses)))\
+            .values(
+                status_permohonan=to_status,
+                updated_at=datetime.utcnow(),
+                version=table.c.version + 1,
+                **values
+            )
+        if expected_version is not None:
+            stmt = stmt.where(table.c.version == expected_version)
+        return self.session.execute(stmt).rowcount == 1
+
+    def expire_signed_file(self, permohonan_id: str, old_path: str) -> bool:
+        """
+        UPDATE file_signed_path = 'expired' WHERE id AND file_signed_path = old_path
+        Tidak commit (ikut transaksi session).
+
+        Returns: True jika baris berubah, False jika path sudah diganti proses lain
+        """
+        table = Permohonan.__table__
+        stmt = update(table)\
+            .where(table.c.id == permohonan_id)\
+            .where(table.c.file_signed_path == old_path)\
+            .values(
+                file_signed_path='expired',
+                updated_at=datetime.utcnow(),
+                version=table.c.version + 1
+            )
+        return self.session.execute(stmt).rowcount == 1
+
     def get_by_dosen_with_filter(self, dosen_id: str, status: str = None, jenis_id: int = None) -> List[Permohonan]:
         """Get permohonan for dosen with optional status & jenis filter"""
         query = self.session.query(Permohonan)\
             .join(Mahasiswa, Permohonan.id_mahasiswa == Mahasiswa.user_id)\
             .join(User, Mahasiswa.user_id == User.id)\
             .join(JenisPermohonan, Permohonan.id_jenis_permohonan == JenisPermohonan.id)\
+            .options(
+                # Pakai join di atas untuk relasi yang di-dump schema (hindari lazy load per baris)
+                contains_eager(Permohonan.mahasiswa).contains_eager(Mahasiswa.user),
+                contains_eager(Permohonan.mahasiswa).joinedload(Mahasiswa.fakultas_mahasiswa),
+                contains_eager(Permohonan.mahasiswa).joinedload(Mahasiswa.program_studi)
+                    .joinedload(ProgramStudi.fakultas),
+                contains_eager(Permohonan.jenis_permohonan),
+                joinedload(Permohonan.dosen).joinedload(Dosen.user),
+                joinedload(Permohonan.dosen).joinedload(Dosen.fakultas_dosen)
+            )\
             .filter(Permohonan.id_dosen == dosen_id)
         
         if status:
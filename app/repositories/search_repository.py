@@ -0,0 +1,259 @@
+# repositories/search_repository.py
+import math
+from typing import List, Optional
+from sqlalchemy import select, func, and_, or_, union_all, literal, literal_column, bindparam, table, column
+from app.models.permohonan_model import Permohonan, JenisPermohonan
+from app.models.dosen_model import Dosen
+from app.models.user_model import User
+from extensions import db
+from utils.search_index import (
+    SEARCH_DOCUMENTS, search_words, pg_tsvector_sql, pg_tsquery, fts5_query, fts5_table, has_fts5_table
+)
+
+DOCUMENT_TABLES = {
+    'permohonan': Permohonan.__table__,
+    'users': User.__table__,
+    'jenis_permohonan': JenisPermohonan.__table__,
+}
+
+
+class SearchPage:
+    """Hasil search satu halaman (atribut sama dengan Pagination Flask-SQLAlchemy)"""
+
+    def __init__(self, items, total, page, per_page):
+        self.items = items
+        self.total = total
+        self.page = page
+        self.per_page = per_page
+
+    @property
+    def pages(self):
+        return math.ceil(self.total / self.per_page) if self.per_page else 1
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+
+class SearchRepository:
+    """
+    Full-text search ranked untuk permohonan, users dan jenis permohonan
+
+    Backend dipilih per database:
+        postgresql -> tsvector @@ to_tsquery (index GIN ekspresi, lihat utils.search_index)
+        sqlite     -> tabel FTS5 external content (bm25)
+        lainnya / index belum dibuat -> ILIKE (tanpa ranking)
+    Setiap kata dicocokkan sebagai prefix dan semua kata wajib ada.
+    """
+
+    def __init__(self):
+        self.session = db.session
+
+    def backend(self, document: str) -> str:
+        bind = self.session.get_bind()
+        dialect = bind.dialect.name
+        if dialect == 'postgresql':
+            return 'postgres'
+        if dialect == 'sqlite' and has_fts5_table(bind, document):
+            return 'fts5'
+        return 'like'
+
+    def _match(self, document: str, words: List[str]):
+        """
+        Returns:
+            (from_clause, condition, rank): rank lebih besar = lebih relevan
+        """
+        base = DOCUMENT_TABLES[document]
+        backend = self.backend(document)
+
+        if backend == 'postgres':
+            vector = literal_column(pg_tsvector_sql(document))
+            query = func.to_tsquery(
+                literal_column("'simple'"), bindparam(f'tsq_{document}', pg_tsquery(words), unique=True)
+            )
+            return base, vector.op('@@')(query), func.ts_rank(vector, query)
+
+        if backend == 'fts5':
+            fts_name = fts5_table(document)
+            fts = table(fts_name, column('rowid'), column('rank'))
+            from_clause = base.join(fts, fts.c.rowid == literal_column(f'{base.name}.rowid'))
+            condition = literal_column(fts_name).op('MATCH')(
+                bindparam(f'fts_{document}', fts5_query(words), unique=True)
+            )
+            # rank FTS5 = bm25, makin kecil makin relevan
+            return from_clause, condition, -fts.c.rank
+
+        # Fallback tanpa index: setiap kata harus ada di salah satu kolom
+        _, columns = SEARCH_DOCUMENTS[document]
+        condition = and_(*[
+            or_(*[base.c[name].ilike(f'%{word}%') for name in columns]) for word in words
+        ])
+        return base, condition, literal(0.0)
+
+    def _ranked_ids(self, document: str, words: List[str], filters=()):
+        """select(id, rank) untuk dokumen, dengan filter tambahan di tabel dokumen"""
+        base = DOCUMENT_TABLES[document]
+        from_clause, condition, rank = self._match(document, words)
+        return select(base.c.id.label('id'), rank.label('rank'))\
+            .select_from(from_clause)\
+            .where(condition, *filters)
+
+    def _paginate(self, ranked, page: int, per_page: Optional[int]):
+        """
+        Returns:
+            ([(id, rank)], total)
+        """
+        ranked = ranked.subquery()
+        total = self.session.execute(select(func.count()).select_from(ranked)).scalar()
+
+        query = select(ranked.c.id, ranked.c.rank).order_by(ranked.c.rank.desc(), ranked.c.id)
+        if per_page:
+            query = query.limit(per_page).offset((page - 1) * per_page)
+        return [(row.id, row.rank) for row in self.session.execute(query)], total
+
+    @staticmethod
+    def _ordered(hits, rows):
+        """Urutkan hasil projection sesuai urutan rank"""
+        by_id = {row['id']: row for row in rows}
+        items = []
+        for hit_id, rank in hits:
+            if hit_id in by_id:
+                item = by_id[hit_id]
+                item['rank'] = float(rank or 0)
+                items.append(item)
+        return items
+
+    # ===== ID SEARCH (dipakai repository lain) =====
+
+    def permohonan_ids(self, term: str, filters=(), page: int = 1, per_page: Optional[int] = None):
+        """
+        Cari permohonan berdasarkan judul/deskripsi atau nama/NIM mahasiswa pengaju
+
+        Returns:
+            ([(id, rank)], total)
+        """
+        words = search_words(term)
+        if not words:
+            return [], 0
+
+        permohonan = DOCUMENT_TABLES['permohonan']
+        users = DOCUMENT_TABLES['users']
+
+        own = self._ranked_ids('permohonan', words, filters)
+
+        # Cocok lewat mahasiswa: index users, lalu permohonan milik user tersebut
+        user_from, user_condition, user_rank = self._match('users', words)
+        by_mahasiswa = select(permohonan.c.id.label('id'), user_rank.label('rank'))\
+            .select_from(user_from.join(permohonan, permohonan.c.id_mahasiswa == users.c.id))\
+            .where(user_condition, *filters)
+
+        combined = union_all(own, by_mahasiswa).subquery()
+        ranked = select(combined.c.id, func.max(combined.c.rank).label('rank'))\
+            .group_by(combined.c.id)
+        return self._paginate(ranked, page, per_page)
+
+    def user_ids(self, term: str, filters=(), page: int = 1, per_page: Optional[int] = None):
+        words = search_words(term)
+        if not words:
+            return [], 0
+        return self._paginate(self._ranked_ids('users', words, filters), page, per_page)
+
+    def dosen_ids(self, term: str, filters=(), page: int = 1, per_page: Optional[int] = None):
+        """
+        Cari dosen berdasarkan nama/nomor induk/email (index users) atau gelar
+
+        Gelar tidak di-index: tabel dosen kecil, setiap kata dicocokkan ILIKE ke
+        gelar_depan / gelar_belakang dengan rank 0 (di bawah hasil index)
+        """
+        words = search_words(term)
+        if not words:
+            return [], 0
+
+        users = DOCUMENT_TABLES['users']
+        dosen = Dosen.__table__
+        filters = (users.c.role == 'dosen', *filters)
+
+        by_user = self._ranked_ids('users', words, filters)
+        by_gelar = select(users.c.id.label('id'), literal(0.0).label('rank'))\
+            .select_from(users.join(dosen, dosen.c.user_id == users.c.id))\
+            .where(and_(*[
+                or_(dosen.c.gelar_depan.ilike(f'%{word}%'), dosen.c.gelar_belakang.ilike(f'%{word}%'))
+                for word in words
+            ]), *filters)
+
+        combined = union_all(by_user, by_gelar).subquery()
+        ranked = select(combined.c.id, func.max(combined.c.rank).label('rank'))\
+            .group_by(combined.c.id)
+        return self._paginate(ranked, page, per_page)
+
+    def jenis_permohonan_ids(self, term: str, filters=(), page: int = 1, per_page: Optional[int] = None):
+        words = search_words(term)
+        if not words:
+            return [], 0
+        return self._paginate(self._ranked_ids('jenis_permohonan', words, filters), page, per_page)
+
+    # ===== RANKED PAGES (projection, tanpa load entity) =====
+
+    def search_permohonan(self, term: str, filters=(), page: int = 1, per_page: int = 20) -> SearchPage:
+        hits, total = self.permohonan_ids(term, filters, page, per_page)
+        rows = self.session.query(
+                Permohonan.id,
+                Permohonan.judul,
+                Permohonan.status_permohonan,
+                Permohonan.created_at,
+                Permohonan.id_dosen,
+                JenisPermohonan.nama_jenis_permohonan,
+                User.nama.label("mahasiswa_nama"),
+                User.nomor_induk.label("mahasiswa_nomor_induk"),
+            )\
+            .outerjoin(JenisPermohonan, Permohonan.id_jenis_permohonan == JenisPermohonan.id)\
+            .outerjoin(User, Permohonan.id_mahasiswa == User.id)\
+            .filter(Permohonan.id.in_([hit_id for hit_id, _ in hits]))\
+            .all() if hits else []
+        return SearchPage(self._ordered(hits, [row._asdict() for row in rows]), total, page, per_page)
+
+    def search_users(self, term: str, filters=(), page: int = 1, per_page: int = 20) -> SearchPage:
+        hits, total = self.user_ids(term, filters, page, per_page)
+        rows = self.session.query(
+                User.id,
+                User.nama,
+                User.nomor_induk,
+                User.email,
+                User.role,
+                User.is_active,
+            )\
+            .filter(User.id.in_([hit_id for hit_id, _ in hits]))\
+            .all() if hits else []
+        return SearchPage(self._ordered(hits, [row._asdict() for row in rows]), total, page, per_page)
+
+    def search_dosen(self, term: str, filters=(), page: int = 1, per_page: int = 20) -> SearchPage:
+        hits, total = self.dosen_ids(term, filters, page, per_page)
+        rows = self.session.query(
+                User.id,
+                User.nama,
+                User.nomor_induk,
+                Dosen.gelar_depan,
+                Dosen.gelar_belakang,
+                Dosen.jabatan,
+            )\
+            .join(Dosen, Dosen.user_id == User.id)\
+            .filter(User.id.in_([hit_id for hit_id, _ in hits]))\
+            .all() if hits else []
+        return SearchPage(self._ordered(hits, [row._asdict() for row in rows]), total, page, per_page)
+
+    def search_jenis_permohonan(self, term: str, filters=(), page: int = 1, per_page: int = 20) -> SearchPage:
+        hits, total = self.jenis_permohonan_ids(term, filters, page, per_page)
+        rows = self.session.query(
+                JenisPermohonan.id,
+                JenisPermohonan.nama_jenis_permohonan,
+                JenisPermohonan.deskripsi,
+                JenisPermohonan.route_path,
+                JenisPermohonan.is_active,
+            )\
+            .filter(JenisPermohonan.id.in_([hit_id for hit_id, _ in hits]))\
+            .all() if hits else []
+        return SearchPage(self._ordered(hits, [row._asdict() for row in rows]), total, page, per_page)
@@ -20,6 +20,23 @@ class UserRepository(BaseRepository):
     def get_all(self, **filters):
         return super().get_all(**filters)
     
+    def get_all_summary(self):
+        """Kolom User.to_dict() via projection (tanpa load entity)"""
+        rows = self.session.query(
+            User.id,
+            User.nomor_induk,
+            User.nama,
+            User.email,
+            User.role,
+            User.is_active,
+            User.no_hp,
+            User.last_login,
+        ).all()
+        return [
+            {**row._asdict(), 'last_login': row.last_login.isoformat() if row.last_login else None}
+            for row in rows
+        ]
+    
     def get_all_by_role(self, role: str):
         """Get all users by role"""
         return self.session.query(User).filter_by(role=role).all()
@@ -40,14 +57,12 @@ class UserRepository(BaseRepository):
         return self.session.query(User).count()
     
     def search_users(self, search_term: str, role: str = None):
-        """Search users by name or nomor_induk"""
-        query = self.session.query(User).filter(
-            (User.nama.ilike(f'%{search_term}%')) |
-            (User.nomor_induk.ilike(f'%{search_term}%'))
-        )
-        if role:
-            query = query.filter_by(role=role)
-        return query.all()
+        """Search users by name, nomor_induk or email (full-text, urut relevansi)"""
+        from .search_repository import SearchRepository
+
+        filters = (User.role == role,) if role else ()
+        hits, _ = SearchRepository().user_ids(search_term, filters)
+        return self.get_by_ids_ordered([hit_id for hit_id, _ in hits])
     
     def update_last_login(self, user_id: str):
         """Update user's last login timestamp"""
@@ -1,3 +1,4 @@
+from datetime import datetime
 from extensions import db
 from app.models.user_model import User
 from app.models.mahasiswa_model import Mahasiswa
@@ -65,3 +66,122 @@ class ViewRepositoryMahasiswa:
         )
 
         return [row._asdict() for row in data]
+
+
+class UserDirectoryRepository:
+    """
+    Directory user untuk admin: satu projection (user + data mahasiswa/dosen),
+    filter di database dan keyset paging (tanpa OFFSET, tanpa load entity)
+    """
+
+    # sort field -> (ekspresi, nilai pengganti NULL agar urutan keyset total)
+    SORT_FIELDS = {
+        'nama': (User.nama, None),
+        'nomor_induk': (User.nomor_induk, None),
+        'created_at': (User.created_at, None),
+        'last_login': (User.last_login, datetime(1970, 1, 1)),
+        'semester': (Mahasiswa.semester, 0),
+    }
+
+    @staticmethod
+    def sort_expression(sort):
+        column, null_value = UserDirectoryRepository.SORT_FIELDS[sort]
+        return db.func.coalesce(column, null_value) if null_value is not None else column
+
+    def _base_query(self):
+        fakultas_id = db.func.coalesce(Mahasiswa.fakultas_id, Dosen.fakultas_id)
+        return (
+            db.session.query(
+                User.id.label("user_id"),
+                User.nomor_induk,
+                User.nama,
+                User.email,
+                User.no_hp,
+                User.role,
+                User.is_active,
+                fakultas_id.label("fakultas_id"),
+                Fakultas.nama_fakultas,
+                ProgramStudi.id.label("program_studi_id"),
+                ProgramStudi.nama_prodi,
+                Mahasiswa.semester,
+                Dosen.gelar_depan,
+                Dosen.gelar_belakang,
+                Dosen.jabatan,
+                User.created_at,
+                User.last_login,
+            )
+            .outerjoin(Mahasiswa, User.id == Mahasiswa.user_id)
+            .outerjoin(Dosen, User.id == Dosen.user_id)
+            .outerjoin(Fakultas, Fakultas.id == fakultas_id)
+            .outerjoin(ProgramStudi, Mahasiswa.program_studi_id == ProgramStudi.id)
+        )
+
+    @staticmethod
+    def _apply_filters(query, filters):
+        if filters.get('role'):
+            query = query.filter(User.role == filters['role'])
+        if filters.get('is_active') is not None:
+            query = query.filter(User.is_active.is_(filters['is_active']))
+        if filters.get('fakultas_id') is not None:
+            query = query.filter(db.or_(
+                Mahasiswa.fakultas_id == filters['fakultas_id'],
+                Dosen.fakultas_id == filters['fakultas_id']
+            ))
+        if filters.get('program_studi_id') is not None:
+            query = query.filter(Mahasiswa.program_studi_id == filters['program_studi_id'])
+        if filters.get('semester') is not None:
+            query = query.filter(Mahasiswa.semester == filters['semester'])
+        return query
+
+    def get_page(self, filters: dict, sort: str = 'nama', descending: bool = False,
+                 limit: int = 50, after=None):
+        """
+        Satu halaman directory
+
+        Args:
+            after: (sort_value, user_id) baris terakhir halaman sebelumnya
+        Returns:
+            (list of dict, has_more)
+        """
+        sort_expr = self.sort_expression(sort)
+        query = self._apply_filters(self._base_query(), filters)
+
+        if after is not None:
+            last_value, last_id = after
+            if descending:
+                query = query.filter(db.or_(
+                    sort_expr < last_value,
+                    db.and_(sort_expr == last_value, User.id < last_id)
+                ))
+            else:
+                query = query.filter(db.or_(
+                    sort_expr > last_value,
+                    db.and_(sort_expr == last_value, User.id > last_id)
+                ))
+
+        if descending:
+            query = query.order_by(sort_expr.desc(), User.id.desc())
+        else:
+            query = query.order_by(sort_expr.asc(), User.id.asc())
+
+        rows = query.limit(limit + 1).all()
+        return [row._asdict() for row in rows[:limit]], len(rows) > limit
+
+    def iter_rows(self, filters: dict, sort: str = 'nama', descending: bool = False, batch_size: int = 1000):
+        """
+        Generator semua baris (untuk export), per batch keyset
+        Transaksi diakhiri setelah setiap batch sehingga koneksi kembali ke pool
+        selama batch itu di-stream ke client (batch berikutnya transaksi baru)
+        """
+        _, null_value = self.SORT_FIELDS[sort]
+        after = None
+        while True:
+            rows, has_more = self.get_page(filters, sort, descending, batch_size, after)
+            # Baris sudah berupa dict: session bisa ditutup tanpa detach object yang dipakai
+            db.session.close()
+            yield from rows
+            if not has_more:
+                return
+            last = rows[-1]
+            value = last[sort]
+            after = (null_value if value is None else value, last['user_id'])
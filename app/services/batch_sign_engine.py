@@ -0,0 +1,213 @@
+import os
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy.orm import joinedload
+from extensions import db
+from utils.qr_utils import generate_qr_code
+from utils.storage import scratch_file
+from utils.metrics import sign_document_duration
+
+
+class SignerContext(NamedTuple):
+    """Data dosen penandatangan, di-resolve sekali di main thread"""
+    dosen_id: str
+    nama_lengkap: str
+    jabatan: Optional[str]
+    ttd_path: Optional[str]
+
+
+class SignTask(NamedTuple):
+    """Payload immutable untuk worker (tidak ada objek ORM / session)"""
+    permohonan_id: str
+    judul: str
+    file_path: str
+    jenis_nama: str
+    mahasiswa_nama: str
+    mahasiswa_nomor_induk: Optional[str]
+    mahasiswa_email: Optional[str]
+    signer: SignerContext
+
+
+class SignOutcome(NamedTuple):
+    """
+    Hasil worker: PDF signed masih di scratch file lokal, registrasi ke
+    signed_blobs + update database dilakukan main thread
+    """
+    task: SignTask
+    signed_at: Optional[datetime] = None
+    qr_filename: Optional[str] = None
+    qr_data_string: Optional[str] = None
+    scratch_path: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def success(self):
+        return self.error is None
+
+
+def resolve_signers(dosen_ids):
+    """
+    Ambil semua dosen penandatangan dalam satu query
+
+    Returns:
+        dict: {dosen_id: SignerContext}
+    """
+    from app.models.dosen_model import Dosen
+
+    dosen_ids = set(dosen_ids)
+    if not dosen_ids:
+        return {}
+
+    dosen_list = db.session.query(Dosen)\
+        .options(joinedload(Dosen.user))\
+        .filter(Dosen.user_id.in_(dosen_ids))\
+        .all()
+
+    return {
+        dosen.user_id: SignerContext(
+            dosen_id=dosen.user_id,
+            nama_lengkap=dosen.nama_lengkap,
+            jabatan=dosen.jabatan,
+            ttd_path=dosen.ttd_path
+        )
+        for dosen in dosen_list
+    }
+
+
+def build_sign_task(permohonan, signer):
+    """Salin kolom yang dibutuhkan worker dari entity Permohonan (eager loaded)"""
+    mahasiswa_user = permohonan.mahasiswa.user if permohonan.mahasiswa else None
+    return SignTask(
+        permohonan_id=permohonan.id,
+        judul=permohonan.judul,
+        file_path=permohonan.file_path,
+        jenis_nama=permohonan.jenis_permohonan.nama_jenis_permohonan if permohonan.jenis_permohonan else '-',
+        mahasiswa_nama=mahasiswa_user.nama if mahasiswa_user else 'Unknown',
+        mahasiswa_nomor_induk=mahasiswa_user.nomor_induk if mahasiswa_user else None,
+        mahasiswa_email=mahasiswa_user.email if mahasiswa_user else None,
+        signer=signer
+    )
+
+
+def sign_task(task):
+    """
+    QR + tanda tangan PDF untuk satu task. Hanya storage dan CPU, tanpa database.
+
+    Returns:
+        SignOutcome
+    """
+    started = time.perf_counter()
+    try:
+        return _sign_task(task)
+    finally:
+        sign_document_duration.observe(time.perf_counter() - started)
+
+
+def _sign_task(task):
+    from utils.pdf_utils import add_signature_to_stored_pdf
+
+    signed_at = datetime.utcnow()
+    qr_data = {
+        'permohonan_id': str(task.permohonan_id),
+        'signed_by': task.signer.dosen_id,
+        'signed_at': signed_at.isoformat(),
+        'request_by': {
+            'nama': task.mahasiswa_nama,
+            'nomor_induk': task.mahasiswa_nomor_induk
+        }
+    }
+
+    qr_filename, qr_data_string, qr_error = generate_qr_code(qr_data, task.permohonan_id)
+    if qr_error:
+        return SignOutcome(task, error=f"QR generation failed: {qr_error}")
+
+    scratch_path = scratch_file('.pdf')
+    try:
+        success, error = add_signature_to_stored_pdf(
+            task.file_path,
+            task.signer.ttd_path,
+            qr_filename,
+            scratch_path,
+            task.signer.nama_lengkap,
+            task.signer.jabatan,
+            task.jenis_nama,
+            datetime.now().strftime("%d/%m/%Y")
+        )
+    except Exception as e:
+        success, error = False, str(e)
+
+    if not success:
+        if os.path.exists(scratch_path):
+            os.remove(scratch_path)
+        return SignOutcome(task, error=error or 'PDF processing failed')
+
+    return SignOutcome(task, signed_at, qr_filename, qr_data_string, scratch_path)
+
+
+class BatchSignEngine:
+    """
+    Eksekusi SignTask secara paralel (bisa campuran beberapa dosen)
+
+    Worker hanya menerima payload immutable dan app context untuk config/storage,
+    tidak pernah memakai db.session, jadi tidak mengambil koneksi dari pool.
+    """
+
+    def __init__(self, app, max_workers=4):
+        self.app = app
+        self.max_workers = max_workers
+
+    def _warm_signers(self, tasks):
+        """
+        Fan-out per dosen: decode TTD tiap dosen sekali sebelum worker jalan
+
+        Returns:
+            dict: {dosen_id: error} untuk dosen yang TTD-nya tidak bisa dipakai
+        """
+        from utils.signature_cache import signature_cache
+
+        signer_errors = {}
+        for signer in {task.signer for task in tasks}:
+            if not signer.ttd_path:
+                signer_errors[signer.dosen_id] = 'Dosen signature not found'
+                continue
+            try:
+                signature_cache.get(signer.ttd_path)
+            except FileNotFoundError:
+                signer_errors[signer.dosen_id] = 'Dosen signature file not found'
+            except Exception as e:
+                signer_errors[signer.dosen_id] = f"Invalid signature image: {e}"
+        return signer_errors
+
+    def _run_in_context(self, task):
+        with self.app.app_context():
+            try:
+                return sign_task(task)
+            except Exception as e:
+                return SignOutcome(task, error=str(e))
+
+    def run(self, tasks):
+        """
+        Returns:
+            list[SignOutcome]: urutan sesuai selesai
+        """
+        if not tasks:
+            return []
+
+        signer_errors = self._warm_signers(tasks)
+        outcomes = [
+            SignOutcome(task, error=signer_errors[task.signer.dosen_id])
+            for task in tasks if task.signer.dosen_id in signer_errors
+        ]
+        runnable = [task for task in tasks if task.signer.dosen_id not in signer_errors]
+        if not runnable:
+            return outcomes
+
+        max_workers = max(1, min(self.max_workers, len(runnable)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch-sign') as executor:
+            futures = [executor.submit(self._run_in_context, task) for task in runnable]
+            for future in as_completed(futures):
+                outcomes.append(future.result())
+
+        return outcomes
@@ -15,7 +15,8 @@ class DosenService:
         dosen_list = self.dosen_repo.get_all()
         result = []
         for dosen in dosen_list:
-            user = self.user_repo.get_by_id(dosen.user_id)
+            # user sudah di-load lewat join di repository (tanpa query per dosen)
+            user = dosen.user
             if user:
                 result.append({
                     "id": str(dosen.user_id),
@@ -32,13 +33,10 @@ class DosenService:
             
             # Hapus file lama jika ada
             if dosen.ttd_path:
-                old_file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], dosen.ttd_path)
-                if os.path.exists(old_file_path):
-                    try:
-                        os.remove(old_file_path)
-                    except Exception as e:
-                        print(f"Failed to delete old signature: {e}")
-                        pass
+                from utils.file_utils import delete_file
+                from utils.signature_cache import signature_cache
+                delete_file(dosen.ttd_path)
+                signature_cache.invalidate(dosen.ttd_path)
 
             # Update path baru
             dosen.ttd_path = signature_path
@@ -2,13 +2,15 @@ from flask_mail import Message
 from extensions import mail
 from flask import current_app, render_template_string
 import threading
+from utils.metrics import track_email
 
 
 def _send_async_email(app, msg):
     """Helper function to send email asynchronously"""
     with app.app_context():
         try:
-            mail.send(msg)
+            with track_email('account'):
+                mail.send(msg)
         except Exception as e:
             print(f"❌ Email send error: {str(e)}")
             pass
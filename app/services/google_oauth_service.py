@@ -1,7 +1,5 @@
 # services/google_oauth_service.py
 import os , datetime
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from flask_jwt_extended import create_access_token, create_refresh_token
 
 from app.repositories.user_repository import UserRepository
@@ -28,6 +26,10 @@ class GoogleOAuthService:
     
     def verify_google_token(self, token: str) -> dict:
         """Verify Google OAuth token and return user info"""
+        # google-auth (+ requests) cukup berat, hanya di-import saat login Google
+        from google.oauth2 import id_token
+        from google.auth.transport import requests as google_requests
+
         try:
             # Verify the token
             idinfo = id_token.verify_oauth2_token(
@@ -11,12 +11,13 @@ class HistoryService:
 
     def get_history_by_status(self, user_id: str, role:str,status: str):
         """Get history of permohonan for a mahasiswa by status"""
+        # with_details: relasi yang di-dump schema ikut di-load (tanpa N+1)
         if role == "mahasiswa":
-            history = self.repo_permohonan.get_by_mahasiswa(user_id, status)
+            history = self.repo_permohonan.get_by_mahasiswa(user_id, status, with_details=True)
         elif role == "dosen":
-            history = self.repo_permohonan.get_by_dosen(user_id,status)
+            history = self.repo_permohonan.get_by_dosen(user_id, status, with_details=True)
         elif role == "admin":
-            history = self.repo_permohonan.get_by_status(status)
+            history = self.repo_permohonan.get_by_status(status, with_details=True)
         return history
     
 
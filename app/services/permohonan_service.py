@@ -3,26 +3,44 @@ from datetime import datetime
 from .base_service import BaseService
 from app.repositories.permohonan_repository import PermohonanRepository
 from app.repositories.user_repository import UserRepository
+from app.services.permohonan_state import PermohonanStateMachine, CONFLICT_MESSAGE
 from app.models.permohonan_model import Permohonan
 from app.models.history_model import History
 from utils.qr_utils import generate_qr_code
 from utils.notification_utils import *
+from utils.verify_cache import verify_cache
+from utils.blob_store import signed_blobs
 from extensions import db
 from flask import current_app
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
+
+def _discard_file(path):
+    """Hapus file sementara hasil signing yang gagal"""
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 class PermohonanService(BaseService):
     """Service for permohonan operations"""
     
     def __init__(self):
         self.permohonan_repo = PermohonanRepository()
         self.user_repo = UserRepository()
+        self.state_machine = PermohonanStateMachine(self.permohonan_repo)
 
 
     def create_permohonan(self, mahasiswa_id: str, permohonan_data: dict, file_path: str = None):
-        """Create new permohonan"""
+        """
+        Create new permohonan
+        file_path (hasil ingest_uploaded_file) dimiliki service ini: jika permohonan
+        gagal dibuat, reference blob-nya dilepas lagi
+        """
         try:
             permohonan = Permohonan(
                 id_jenis_permohonan=permohonan_data['id_jenis_permohonan'],
@@ -32,6 +50,7 @@ class PermohonanService(BaseService):
                 deskripsi=permohonan_data.get('deskripsi'),
                 file_path=file_path,
                 file_name=permohonan_data.get('file_name'),
+                file_hash=permohonan_data.get('file_hash'),
                 status_permohonan='pending'
             )
             
@@ -43,15 +62,28 @@ class PermohonanService(BaseService):
             
             db.session.commit()
             
-            # Send notification to dosen
-            # notify_permohonan_created(permohonan)
-            
-            return permohonan, None
-            
         except Exception as e:
             db.session.rollback()
+            if file_path:
+                # Tidak ada baris yang memakai upload ini, jangan biarkan reference blob menggantung
+                from utils.file_utils import delete_file
+                delete_file(file_path)
             return None, str(e)
 
+        # Thumbnail + page count dibuat di background worker
+        if file_path:
+            try:
+                from utils.preview_utils import schedule_permohonan_preview
+                schedule_permohonan_preview(permohonan.id)
+            except Exception as e:
+                print(f"⚠️ Failed to schedule preview for {permohonan.id}: {str(e)}")
+        
+        # Send notification to dosen
+        # notify_permohonan_created(permohonan)
+        
+        # Relasi untuk response di-load sekaligus (bukan lazy load per relasi saat dump)
+        return self.permohonan_repo.get_for_dump(permohonan.id), None
+
 
     def get_permohonan_by_user(self, user_id: str, role: str):
         """Get permohonan by user based on role"""
@@ -77,8 +109,15 @@ class PermohonanService(BaseService):
         return self.permohonan_repo.get_by_dosen_with_filter(dosen_id, status, jenis_id)
 
 
-    def reject_permohonan(self, permohonan_id: int, dosen_id: str, komentar_penolakan: str):
-        """Reject permohonan"""
+    def reject_permohonan(self, permohonan_id: int, dosen_id: str, komentar_penolakan: str,
+                          expected_version: int = None):
+        """
+        Reject permohonan
+
+        Args:
+            expected_version: version permohonan yang dilihat dosen; jika permohonan sudah
+                berubah sejak itu, reject gagal tanpa menimpa perubahan tersebut
+        """
         try:
             permohonan = self.permohonan_repo.get_by_id(permohonan_id)
             
@@ -88,22 +127,30 @@ class PermohonanService(BaseService):
             if permohonan.id_dosen != dosen_id:
                 return None, "Unauthorized to reject this permohonan"
             
-            if permohonan.status_permohonan != 'pending':
+            if not PermohonanStateMachine.can('reject', permohonan.status_permohonan):
                 return None, "Permohonan cannot be rejected"
             
-            # Update status
-            permohonan.status_permohonan = 'ditolak'
-            permohonan.rejected_at = datetime.utcnow()
-            permohonan.komentar_penolakan = komentar_penolakan
+            file_permohonan_path = permohonan.file_path
+            
+            # Compare-and-set: gagal cepat jika status / version sudah diubah aksi lain
+            changed, error = self.state_machine.apply(
+                permohonan.id,
+                'reject',
+                expected_version if expected_version is not None else permohonan.version,
+                komentar_penolakan=komentar_penolakan
+            )
+            if not changed:
+                db.session.rollback()
+                return None, error
             
             # Create history record
             # self._create_history_record(permohonan, 'rejected', komentar_penolakan)
             
             db.session.commit()
+            verify_cache.invalidate(permohonan.id)
             
             #remove file
             from utils.file_utils import delete_file
-            file_permohonan_path = permohonan.file_path
 
             if file_permohonan_path:
                 delete_file(file_permohonan_path)
@@ -135,75 +182,90 @@ class PermohonanService(BaseService):
             return None, str(e)
 
 
-    def sign_permohonan(self, permohonan_id: str, dosen_id: str):
-        """Sign permohonan (can sign pending or approved)"""
+    def sign_permohonan(self, permohonan_id: str, dosen_id: str, expected_version: int = None):
+        """
+        Sign permohonan (can sign pending or approved)
+
+        PDF diproses tanpa lock; status baru ditulis dengan compare-and-set. Jika
+        permohonan diubah aksi lain (reject / batch sign) selama proses, sign gagal
+        dan PDF hasilnya dibuang.
+        """
+        signed_path = None
         try:
-            permohonan = self.permohonan_repo.get_by_id(permohonan_id)
+            from app.models.mahasiswa_model import Mahasiswa
+            from sqlalchemy.orm import joinedload
+            from app.services.batch_sign_engine import resolve_signers, build_sign_task, sign_task
+
+            permohonan = db.session.query(Permohonan)\
+                .options(
+                    joinedload(Permohonan.mahasiswa).joinedload(Mahasiswa.user),
+                    joinedload(Permohonan.jenis_permohonan)
+                )\
+                .filter(Permohonan.id == permohonan_id)\
+                .first()
             if not permohonan:
                 return None, "Permohonan not found"
             
             if permohonan.id_dosen != dosen_id:
                 return None, "Unauthorized to sign this permohonan"
             
-            if permohonan.status_permohonan not in ['pending', 'disetujui']:
+            if not PermohonanStateMachine.can('sign', permohonan.status_permohonan):
                 return None, "Permohonan cannot be signed"
             
             # Check if file exists
             if not permohonan.file_path:
                 return None, "No file attached to this permohonan"
             
-            
-            # Get mahasiswa data
-            from app.models.mahasiswa_model import Mahasiswa
-            mahasiswa = db.session.query(Mahasiswa).filter_by(user_id=permohonan.id_mahasiswa).first()
-            if not mahasiswa:
+            if not permohonan.mahasiswa:
                 return None, "Mahasiswa data not found"
             
             # Get dosen data
-            from app.models.dosen_model import Dosen
-            dosen = db.session.query(Dosen).filter_by(user_id=dosen_id).first()
-            if not dosen or not dosen.ttd_path:
+            signer = resolve_signers([dosen_id]).get(dosen_id)
+            if not signer or not signer.ttd_path:
                 return None, "Dosen signature not found"
             
-            # Generate QR code with enhanced data
-            qr_data = {
-                'permohonan_id': str(permohonan.id),
-                'signed_by': dosen_id,
-                'signed_at': datetime.utcnow().isoformat(),
-                'request_by': {
-                    'nama': mahasiswa.user.nama if mahasiswa.user else 'Unknown',
-                    'nomor_induk': mahasiswa.user.nomor_induk
-                }
-            }
-            
-            qr_filename, qr_data_string, qr_error = generate_qr_code(qr_data, permohonan.id)
-            if qr_error:
-                return None, f"Failed to generate QR code: {qr_error}"
-            
-            # ADD SIGNATURE TO PDF
-            signed_pdf_error = self._add_signature_to_permohonan_pdf_single(
-                permohonan, 
-                dosen.ttd_path, 
-                qr_filename,
-                dosen_id
-            )
-            if signed_pdf_error:
-                return None, signed_pdf_error
+            if expected_version is None:
+                expected_version = permohonan.version
+            file_permohonan_path = permohonan.file_path
+            
+            # QR code + ADD SIGNATURE TO PDF
+            outcome = sign_task(build_sign_task(permohonan, signer))
+            if not outcome.success:
+                return None, f"Failed to add signature to PDF: {outcome.error}"
             
-            # Update status
-            permohonan.status_permohonan = 'ditandatangani'
-            permohonan.signed_at = datetime.utcnow()
-            permohonan.qr_code_path = qr_filename
-            permohonan.qr_code_data = qr_data_string
+            ttd_folder = current_app.config['DOCUMENT_PERMOHONAN_TTD_PATH']
+            relative_ttd_folder = os.path.relpath(ttd_folder, current_app.config['UPLOAD_SIGNED'])
+            try:
+                signed_path = signed_blobs.put_file(outcome.scratch_path, relative_ttd_folder, '.pdf')
+            except Exception:
+                _discard_file(outcome.scratch_path)
+                raise
+            
+            # Update status (compare-and-set)
+            changed, error = self.state_machine.apply(
+                permohonan.id,
+                'sign',
+                expected_version,
+                signed_at=outcome.signed_at,
+                file_signed_path=signed_path,
+                qr_code_path=outcome.qr_filename,
+                qr_code_data=outcome.qr_data_string
+            )
+            if not changed:
+                db.session.rollback()
+                from utils.file_utils import delete_signed_file
+                delete_signed_file(signed_path)
+                return None, error
             
             # Create history
             # self._create_history_record(permohonan, 'signed')
             
             db.session.commit()
+            signed_path = None
+            verify_cache.invalidate(permohonan.id)
             
             #remove file
             from utils.file_utils import delete_file
-            file_permohonan_path = permohonan.file_path
 
             if file_permohonan_path:
                 delete_file(file_permohonan_path)
@@ -229,11 +291,20 @@ class PermohonanService(BaseService):
             
         except Exception as e:
             db.session.rollback()
+            if signed_path:
+                from utils.file_utils import delete_signed_file
+                delete_signed_file(signed_path)
             return None, str(e)
         
 
-    def batch_sign_permohonan(self, permohonan_ids: list, dosen_id: str):
-        """Batch sign multiple permohonan dengan parallel processing untuk PDF dan email"""
+    def batch_sign_permohonan(self, permohonan_ids: list, dosen_id: str = None):
+        """
+        Batch sign multiple permohonan dengan parallel processing untuk PDF dan email
+
+        Args:
+            dosen_id: dosen yang menandatangani; None = setiap permohonan ditandatangani
+                dosen tujuannya masing-masing (batch campuran beberapa dosen)
+        """
         results = {
             'success': [],
             'failed': [],
@@ -244,16 +315,10 @@ class PermohonanService(BaseService):
             # ✅ GET FLASK APP CONTEXT (CRITICAL!)
             app = current_app._get_current_object()
             
-            # Get dosen data once (optimization)
-            from app.models.dosen_model import Dosen
-            dosen = db.session.query(Dosen).filter_by(user_id=dosen_id).first()
-            if not dosen or not dosen.ttd_path:
-                return None, "Dosen signature not found"
-            
             # Fetch all permohonan at once with eager loading
             from app.models.mahasiswa_model import Mahasiswa
-            from app.models.user_model import User
             from sqlalchemy.orm import joinedload
+            from app.services.batch_sign_engine import BatchSignEngine, resolve_signers, build_sign_task
             
             # ✅ EAGER LOAD semua relasi yang dibutuhkan
             permohonan_list = db.session.query(Permohonan)\
@@ -268,14 +333,14 @@ class PermohonanService(BaseService):
             validated_permohonan = []
             for permohonan in permohonan_list:
                 # Validasi
-                if permohonan.id_dosen != dosen_id:
+                if dosen_id is not None and permohonan.id_dosen != dosen_id:
                     results['failed'].append({
                         'id': permohonan.id,
                         'reason': 'Unauthorized - not your permohonan'
                     })
                     continue
                 
-                if permohonan.status_permohonan not in ['pending', 'disetujui']:
+                if not self.state_machine.can('sign', permohonan.status_permohonan):
                     results['failed'].append({
                         'id': permohonan.id,
                         'reason': f'Cannot sign (status: {permohonan.status_permohonan})'
@@ -300,139 +365,140 @@ class PermohonanService(BaseService):
                         'reason': 'Permohonan not found'
                     })
             
+            # ✅ Resolve semua dosen penandatangan sekali (1 query), worker tidak query lagi
+            signers = resolve_signers(
+                [dosen_id] if dosen_id is not None else [p.id_dosen for p in validated_permohonan]
+            )
+            if dosen_id is not None:
+                signer = signers.get(dosen_id)
+                if not signer or not signer.ttd_path:
+                    return None, "Dosen signature not found"
+            
             if not validated_permohonan:
                 return results, None
             
-            # ✅ PRE-LOAD semua data yang dibutuhkan untuk parallel processing
-            pdf_processing_tasks = []
+            # ✅ Payload immutable untuk worker (tanpa objek ORM)
+            sign_tasks = []
             for permohonan in validated_permohonan:
-                # Extract data di main thread (dalam app context)
-                task_data = {
-                    'permohonan_id': permohonan.id,
-                    'permohonan_judul': permohonan.judul,
-                    'file_path': permohonan.file_path,
-                    'mahasiswa_nama': permohonan.mahasiswa.user.nama if permohonan.mahasiswa and permohonan.mahasiswa.user else 'Unknown',
-                    'mahasiswa_nomor_induk': permohonan.mahasiswa.user.nomor_induk if permohonan.mahasiswa and permohonan.mahasiswa.user else None,
-                    'mahasiswa_email': permohonan.mahasiswa.user.email if permohonan.mahasiswa and permohonan.mahasiswa.user else None,
-                    'jenis_nama': permohonan.jenis_permohonan.nama_jenis_permohonan if permohonan.jenis_permohonan else '-'
-                }
-                pdf_processing_tasks.append(task_data)
+                signer = signers.get(permohonan.id_dosen)
+                if not signer or not signer.ttd_path:
+                    results['failed'].append({
+                        'id': permohonan.id,
+                        'reason': 'Dosen signature not found'
+                    })
+                    continue
+                sign_tasks.append(build_sign_task(permohonan, signer))
             
             # ===== PARALLEL PROCESSING: QR Generation + PDF Signing =====
+            engine = BatchSignEngine(app, max_workers=app.config.get('BATCH_SIGN_WORKERS', 4))
+            outcomes = engine.run(sign_tasks)
             
+            # ===== BATCH DATABASE UPDATE =====
+            from utils.file_utils import delete_file, delete_signed_file
+            ttd_folder = current_app.config['DOCUMENT_PERMOHONAN_TTD_PATH']
+            relative_ttd_folder = os.path.relpath(ttd_folder, current_app.config['UPLOAD_SIGNED'])
+            original_files = {p.id: p.file_path for p in validated_permohonan}
+            versions = {p.id: p.version for p in validated_permohonan}
+            signed_outcomes = []
+            transition_rows = []
+            
+            for outcome in outcomes:
+                task = outcome.task
+                if not outcome.success:
+                    results['failed'].append({
+                        'id': task.permohonan_id,
+                        'reason': outcome.error
+                    })
+                    continue
+                
+                try:
+                    # Registrasi blob di main thread (worker tidak menyentuh database)
+                    signed_path = signed_blobs.put_file(outcome.scratch_path, relative_ttd_folder, '.pdf')
+                except Exception as e:
+                    _discard_file(outcome.scratch_path)
+                    results['failed'].append({
+                        'id': task.permohonan_id,
+                        'reason': f"Failed to store signed PDF: {str(e)}"
+                    })
+                    continue
+                
+                signed_outcomes.append(outcome)
+                transition_rows.append({
+                    'id': task.permohonan_id,
+                    'version': versions[task.permohonan_id],
+                    'signed_at': outcome.signed_at,
+                    'file_signed_path': signed_path,
+                    'qr_code_path': outcome.qr_filename,
+                    'qr_code_data': outcome.qr_data_string
+                })
+            
+            if not signed_outcomes:
+                return results, None
             
-            pdf_processing_data = []
-            emails_to_send = {}
-            
-            # Use ThreadPoolExecutor for parallel PDF processing
-            max_workers = min(10, len(pdf_processing_tasks))
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all PDF processing tasks
-                future_to_task = {
-                    executor.submit(
-                        self._process_single_pdf_parallel_with_context,
-                        app,  # ✅ Pass Flask app
-                        task_data,
-                        dosen.ttd_path,
-                        dosen.nama_lengkap,
-                        dosen_id
-                    ): task_data
-                    for task_data in pdf_processing_tasks
-                }
+            signed_paths = {row['id']: row['file_signed_path'] for row in transition_rows}
+            try:
+                # Bulk compare-and-set (status + version) + single commit
+                transitioned = set(self.state_machine.apply_many('sign', transition_rows))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
                 
-                # Collect results as they complete
-                for future in as_completed(future_to_task):
-                    task_data = future_to_task[future]
-                    try:
-                        success, pdf_data, mahasiswa_email, error_msg = future.result()
-                        
-                        if success:
-                            pdf_processing_data.append({
-                                'permohonan_id': task_data['permohonan_id'],
-                                'pdf_data': pdf_data
-                            })
-                            
-                            results['success'].append({
-                                'id': task_data['permohonan_id'],
-                                'judul': task_data['permohonan_judul']
-                            })
-                            
-                            # Collect email info
-                            if mahasiswa_email:
-                                if mahasiswa_email not in emails_to_send:
-                                    emails_to_send[mahasiswa_email] = {
-                                        'nama': task_data['mahasiswa_nama'],
-                                        'permohonan_list': []
-                                    }
-                                emails_to_send[mahasiswa_email]['permohonan_list'].append({
-                                    'judul': task_data['permohonan_judul'],
-                                    'jenis': task_data['jenis_nama']
-                                })
-                        else:
-                            results['failed'].append({
-                                'id': task_data['permohonan_id'],
-                                'reason': error_msg or 'PDF processing failed'
-                            })
-                            
-                    except Exception as e:
-                        
-                        results['failed'].append({
-                            'id': task_data['permohonan_id'],
-                            'reason': str(e)
-                        })
+                # Lepas lagi PDF signed yang sudah tersimpan, mark all as failed
+                for signed_path in signed_paths.values():
+                    delete_signed_file(signed_path)
+                for outcome in signed_outcomes:
+                    results['failed'].append({
+                        'id': outcome.task.permohonan_id,
+                        'reason': 'Database commit failed'
+                    })
+                return results, None
             
+            # Status sudah diubah aksi lain (reject / sign paralel) saat PDF diproses
+            for outcome in signed_outcomes:
+                if outcome.task.permohonan_id not in transitioned:
+                    delete_signed_file(signed_paths[outcome.task.permohonan_id])
+                    results['failed'].append({
+                        'id': outcome.task.permohonan_id,
+                        'reason': CONFLICT_MESSAGE
+                    })
+            signed_outcomes = [o for o in signed_outcomes if o.task.permohonan_id in transitioned]
             
+            verify_cache.invalidate(*transitioned)
             
-            # ===== BATCH DATABASE UPDATE =====
-            if pdf_processing_data:
-                try:
-                    # Get fresh permohonan objects for update
-                    permohonan_map = {p.id: p for p in validated_permohonan}
-                    
-                    for item in pdf_processing_data:
-                        permohonan = permohonan_map[item['permohonan_id']]
-                        pdf_data = item['pdf_data']
-                        
-                        # Update permohonan
-                        permohonan.status_permohonan = 'ditandatangani'
-                        permohonan.signed_at = pdf_data['signed_at']
-                        permohonan.file_signed_path = pdf_data['signed_path']
-                        permohonan.qr_code_path = pdf_data['qr_filename']
-                        permohonan.qr_code_data = pdf_data['qr_data_string']
-                        
-                        # Delete original file
-                        from utils.file_utils import delete_file
-                        if permohonan.file_path:
-                            delete_file(permohonan.file_path)
-                    
-                    # Single commit for all changes
-                    db.session.commit()
-                    
-                    
-                except Exception as e:
-                    db.session.rollback()
-                    
-                    # Mark all as failed
-                    for item in pdf_processing_data:
-                        # Find and remove from success
-                        for success_item in results['success'][:]:
-                            if success_item['id'] == item['permohonan_id']:
-                                results['success'].remove(success_item)
-                                break
-                        
-                        results['failed'].append({
-                            'id': item['permohonan_id'],
-                            'reason': 'Database commit failed'
-                        })
-                    return results, None
+            # Delete original file (setelah commit, file tidak hilang jika commit gagal)
+            for permohonan_id in transitioned:
+                if original_files.get(permohonan_id):
+                    delete_file(original_files[permohonan_id])
+            
+            emails_to_send = {}
+            for outcome in signed_outcomes:
+                task = outcome.task
+                results['success'].append({
+                    'id': task.permohonan_id,
+                    'judul': task.judul
+                })
+                
+                # Collect email info (per mahasiswa per dosen)
+                if task.mahasiswa_email:
+                    key = (task.mahasiswa_email, task.signer.dosen_id)
+                    if key not in emails_to_send:
+                        emails_to_send[key] = {
+                            'email': task.mahasiswa_email,
+                            'nama': task.mahasiswa_nama,
+                            'dosen_nama': task.signer.nama_lengkap,
+                            'permohonan_list': []
+                        }
+                    emails_to_send[key]['permohonan_list'].append({
+                        'judul': task.judul,
+                        'jenis': task.jenis_nama
+                    })
             
             # ===== PARALLEL EMAIL SENDING (Background) =====
             if emails_to_send:
                 # Send emails in background thread (non-blocking)
                 thread = threading.Thread(
                     target=self._send_batch_notifications_parallel,
-                    args=(app, emails_to_send, dosen.nama_lengkap)  # ✅ Pass app
+                    args=(app, list(emails_to_send.values()))  # ✅ Pass app
                 )
                 thread.daemon = True
                 thread.start()
@@ -443,8 +509,6 @@ class PermohonanService(BaseService):
         except Exception as e:
             db.session.rollback()
             
-            import traceback
-            
             return None, f"Failed to batch sign permohonan: {str(e)}"
 
 
@@ -498,138 +562,161 @@ class PermohonanService(BaseService):
             
     #     except Exception as e:
     #         return None, f"Error processing PDF signature: {str(e)}"
-    def _add_signature_to_permohonan_pdf(
-        self,
-        file_path: str,
-        ttd_path: str,
-        qr_filename: str,
-        dosen_nama_lengkap: str,
-        jabatan_dosen:str,
-        nama_jenis_permohonan: str
-    ):
-        try:
-            from utils.pdf_utils import add_signature_to_pdf, get_full_file_path
-
-            original_pdf_path = get_full_file_path(file_path, 'uploads')
-            signature_path = get_full_file_path(ttd_path, 'uploads')
-            qr_path = get_full_file_path(qr_filename, 'qr_codes')
-
-            original_filename = os.path.basename(file_path)
-            name_without_ext = os.path.splitext(original_filename)[0]
-            signed_filename = f"{name_without_ext}_signed.pdf"
-
-            ttd_folder = current_app.config['DOCUMENT_PERMOHONAN_TTD_PATH']
-            signed_absolute_path = os.path.join(ttd_folder, signed_filename)
-
-            relative_ttd_folder = os.path.relpath(
-                ttd_folder,
-                current_app.config['UPLOAD_SIGNED']
-            )
-            signed_relative_path = os.path.join(relative_ttd_folder, signed_filename)
-
-            signed_at = datetime.now().strftime("%d/%m/%Y")
-
-            success, error = add_signature_to_pdf(
-                original_pdf_path,
-                signature_path,
-                qr_path,
-                signed_absolute_path,
-                dosen_nama_lengkap,
-                jabatan_dosen,
-                nama_jenis_permohonan,
-                signed_at
-            )
-
-            if not success:
-                return None, error
-
-            return signed_relative_path, None
 
-        except Exception as e:
-            return None, str(e)
 
-
-    
-    def _process_single_pdf_parallel_with_context(self, app, task_data: dict, ttd_path: str, 
-                                                   dosen_nama_lengkap: str, dosen_id: str):
+    def batch_reject_permohonan(self, items: list, dosen_id: str):
         """
-        Process QR generation + PDF signing untuk single permohonan (thread-safe dengan app context)
-        Returns: (success, pdf_data_dict, mahasiswa_email, error_msg)
-        """
-        # ✅ RUN dalam Flask app context
-        with app.app_context():
-            try:
-                # Generate QR code
-                signed_at = datetime.utcnow()
-                qr_data = {
-                    'permohonan_id': str(task_data['permohonan_id']),
-                    'signed_by': dosen_id,
-                    'signed_at': signed_at.isoformat(),
-                    'request_by': {
-                        'nama': task_data['mahasiswa_nama'],
-                        'nomor_induk': task_data['mahasiswa_nomor_induk']
-                    }
-                }
-                
-                qr_filename, qr_data_string, qr_error = generate_qr_code(qr_data, task_data['permohonan_id'])
-                if qr_error:
-                    return False, None, None, f"QR generation failed: {qr_error}"
-                
-                # Ambil jabatan dosen
-                from app.models.dosen_model import Dosen
+        Batch reject multiple permohonan
 
-                dosen = db.session.query(Dosen).filter_by(user_id=dosen_id).first()
-                if not dosen:
-                    return False, None, None, "Dosen tidak ditemukan"
-
-                jabatan_dosen = dosen.jabatan
-                
-                # Add signature to PDF
-                signed_path, pdf_error = self._add_signature_to_permohonan_pdf(
-                    file_path=task_data['file_path'],
-                    ttd_path=ttd_path,
-                    qr_filename=qr_filename,
-                    dosen_nama_lengkap=dosen_nama_lengkap,
-                    jabatan_dosen=jabatan_dosen,
-                    nama_jenis_permohonan=task_data['jenis_nama']
-                )
+        Validasi dalam satu query, transisi dengan satu bulk compare-and-set, hapus
+        file paralel setelah commit, lalu satu email per mahasiswa.
 
-                if pdf_error:
-                    return False, None, None, pdf_error
-                
-                # Prepare data for batch DB update
-                pdf_data = {
-                    'signed_path': signed_path,
-                    'signed_at': signed_at,
-                    'qr_filename': qr_filename,
-                    'qr_data_string': qr_data_string
-                }
-                
-                mahasiswa_email = task_data['mahasiswa_email']
-                
+        Args:
+            items: list dict {'id', 'komentar_penolakan', 'version' (opsional)}
+        """
+        results = {
+            'success': [],
+            'failed': [],
+            'total': len(items)
+        }
+        
+        try:
+            app = current_app._get_current_object()
+            items_by_id = {item['id']: item for item in items}
+            
+            # ✅ Validasi semua permohonan dalam satu query (tanpa load entity)
+            candidates = self.permohonan_repo.get_transition_projection(list(items_by_id))
+            found_ids = {row['id'] for row in candidates}
+            for pid in items_by_id:
+                if pid not in found_ids:
+                    results['failed'].append({
+                        'id': pid,
+                        'reason': 'Permohonan not found'
+                    })
+            
+            validated = []
+            for row in candidates:
+                if row['id_dosen'] != dosen_id:
+                    results['failed'].append({
+                        'id': row['id'],
+                        'reason': 'Unauthorized - not your permohonan'
+                    })
+                    continue
                 
-                return True, pdf_data, mahasiswa_email, None
+                if not PermohonanStateMachine.can('reject', row['status_permohonan']):
+                    results['failed'].append({
+                        'id': row['id'],
+                        'reason': f"Cannot reject (status: {row['status_permohonan']})"
+                    })
+                    continue
                 
+                validated.append(row)
+            
+            if not validated:
+                return results, None
+            
+            transition_rows = []
+            for row in validated:
+                item = items_by_id[row['id']]
+                version = item.get('version')
+                transition_rows.append({
+                    'id': row['id'],
+                    'version': version if version is not None else row['version'],
+                    'komentar_penolakan': item['komentar_penolakan']
+                })
+            
+            # ===== BULK COMPARE-AND-SET + SINGLE COMMIT =====
+            try:
+                transitioned = set(self.state_machine.apply_many('reject', transition_rows))
+                db.session.commit()
             except Exception as e:
+                db.session.rollback()
+                for row in validated:
+                    results['failed'].append({
+                        'id': row['id'],
+                        'reason': 'Database commit failed'
+                    })
+                return results, None
+            
+            for row in validated:
+                if row['id'] not in transitioned:
+                    results['failed'].append({
+                        'id': row['id'],
+                        'reason': CONFLICT_MESSAGE
+                    })
+            rejected = [row for row in validated if row['id'] in transitioned]
+            
+            verify_cache.invalidate(*transitioned)
+            
+            # Delete original files paralel (setelah commit)
+            from utils.file_utils import delete_files
+            delete_files(
+                [row['file_path'] for row in rejected],
+                max_workers=app.config.get('BATCH_SIGN_WORKERS', 4)
+            )
+            
+            # Collect email info (satu email per mahasiswa)
+            from app.models.user_model import User
+            dosen_user = db.session.query(User.nama).filter(User.id == dosen_id).first()
+            dosen_nama = dosen_user.nama if dosen_user else '-'
+            
+            emails_to_send = {}
+            for row in rejected:
+                results['success'].append({
+                    'id': row['id'],
+                    'judul': row['judul']
+                })
                 
-                import traceback
-                
-                return False, None, None, str(e)
+                if row['mahasiswa_email']:
+                    if row['mahasiswa_email'] not in emails_to_send:
+                        emails_to_send[row['mahasiswa_email']] = {
+                            'email': row['mahasiswa_email'],
+                            'nama': row['mahasiswa_nama'],
+                            'dosen_nama': dosen_nama,
+                            'permohonan_list': []
+                        }
+                    emails_to_send[row['mahasiswa_email']]['permohonan_list'].append({
+                        'judul': row['judul'],
+                        'jenis': row['nama_jenis_permohonan'],
+                        'komentar_penolakan': items_by_id[row['id']]['komentar_penolakan']
+                    })
+            
+            # ===== PARALLEL EMAIL SENDING (Background) =====
+            if emails_to_send:
+                from utils.email_utils import send_batch_rejected_email_sync
+                thread = threading.Thread(
+                    target=self._send_batch_notifications_parallel,
+                    args=(app, list(emails_to_send.values()), send_batch_rejected_email_sync)
+                )
+                thread.daemon = True
+                thread.start()
+            
+            return results, None
+            
+        except Exception as e:
+            db.session.rollback()
+            return None, f"Failed to batch reject permohonan: {str(e)}"
 
 
-    def _send_single_email_with_context(self, app, email: str, nama: str, dosen_name: str, permohonan_list: list):
+    def _send_single_email_with_context(self, app, email: str, nama: str, dosen_name: str, permohonan_list: list,
+                                        send_fn=None):
         """
         Send single email dengan app context untuk ThreadPoolExecutor
         """
         with app.app_context():
-            from utils.email_utils import send_batch_permohonan_email_sync
-            return send_batch_permohonan_email_sync(email, nama, dosen_name, permohonan_list)
+            if send_fn is None:
+                from utils.email_utils import send_batch_permohonan_email_sync as send_fn
+            return send_fn(email, nama, dosen_name, permohonan_list)
 
 
-    def _send_batch_notifications_parallel(self, app, emails_to_send: dict, dosen_name: str):
+    def _send_batch_notifications_parallel(self, app, emails_to_send: list, send_fn=None):
         """
         Send batch email notifications in parallel (runs in background thread)
         Setiap task dibungkus dengan app.app_context() via wrapper
+
+        Args:
+            emails_to_send: list dict {'email', 'nama', 'dosen_nama', 'permohonan_list'}
+            send_fn: fungsi email sync; default send_batch_permohonan_email_sync (signed)
         """
         try:
             
@@ -642,12 +729,13 @@ class PermohonanService(BaseService):
                     executor.submit(
                         self._send_single_email_with_context,  #  Wrapper function
                         app,  #  Pass app untuk context
-                        email,
+                        data['email'],
                         data['nama'],
-                        dosen_name,
-                        data['permohonan_list']
-                    ): email
-                    for email, data in emails_to_send.items()
+                        data['dosen_nama'],
+                        data['permohonan_list'],
+                        send_fn
+                    ): data['email']
+                    for data in emails_to_send
                 }
                 
                 success_count = 0
@@ -724,64 +812,6 @@ class PermohonanService(BaseService):
     #     except Exception as e:
     #         return f"Error processing PDF signature: {str(e)}"
 
-    def _add_signature_to_permohonan_pdf_single(self, permohonan, ttd_path, qr_filename,dosen_id:str):
-        """Menambahkan tanda tangan ke PDF permohonan"""
-        try:
-            from utils.pdf_utils import add_signature_to_pdf, get_full_file_path
-            
-            # Path file asli
-            original_pdf_path = get_full_file_path(permohonan.file_path,'uploads')
-            
-            # Path tanda tangan
-            signature_path = get_full_file_path(ttd_path,'uploads')
-            
-            # Path QR code
-            qr_path = get_full_file_path(qr_filename,'qr_codes')
-            
-            # Generate nama file signed
-            original_filename = os.path.basename(permohonan.file_path)
-            name_without_ext = os.path.splitext(original_filename)[0]
-            signed_filename = f"{name_without_ext}_signed.pdf"
-            
-            # Path untuk save
-            ttd_folder = current_app.config['DOCUMENT_PERMOHONAN_TTD_PATH']
-            signed_absolute_path = os.path.join(ttd_folder, signed_filename)
-            
-            # Path relatif untuk database
-            relative_ttd_folder = os.path.relpath(ttd_folder, current_app.config['UPLOAD_SIGNED'])
-            signed_relative_path = os.path.join(relative_ttd_folder, signed_filename)
-
-            from app.models.dosen_model import Dosen
-            dosen = db.session.query(Dosen).filter_by(user_id=dosen_id).first()
-            jabatan_dosen = dosen.jabatan
-            signed_at = datetime.now().strftime("%d/%m/%Y")
-            nama_jenis_permohonan = permohonan.jenis_permohonan.nama_jenis_permohonan  
-
-            # Proses PDF
-            success, error = add_signature_to_pdf(
-                original_pdf_path,
-                signature_path, 
-                qr_path,
-                signed_absolute_path,
-                dosen.nama_lengkap,
-                jabatan_dosen,
-                nama_jenis_permohonan,
-                signed_at
-            )
-            
-            if not success:
-                return f"Failed to add signature to PDF: {error}"
-            
-            # Update path di database
-            permohonan.file_signed_path = signed_relative_path
-            
-            return None
-            
-        except Exception as e:
-            return f"Error processing PDF signature: {str(e)}"
-
-
-
     #belom digunakan
     # def _create_history_record(self, permohonan: Permohonan, action: str, komentar: str = None):
     #     """Create history record"""
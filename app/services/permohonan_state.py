@@ -0,0 +1,85 @@
+from datetime import datetime
+
+# action -> (status asal yang diizinkan, status tujuan, kolom timestamp)
+PERMOHONAN_TRANSITIONS = {
+    'approve': (('pending',), 'disetujui', 'approved_at'),
+    'reject': (('pending',), 'ditolak', 'rejected_at'),
+    'sign': (('pending', 'disetujui'), 'ditandatangani', 'signed_at'),
+    'complete': (('ditandatangani',), 'selesai', None),
+}
+
+# Status yang masih menyimpan file upload asli (sign / reject melepasnya)
+UPLOAD_STATUSES = ('pending', 'disetujui')
+
+CONFLICT_MESSAGE = "Permohonan was changed by another action, please reload"
+
+
+class PermohonanStateMachine:
+    """
+    Transisi status permohonan dengan compare-and-set (optimistic concurrency)
+
+    Setiap transisi adalah satu UPDATE ... WHERE id AND status IN (...) AND version,
+    tanpa row lock. Aksi yang bentrok (dua tab, batch vs single sign) langsung gagal
+    dan tidak menunggu aksi lain selesai.
+    """
+
+    def __init__(self, permohonan_repo):
+        self.permohonan_repo = permohonan_repo
+
+    @staticmethod
+    def can(action, status):
+        """Cek apakah action boleh dilakukan dari status ini"""
+        from_statuses, _, _ = PERMOHONAN_TRANSITIONS[action]
+        return status in from_statuses
+
+    @staticmethod
+    def _with_timestamp(action, values):
+        _, _, timestamp_column = PERMOHONAN_TRANSITIONS[action]
+        if timestamp_column and timestamp_column not in values:
+            values[timestamp_column] = datetime.utcnow()
+        return values
+
+    @staticmethod
+    def _without_preview(action, values):
+        # Thumbnail ikut dihapus saat reference upload terakhir dilepas, kosongkan di UPDATE yang sama
+        _, to_status, _ = PERMOHONAN_TRANSITIONS[action]
+        if to_status not in UPLOAD_STATUSES:
+            values.setdefault('thumbnail_path', None)
+            values.setdefault('page_count', None)
+        return values
+
+    def apply(self, permohonan_id, action, expected_version=None, **values):
+        """
+        Transisi satu permohonan (ikut transaksi session, caller yang commit)
+
+        Args:
+            expected_version: version yang dibaca/ditampilkan ke user; None = cek status saja
+
+        Returns:
+            (bool, error)
+        """
+        from_statuses, to_status, _ = PERMOHONAN_TRANSITIONS[action]
+        changed = self.permohonan_repo.compare_and_set(
+            permohonan_id,
+            from_statuses,
+            to_status,
+            expected_version,
+            **self._without_preview(action, self._with_timestamp(action, values))
+        )
+        if not changed:
+            return False, CONFLICT_MESSAGE
+        return True, None
+
+    def apply_many(self, action, rows):
+        """
+        Transisi banyak permohonan dalam satu bulk UPDATE
+
+        Args:
+            rows: [{'id': ..., 'version': ... (opsional), <kolom>: <nilai>}]
+
+        Returns:
+            list id yang berhasil bertransisi
+        """
+        from_statuses, to_status, _ = PERMOHONAN_TRANSITIONS[action]
+        rows = [self._without_preview(action, self._with_timestamp(action, dict(row))) for row in rows]
+        return self.permohonan_repo.bulk_transition(rows, list(from_statuses), to_status)
@@ -0,0 +1,86 @@
+from typing import Optional
+from app.repositories.search_repository import SearchRepository
+from app.models.permohonan_model import Permohonan, JenisPermohonan
+from app.models.user_model import User
+
+# type -> role yang boleh mencari
+SEARCH_TYPES = {
+    'permohonan': ('admin', 'dosen', 'mahasiswa'),
+    'dosen': ('admin', 'dosen', 'mahasiswa'),
+    'jenis_permohonan': ('admin', 'dosen', 'mahasiswa'),
+    'users': ('admin',),
+}
+
+MIN_TERM_LENGTH = 2
+MAX_PER_PAGE = 100
+
+
+class SearchService:
+    """Unified full-text search (ranked + paginated) dengan scoping per role"""
+
+    def __init__(self):
+        self.search_repo = SearchRepository()
+
+    @staticmethod
+    def _permohonan_filters(user):
+        # Mahasiswa hanya permohonan sendiri, dosen hanya yang ditujukan kepadanya
+        if user.role == 'mahasiswa':
+            return (Permohonan.id_mahasiswa == user.id,)
+        if user.role == 'dosen':
+            return (Permohonan.id_dosen == user.id,)
+        return ()
+
+    def _search_type(self, search_type, term, user, page, per_page):
+        if search_type == 'permohonan':
+            return self.search_repo.search_permohonan(term, self._permohonan_filters(user), page, per_page)
+        if search_type == 'dosen':
+            filters = () if user.role == 'admin' else (User.is_active.is_(True),)
+            return self.search_repo.search_dosen(term, filters, page, per_page)
+        if search_type == 'jenis_permohonan':
+            filters = () if user.role == 'admin' else (JenisPermohonan.is_active.is_(True),)
+            return self.search_repo.search_jenis_permohonan(term, filters, page, per_page)
+        return self.search_repo.search_users(term, (), page, per_page)
+
+    def search(self, term: str, user, types: Optional[list] = None, page: int = 1, per_page: int = 20):
+        """
+        Args:
+            types: subset SEARCH_TYPES; None = semua type yang boleh untuk role user
+
+        Returns:
+            ({type: {'items': [...], 'pagination': {...}}}, error)
+        """
+        term = (term or '').strip()
+        if len(term) < MIN_TERM_LENGTH:
+            return None, f"Search term must be at least {MIN_TERM_LENGTH} characters"
+
+        allowed = [name for name, roles in SEARCH_TYPES.items() if user.role in roles]
+        if types:
+            unknown = [name for name in types if name not in SEARCH_TYPES]
+            if unknown:
+                return None, f"Unknown search type: {', '.join(unknown)}"
+            forbidden = [name for name in types if name not in allowed]
+            if forbidden:
+                return None, f"Not allowed to search: {', '.join(forbidden)}"
+            allowed = types
+
+        page = max(page or 1, 1)
+        per_page = min(max(per_page or 20, 1), MAX_PER_PAGE)
+
+        try:
+            results = {}
+            for search_type in allowed:
+                result = self._search_type(search_type, term, user, page, per_page)
+                results[search_type] = {
+                    'items': result.items,
+                    'pagination': {
+                        'page': result.page,
+                        'per_page': result.per_page,
+                        'pages': result.pages,
+                        'total': result.total,
+                        'has_next': result.has_next,
+                        'has_prev': result.has_prev
+                    }
+                }
+            return results, None
+        except Exception as e:
+            return None, str(e)
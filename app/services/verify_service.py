@@ -0,0 +1,89 @@
+# services/verify_service.py
+import json
+from flask import current_app
+from app.repositories.permohonan_repository import PermohonanRepository
+from utils.qr_utils import verify_qr_signature_cached
+from utils.verify_cache import verify_cache
+
+
+class VerifyService:
+    """Service untuk verifikasi dokumen via QR code (endpoint publik)"""
+
+    def __init__(self):
+        self.permohonan_repo = PermohonanRepository()
+
+    def get_verify_detail(self, permohonan_id: str):
+        """
+        Ambil read model verifikasi (cached per permohonan_id)
+
+        Returns:
+            dict or None: read model dengan key tambahan 'qr_valid'
+                (True/False, atau None jika QR tidak punya signature)
+        """
+        cached = verify_cache.get(permohonan_id)
+        if cached is not None:
+            return cached
+
+        row = self.permohonan_repo.get_verify_projection(permohonan_id)
+        if not row:
+            return None
+
+        detail = self._build_read_model(row)
+        verify_cache.set(permohonan_id, detail)
+        return detail
+
+    def invalidate(self, *permohonan_ids):
+        """Dipanggil setelah status permohonan berubah"""
+        verify_cache.invalidate(*permohonan_ids)
+
+    def _build_read_model(self, row: dict) -> dict:
+        """Susun response verifikasi dari hasil projection"""
+        return {
+            'status_permohonan': row['status_permohonan'],
+            'qr_valid': self._check_qr_signature(row['permohonan_id'], row['qr_code_data']),
+            'response': {
+                'status': 'valid',
+                'permohonan_id': row['permohonan_id'],
+                'jenis_permohonan': {
+                    'id': row['jenis_id'],
+                    'nama': row['nama_jenis_permohonan']
+                } if row['jenis_id'] is not None else None,
+                'judul': row['judul'],
+                'deskripsi': row['deskripsi'],
+                'mahasiswa': {
+                    'nama': row['mahasiswa_nama'] or 'N/A',
+                    'nomor_induk': row['mahasiswa_nomor_induk'] or 'N/A',
+                    'program_studi': row['nama_prodi'] or 'N/A',
+                    'fakultas': row['nama_fakultas'] or 'N/A'
+                },
+                'dosen': {
+                    'nama': row['dosen_nama'] or 'N/A'
+                },
+                'signed_at': row['signed_at'].isoformat() if row['signed_at'] else None,
+                'created_at': row['created_at'].isoformat() if row['created_at'] else None
+            }
+        }
+
+    def _check_qr_signature(self, permohonan_id, qr_code_data):
+        """Parse qr_code_data sekali dan verifikasi HMAC (memoized)"""
+        if not qr_code_data:
+            return None
+
+        try:
+            qr_data = json.loads(qr_code_data)
+            signature = qr_data.get('signature')
+            if not signature:
+                return None
+
+            original_data = qr_data.get('data', {})
+            return verify_qr_signature_cached(
+                permohonan_id,
+                original_data.get('signed_at'),
+                original_data.get('signed_by'),
+                signature,
+                current_app.config['SECRET_KEY']
+            )
+        except Exception as e:
+            print(f"QR verification error: {e}")
+            # Continue without failing if QR verification has issues
+            return None
@@ -1,4 +1,9 @@
-from app.repositories.view_user_repository import ViewRepositoryDosen, ViewRepositoryMahasiswa
+import csv
+import io
+import json
+import base64
+from datetime import datetime
+from app.repositories.view_user_repository import ViewRepositoryDosen, ViewRepositoryMahasiswa, UserDirectoryRepository
 from typing import List
 
 class ViewUserService:
@@ -14,4 +19,186 @@ class ViewUserService:
     
     def get_all_mahasiswa(self) -> List:
         """Get all mahasiswa from view"""
-        return self.view_mahasiswa_repo.get_all_mahasiswa()
\ No newline at end of file
+        return self.view_mahasiswa_repo.get_all_mahasiswa()
+
+
+DIRECTORY_ROLES = ('admin', 'dosen', 'mahasiswa')
+DIRECTORY_MAX_LIMIT = 500
+DIRECTORY_EXPORT_BATCH = 1000
+DIRECTORY_DATETIME_FIELDS = ('created_at', 'last_login')
+
+# Kolom export CSV (urutan header)
+DIRECTORY_EXPORT_COLUMNS = (
+    'user_id', 'nomor_induk', 'nama', 'email', 'no_hp', 'role', 'is_active',
+    'fakultas_id', 'nama_fakultas', 'program_studi_id', 'nama_prodi', 'semester',
+    'gelar_depan', 'gelar_belakang', 'jabatan', 'created_at', 'last_login',
+)
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class UserDirectoryService:
+    """
+    Query API directory user untuk admin: filter, sort, keyset paging
+    (cursor opaque) dan export NDJSON/CSV yang di-stream
+    """
+
+    def __init__(self):
+        self.directory_repo = UserDirectoryRepository()
+
+    @staticmethod
+    def _parse_int(args, name):
+        value = args.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be an integer")
+
+    def parse_query(self, args):
+        """
+        Validasi query params (role, is_active, fakultas_id, program_studi_id,
+        semester, sort, order)
+
+        Returns:
+            (dict query, error)
+        """
+        try:
+            role = args.get('role') or None
+            if role and role not in DIRECTORY_ROLES:
+                return None, f"role must be one of: {', '.join(DIRECTORY_ROLES)}"
+
+            is_active = args.get('is_active')
+            if is_active in (None, ''):
+                is_active = None
+            elif is_active.lower() in ('true', '1'):
+                is_active = True
+            elif is_active.lower() in ('false', '0'):
+                is_active = False
+            else:
+                return None, "is_active must be true or false"
+
+            sort = args.get('sort', 'nama')
+            if sort not in UserDirectoryRepository.SORT_FIELDS:
+                return None, f"sort must be one of: {', '.join(UserDirectoryRepository.SORT_FIELDS)}"
+
+            order = args.get('order', 'asc').lower()
+            if order not in ('asc', 'desc'):
+                return None, "order must be asc or desc"
+
+            filters = {
+                'role': role,
+                'is_active': is_active,
+                'fakultas_id': self._parse_int(args, 'fakultas_id'),
+                'program_studi_id': self._parse_int(args, 'program_studi_id'),
+                'semester': self._parse_int(args, 'semester'),
+            }
+            return {'filters': filters, 'sort': sort, 'descending': order == 'desc'}, None
+        except ValueError as e:
+            return None, str(e)
+
+    @staticmethod
+    def encode_cursor(sort, descending, value, user_id):
+        payload = json.dumps([sort, descending, _json_value(value), user_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor, sort, descending):
+        """
+        Returns:
+            (sort_value, user_id)
+        Raises:
+            ValueError: cursor rusak atau dibuat untuk sort/order lain
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            cursor_sort, cursor_desc, value, user_id = json.loads(base64.urlsafe_b64decode(padded))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if cursor_sort != sort or cursor_desc != descending:
+            raise ValueError("Cursor does not match sort/order")
+        if sort in DIRECTORY_DATETIME_FIELDS:
+            value = datetime.fromisoformat(value)
+        return value, user_id
+
+    def get_page(self, args):
+        """
+        Returns:
+            ({'items', 'next_cursor', 'limit'}, error)
+        """
+        query, error = self.parse_query(args)
+        if error:
+            return None, error
+
+        try:
+            limit = self._parse_int(args, 'limit') or 50
+        except ValueError as e:
+            return None, str(e)
+        limit = min(max(limit, 1), DIRECTORY_MAX_LIMIT)
+
+        sort, descending = query['sort'], query['descending']
+        after = None
+        if args.get('cursor'):
+            try:
+                after = self.decode_cursor(args['cursor'], sort, descending)
+            except ValueError as e:
+                return None, str(e)
+
+        items, has_more = self.directory_repo.get_page(query['filters'], sort, descending, limit, after)
+
+        next_cursor = None
+        if has_more:
+            last = items[-1]
+            _, null_value = UserDirectoryRepository.SORT_FIELDS[sort]
+            value = last[sort] if last[sort] is not None else null_value
+            next_cursor = self.encode_cursor(sort, descending, value, last['user_id'])
+
+        return {
+            'items': items,
+            'next_cursor': next_cursor,
+            'limit': limit
+        }, None
+
+    def export(self, args, export_format):
+        """
+        Returns:
+            (generator chunk str, error): generator di-stream langsung ke response
+        """
+        if export_format not in ('ndjson', 'csv'):
+            return None, "format must be ndjson or csv"
+
+        query, error = self.parse_query(args)
+        if error:
+            return None, error
+
+        rows = self.directory_repo.iter_rows(
+            query['filters'], query['sort'], query['descending'], DIRECTORY_EXPORT_BATCH
+        )
+        if export_format == 'ndjson':
+            return self._ndjson_chunks(rows), None
+        return self._csv_chunks(rows), None
+
+    @staticmethod
+    def _ndjson_chunks(rows):
+        for row in rows:
+            yield json.dumps({key: _json_value(value) for key, value in row.items()}) + '\n'
+
+    @staticmethod
+    def _csv_chunks(rows, rows_per_chunk=500):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(DIRECTORY_EXPORT_COLUMNS)
+
+        count = 0
+        for row in rows:
+            writer.writerow([_json_value(row[name]) for name in DIRECTORY_EXPORT_COLUMNS])
+            count += 1
+            if count % rows_per_chunk == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
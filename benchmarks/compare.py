@@ -0,0 +1,111 @@
+# benchmarks/compare.py
+"""
+Bandingkan dua file hasil benchmark (signing, repository, load test)
+
+    python -m benchmarks.compare baseline.json current.json
+    python -m benchmarks.compare baseline.json current.json --threshold 10 --metric p95_ms
+
+Exit code 1 jika ada metric yang regresi melebihi threshold (%), bisa dipakai di CI.
+"""
+import sys
+import json
+import argparse
+
+# Metric: True = makin besar makin baik
+METRICS = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'mean_ms': False,
+    'throughput_per_s': True,
+    'rps': True,
+    'error_rate': False,
+    'peak_rss_mb': False,
+    'rss_delta_mb': False,
+    'import_ms': False,
+    'modules': False,
+}
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    if 'results' not in payload:
+        raise SystemExit(f"{path}: not a benchmark result file")
+    return payload
+
+
+def change_pct(before, after):
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(baseline, current, metrics, threshold):
+    """
+    Returns:
+        (rows, regressions): rows = [(case, metric, before, after, pct, flag)]
+    """
+    rows = []
+    regressions = []
+    for case in sorted(set(baseline['results']) | set(current['results'])):
+        before_stats = baseline['results'].get(case)
+        after_stats = current['results'].get(case)
+        if before_stats is None or after_stats is None:
+            rows.append((case, '-', None, None, None, 'only in ' + ('current' if before_stats is None else 'baseline')))
+            continue
+
+        for metric in metrics:
+            if metric not in before_stats and metric not in after_stats:
+                continue
+            before, after = before_stats.get(metric), after_stats.get(metric)
+            pct = change_pct(before, after)
+            flag = ''
+            if pct is not None:
+                worse = -pct if METRICS.get(metric, False) else pct
+                if worse > threshold:
+                    flag = 'REGRESSION'
+                    regressions.append((case, metric, pct))
+                elif worse < -threshold:
+                    flag = 'improved'
+            rows.append((case, metric, before, after, pct, flag))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bandingkan dua hasil benchmark')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='batas regresi dalam persen (default 10)')
+    parser.add_argument('--metric', action='append', choices=sorted(METRICS),
+                        help='metric yang dibandingkan (boleh berulang), default semua yang ada')
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline.get('suite') != current.get('suite'):
+        print(f"⚠️ Comparing different suites: {baseline.get('suite')} vs {current.get('suite')}")
+
+    for label, payload in (('baseline', baseline), ('current', current)):
+        meta = payload.get('meta', {})
+        print(f"{label:>8}: {meta.get('created_at')} commit={meta.get('git_commit')} python={meta.get('python')}")
+    print()
+
+    rows, regressions = compare(baseline, current, args.metric or list(METRICS), args.threshold)
+
+    width = max([len(row[0]) for row in rows] + [4])
+    print(f"{'case':<{width}}  {'metric':<16}  {'baseline':>12}  {'current':>12}  {'change':>9}")
+    for case, metric, before, after, pct, flag in rows:
+        before_text = f"{before:>12}" if before is not None else f"{'-':>12}"
+        after_text = f"{after:>12}" if after is not None else f"{'-':>12}"
+        pct_text = f"{pct:>+8.1f}%" if pct is not None else f"{'-':>9}"
+        print(f"{case:<{width}}  {metric:<16}  {before_text}  {after_text}  {pct_text}  {flag}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold}%")
+        return 1
+    print(f"\n✅ No regression over {args.threshold}%")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# benchmarks/fixtures.py
+"""
+Fixture benchmark: app Flask dengan SQLite + storage lokal di folder sementara,
+serta PDF / gambar TTD yang di-generate deterministik dari seed
+"""
+import io
+import os
+import random
+import tempfile
+
+
+def bench_app(workdir=None, database_url=None, **config):
+    """
+    create_app('testing') dengan storage & database di workdir
+
+    Environment di-set sebelum import main karena config class membaca env saat import.
+
+    Returns:
+        (app, workdir)
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix='fti-bench-')
+    storage_root = os.path.join(workdir, 'storage')
+    env = {
+        'TEST_DATABASE_URL': database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'UPLOAD_FOLDER': os.path.join(storage_root, 'uploads'),
+        'QR_CODE_FOLDER': os.path.join(storage_root, 'uploads', 'qr_codes'),
+        'UPLOAD_SIGNED': os.path.join(storage_root, 'signed'),
+        'DOCUMENT_PERMOHONAN_TTD_PATH': os.path.join(storage_root, 'signed', 'permohonan_ttd'),
+        'UPLOAD_STAGING_FOLDER': os.path.join(storage_root, 'upload_staging'),
+        'STORAGE_BACKEND': 'local',
+        'PERF_LOG_ENABLED': 'False',
+    }
+    os.environ.update(env)
+
+    from main import create_app
+    app = create_app('testing')
+    app.config.update(config)
+    return app, workdir
+
+
+def signature_png(width=1200, height=600, seed=0):
+    """Coretan TTD sintetis (PNG, background putih seperti hasil scan)"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(img)
+    points = [(rng.randint(0, width), rng.randint(height // 4, height * 3 // 4)) for _ in range(40)]
+    draw.line(points, fill='black', width=max(2, width // 200))
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def scanned_page_jpeg(width=2480, height=3508, seed=0, quality=85):
+    """Halaman A4 300 dpi hasil scan (noise abu-abu + teks), JPEG"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.effect_noise((width, height), 12).point(lambda value: 200 + value % 56).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    for line in range(60):
+        y = 200 + line * 52
+        draw.rectangle([200, y, 200 + rng.randint(800, 2000), y + 18], fill=(40, 40, 40))
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def pdf_bytes(pages=1, scanned=False, seed=0):
+    """
+    PDF dokumen permohonan
+
+    Args:
+        pages: jumlah halaman
+        scanned: setiap halaman berisi satu gambar scan A4 (file besar)
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    page_width, page_height = A4
+
+    scan = ImageReader(io.BytesIO(scanned_page_jpeg(seed=seed))) if scanned else None
+    for page in range(pages):
+        if scan is not None:
+            pdf.drawImage(scan, 0, 0, width=page_width, height=page_height)
+        else:
+            pdf.setFont('Helvetica', 11)
+            y = page_height - 72
+            for line in range(40):
+                words = ' '.join(rng.choice(_WORDS) for _ in range(12))
+                pdf.drawString(72, y, words)
+                y -= 16
+        pdf.drawString(72, 40, f"Halaman {page + 1}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+_WORDS = (
+    'permohonan', 'mahasiswa', 'dosen', 'fakultas', 'teknologi', 'informasi',
+    'surat', 'keterangan', 'aktif', 'kuliah', 'semester', 'yudisium', 'transkip',
+    'nilai', 'program', 'studi', 'tanda', 'tangan', 'review', 'kaprodi',
+)
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+# Fixture file signing: nama -> generator (deterministik)
+SIGNING_FILES = {
+    'ttd.png': lambda: signature_png(),
+    'ttd_large.jpg': lambda: _jpeg(signature_png(3000, 1500)),
+    'single.pdf': lambda: pdf_bytes(1),
+    'many.pdf': lambda: pdf_bytes(60),
+    'scanned.pdf': lambda: pdf_bytes(5, scanned=True),
+    'upload.pdf': lambda: pdf_bytes(2, seed=1),
+}
+
+
+def _jpeg(png_data, quality=92):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(png_data)).convert('RGB').save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def default_fixture_dir():
+    return os.path.join(tempfile.gettempdir(), 'fti-bench-fixtures')
+
+
+def ensure_signing_files(folder=None):
+    """
+    Generate fixture file sekali (di proses parent) agar proses benchmark per
+    case hanya membaca file, bukan ikut menanggung memori generator
+
+    Returns:
+        dict nama -> path
+    """
+    folder = folder or default_fixture_dir()
+    paths = {}
+    for name, generate in SIGNING_FILES.items():
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            write_file(path, generate())
+        paths[name] = path
+    return paths
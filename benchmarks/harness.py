@@ -0,0 +1,219 @@
+# benchmarks/harness.py
+"""
+Utilitas bersama benchmark: pengukuran latency, percentile, RSS per case,
+isolasi per case (subprocess) dan penulisan hasil JSON
+"""
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+
+RESULT_SCHEMA_VERSION = 1
+
+
+def percentile(sorted_values, pct):
+    """Percentile dengan interpolasi linear (sorted_values sudah urut)"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize(samples, units=1):
+    """
+    Args:
+        samples: durasi per iterasi (detik)
+        units: item yang diproses per iterasi (misal jumlah dokumen batch)
+
+    Returns:
+        dict statistik dalam milidetik + throughput item/detik
+    """
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'iterations': len(ordered),
+        'units_per_iteration': units,
+        'total_s': round(total, 4),
+        'throughput_per_s': round(len(ordered) * units / total, 3) if total else None,
+        'mean_ms': round(total / len(ordered) * 1000, 3) if ordered else None,
+        'min_ms': round(ordered[0] * 1000, 3) if ordered else None,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p90_ms': round(percentile(ordered, 90) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else None,
+    }
+
+
+def _proc_status_mb(field):
+    """Nilai VmRSS / VmHWM dari /proc/self/status (MB), None jika bukan Linux"""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        return None
+    return None
+
+
+def current_rss_mb():
+    """RSS proses ini saat ini (MB), None jika tidak tersedia"""
+    return _proc_status_mb('VmRSS')
+
+
+def reset_peak_rss():
+    """
+    Reset high-water mark RSS (Linux: tulis '5' ke /proc/self/clear_refs)
+
+    Returns:
+        True jika berhasil; jika tidak, peak_rss_mb() tetap peak sejak proses mulai
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """High-water mark RSS proses ini (MB), sejak reset_peak_rss() terakhir jika didukung"""
+    peak = _proc_status_mb('VmHWM')
+    if peak is not None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 2)
+
+
+def measure(fn, iterations, warmup=1, setup=None, units=1, max_seconds=None):
+    """
+    Jalankan fn() sebanyak iterations (setelah warmup), setup() tidak ikut diukur
+
+    Args:
+        setup: dipanggil sebelum setiap iterasi, hasilnya dipassing ke fn(state)
+        max_seconds: berhenti lebih awal jika total durasi terukur melewati batas
+            (minimal satu sampel), untuk case yang lambat di data besar
+
+    Returns:
+        dict summarize() + peak_rss_mb (peak selama fn, tanpa setup/import) dan
+        rss_delta_mb (kenaikan peak di atas RSS setelah setup, maksimum antar iterasi;
+        None jika peak RSS tidak bisa di-reset)
+    """
+    memory = {'peak': None, 'delta': None}
+
+    def run_once():
+        state = setup() if setup else None
+        gc.collect()
+        baseline = current_rss_mb()
+        reset = reset_peak_rss()
+        started = time.perf_counter()
+        if setup:
+            fn(state)
+        else:
+            fn()
+        elapsed = time.perf_counter() - started
+        peak = peak_rss_mb()
+        memory['peak'] = max(memory['peak'] or 0, peak)
+        if reset and baseline is not None:
+            memory['delta'] = max(memory['delta'] or 0, round(peak - baseline, 2))
+        return elapsed
+
+    for _ in range(warmup):
+        run_once()
+    memory.update(peak=None, delta=None)
+
+    samples = []
+    while len(samples) < iterations:
+        samples.append(run_once())
+        if max_seconds is not None and sum(samples) >= max_seconds:
+            break
+    stats = summarize(samples, units)
+    stats['peak_rss_mb'] = memory['peak']
+    stats['rss_delta_mb'] = memory['delta']
+    return stats
+
+
+def run_isolated(module, case, extra_args=()):
+    """
+    Jalankan satu case di proses baru (python -m module --case ... --child-output file)
+    agar peak RSS tidak tercampur case lain
+
+    Returns:
+        dict hasil case (ditulis child ke file sementara, stdout app diabaikan)
+    """
+    fd, result_path = tempfile.mkstemp(prefix='bench-', suffix='.json')
+    os.close(fd)
+    try:
+        command = [sys.executable, '-m', module, '--case', case, '--child-output', result_path, *extra_args]
+        completed = subprocess.run(
+            command, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Case {case} failed:\n{completed.stderr[-4000:]}")
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment_meta(**extra):
+    meta = {
+        'created_at': datetime.utcnow().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+    meta.update(extra)
+    return meta
+
+
+def write_results(path, suite, results, **meta):
+    """
+    Format hasil (dibaca benchmarks.compare):
+        {"schema": 1, "suite": ..., "meta": {...}, "results": {case: {metric: value}}}
+    """
+    payload = {
+        'schema': RESULT_SCHEMA_VERSION,
+        'suite': suite,
+        'meta': environment_meta(**meta),
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return payload
+
+
+def print_table(results, columns=('p50_ms', 'p95_ms', 'p99_ms', 'throughput_per_s', 'rss_delta_mb')):
+    width = max([len(name) for name in results] + [4])
+    print(f"{'case':<{width}}  " + '  '.join(f"{column:>16}" for column in columns))
+    for name, stats in results.items():
+        cells = []
+        for column in columns:
+            value = stats.get(column)
+            cells.append(f"{value:>16}" if value is not None else f"{'-':>16}")
+        print(f"{name:<{width}}  " + '  '.join(cells))
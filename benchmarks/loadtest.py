@@ -0,0 +1,403 @@
+# benchmarks/loadtest.py
+"""
+Load test HTTP terhadap gunicorn lokal dengan data sintetis `flask seed-perf`
+
+    flask seed-perf --scale 0.01 --yes
+    python -m benchmarks.loadtest --start-server --workers 2 --workers 4 --duration 60
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:2224 --users mahasiswa=50,anon=100
+    python -m benchmarks.compare benchmarks/results/loadtest-w2-*.json benchmarks/results/loadtest-w4-*.json
+
+Skenario (closed loop, tiap virtual user satu thread dengan think time):
+    mahasiswa   poll GET /api/history/counts, sesekali POST /api/permohonan/ dengan upload PDF
+    dosen       GET /api/permohonan/dosen, sign satu dan batch-sign beberapa permohonan pending
+    admin       GET /api/admin/stats, /api/admin/users/directory, /api/admin/users/role/dosen
+    anon        GET /api/verify/<id> untuk dokumen yang sudah ditandatangani
+
+Token JWT dibuat langsung dari config app (JWT_SECRET_KEY yang sama dengan server),
+user & id permohonan diambil dari database yang sama (user @perf.invalid).
+
+Hasil per endpoint: requests, rps, p50/p95/p99, error_rate dan status code.
+--start-server menjalankan gunicorn sendiri; --workers / --env bisa diulang dan
+setiap kombinasi ditulis ke file hasil sendiri agar bisa dibandingkan.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timedelta
+from benchmarks import fixtures
+from benchmarks.harness import percentile, write_results, print_table
+
+SUITE = 'loadtest'
+
+DEFAULT_USERS = {'mahasiswa': 20, 'dosen': 5, 'admin': 2, 'anon': 20}
+
+# Default env server saat --start-server: load dari satu IP akan terkena rate limit verify
+DEFAULT_SERVER_ENV = {'RATE_LIMIT_ENABLED': 'False'}
+
+
+class EndpointStats:
+    """Latency & status code per endpoint (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}   # {label: [detik]}
+        self._status = {}    # {label: {status: count}}
+
+    def record(self, label, status, elapsed):
+        with self._lock:
+            self._samples.setdefault(label, []).append(elapsed)
+            statuses = self._status.setdefault(label, {})
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def summary(self, duration):
+        """
+        Returns:
+            dict {label: stats}, termasuk 'TOTAL' untuk semua endpoint
+        """
+        with self._lock:
+            samples = {label: list(values) for label, values in self._samples.items()}
+            statuses = {label: dict(values) for label, values in self._status.items()}
+
+        samples['TOTAL'] = [value for values in samples.values() for value in values]
+        totals = {}
+        for values in statuses.values():
+            for status, count in values.items():
+                totals[status] = totals.get(status, 0) + count
+        statuses['TOTAL'] = totals
+
+        results = {}
+        for label, values in samples.items():
+            ordered = sorted(values)
+            errors = sum(count for status, count in statuses[label].items() if _is_error(status))
+            results[label] = {
+                'requests': len(ordered),
+                'errors': errors,
+                'error_rate': round(errors / len(ordered), 4) if ordered else 0.0,
+                'rps': round(len(ordered) / duration, 2) if duration else None,
+                'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2) if ordered else None,
+                'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+                'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+                'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+                'max_ms': round(ordered[-1] * 1000, 2) if ordered else None,
+                'status': {str(status): count for status, count in sorted(statuses[label].items(), key=str)},
+            }
+        return results
+
+
+def _is_error(status):
+    # status 'exc' = koneksi gagal / timeout
+    return status == 'exc' or status >= 400
+
+
+class Dataset:
+    """User, token dan id permohonan sintetis dari database server"""
+
+    def __init__(self, sample_size=200, token_hours=4, seed=42):
+        self.rng = random.Random(seed)
+        self.sample_size = sample_size
+        self.token_hours = token_hours
+
+    def load(self):
+        from flask_jwt_extended import create_access_token
+        from sqlalchemy import select, func
+        from main import create_app
+        from extensions import db
+        from app.models import User, Dosen, Mahasiswa, Permohonan
+        from utils.perf_seed import PERF_EMAIL_DOMAIN
+
+        app = create_app()
+        with app.app_context():
+            perf_user = User.email.like(f"%@{PERF_EMAIL_DOMAIN}") & User.is_active.is_(True)
+
+            def sample(query):
+                return [tuple(row) for row in db.session.execute(query.limit(self.sample_size * 20))]
+
+            mahasiswa = sample(
+                select(User.id, Mahasiswa.fakultas_id).join(Mahasiswa, Mahasiswa.user_id == User.id).where(perf_user)
+            )
+            # Dosen dengan antrian pending terbanyak, agar sign / batch sign tidak cepat habis
+            dosen = sample(
+                select(User.id, Dosen.fakultas_id)
+                .join(Dosen, Dosen.user_id == User.id)
+                .join(Permohonan, Permohonan.id_dosen == User.id)
+                .where(perf_user, Dosen.ttd_path.isnot(None), Permohonan.status_permohonan == 'pending')
+                .group_by(User.id, Dosen.fakultas_id)
+                .order_by(func.count().desc())
+            )
+            admins = sample(select(User.id).where(perf_user, User.role == 'admin'))
+            verify_ids = sample(
+                select(Permohonan.id).where(Permohonan.status_permohonan == 'ditandatangani',
+                                            Permohonan.qr_code_data.isnot(None))
+            )
+            jenis_id = db.session.execute(select(func.min(Permohonan.id_jenis_permohonan))).scalar()
+
+            if not (mahasiswa and dosen and admins and verify_ids):
+                raise SystemExit("❌ Synthetic dataset not found, run `flask seed-perf` first")
+
+            expires = timedelta(hours=self.token_hours)
+            self.tokens = {
+                user_id: create_access_token(identity=user_id, expires_delta=expires)
+                for user_id, *_ in mahasiswa + dosen + admins
+            }
+        self.mahasiswa = mahasiswa
+        self.dosen = dosen
+        self.admins = [row[0] for row in admins]
+        self.verify_ids = [row[0] for row in verify_ids]
+        self.jenis_id = jenis_id
+        self.dosen_by_fakultas = {}
+        for user_id, fakultas_id in dosen:
+            self.dosen_by_fakultas.setdefault(fakultas_id, []).append(user_id)
+        return self
+
+
+class VirtualUser(threading.Thread):
+    """Satu user yang menjalankan skenario role-nya berulang sampai waktu habis"""
+
+    def __init__(self, runner, role, index):
+        super().__init__(daemon=True, name=f"{role}-{index}")
+        import requests
+
+        self.runner = runner
+        self.role = role
+        self.index = index
+        self.rng = random.Random(f"{runner.seed}-{role}-{index}")
+        self.session = requests.Session()
+
+    def auth(self, user_id):
+        self.session.headers['Authorization'] = f"Bearer {self.runner.dataset.tokens[user_id]}"
+
+    def request(self, method, path, label, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.runner.base_url + path, timeout=self.runner.timeout, **kwargs)
+            status = response.status_code
+        except Exception:
+            response, status = None, 'exc'
+        self.runner.stats.record(label, status, time.perf_counter() - started)
+        return response
+
+    def think(self):
+        if self.runner.think_ms:
+            self.runner.stop.wait(self.rng.expovariate(1000 / self.runner.think_ms))
+
+    def run(self):
+        scenario = getattr(self, f"scenario_{self.role}")
+        while not self.runner.stop.is_set():
+            scenario()
+            self.think()
+
+    # ===== SCENARIOS =====
+
+    def scenario_mahasiswa(self):
+        dataset = self.runner.dataset
+        user_id, fakultas_id = dataset.mahasiswa[self.index % len(dataset.mahasiswa)]
+        self.auth(user_id)
+        self.request('GET', '/api/history/counts', 'GET /api/history/counts')
+
+        if self.rng.random() < self.runner.create_ratio:
+            dosen_ids = dataset.dosen_by_fakultas.get(fakultas_id) or [dataset.dosen[0][0]]
+            self.request(
+                'POST', '/api/permohonan/', 'POST /api/permohonan/',
+                data={'id_jenis_permohonan': dataset.jenis_id, 'id_dosen': self.rng.choice(dosen_ids),
+                      'judul': 'Load test permohonan', 'deskripsi': 'dibuat oleh benchmarks.loadtest'},
+                files={'file': ('permohonan.pdf', self.runner.upload_pdf, 'application/pdf')},
+            )
+
+    def scenario_dosen(self):
+        dataset = self.runner.dataset
+        # Satu dosen per virtual user agar sign tidak saling bentrok (409)
+        user_id = dataset.dosen[self.index % len(dataset.dosen)][0]
+        self.auth(user_id)
+        response = self.request('GET', '/api/permohonan/dosen?status=pending', 'GET /api/permohonan/dosen')
+        if response is None or response.status_code != 200:
+            return
+
+        pending = [item for item in response.json().get('data') or [] if item.get('status_permohonan') == 'pending']
+        if not pending:
+            return
+
+        if self.rng.random() < self.runner.batch_ratio and len(pending) > 1:
+            batch = pending[:self.runner.batch_size]
+            self.request('POST', '/api/permohonan/batch-sign', 'POST /api/permohonan/batch-sign',
+                         json={'permohonan_ids': [item['id'] for item in batch]})
+        else:
+            item = pending[0]
+            self.request('POST', f"/api/permohonan/{item['id']}/sign", 'POST /api/permohonan/<id>/sign',
+                         json={'version': item.get('version')})
+
+    def scenario_admin(self):
+        dataset = self.runner.dataset
+        self.auth(dataset.admins[self.index % len(dataset.admins)])
+        self.request('GET', '/api/admin/stats', 'GET /api/admin/stats')
+        self.request('GET', '/api/admin/users/directory?limit=50&role=mahasiswa', 'GET /api/admin/users/directory')
+        self.request('GET', '/api/admin/users/role/dosen', 'GET /api/admin/users/role/dosen')
+
+    def scenario_anon(self):
+        permohonan_id = self.rng.choice(self.runner.dataset.verify_ids)
+        self.request('GET', f"/api/verify/{permohonan_id}", 'GET /api/verify/<id>')
+
+
+class LoadRunner:
+    def __init__(self, base_url, dataset, users, duration, think_ms=200, timeout=30,
+                 create_ratio=0.05, batch_ratio=0.3, batch_size=5, seed=42):
+        self.base_url = base_url.rstrip('/')
+        self.dataset = dataset
+        self.users = users
+        self.duration = duration
+        self.think_ms = think_ms
+        self.timeout = timeout
+        self.create_ratio = create_ratio
+        self.batch_ratio = batch_ratio
+        self.batch_size = batch_size
+        self.seed = seed
+        self.stats = EndpointStats()
+        self.stop = threading.Event()
+        with open(fixtures.ensure_signing_files()['upload.pdf'], 'rb') as f:
+            self.upload_pdf = f.read()
+
+    def run(self):
+        threads = [VirtualUser(self, role, index) for role, count in self.users.items() for index in range(count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        self.stop.wait(self.duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join(self.timeout)
+        return self.stats.summary(time.perf_counter() - started)
+
+
+class GunicornServer:
+    """gunicorn lokal (main:create_app() seperti Dockerfile) untuk satu konfigurasi"""
+
+    def __init__(self, workers, port, env=None, threads=1):
+        self.workers = workers
+        self.port = port
+        self.threads = threads
+        self.env = dict(os.environ, **DEFAULT_SERVER_ENV, **(env or {}))
+        self.process = None
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    def __enter__(self):
+        import requests
+
+        command = [
+            sys.executable, '-m', 'gunicorn', '-w', str(self.workers), '--threads', str(self.threads),
+            '-b', f"127.0.0.1:{self.port}", 'main:create_app()',
+        ]
+        self.process = subprocess.Popen(command, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {self.process.returncode}")
+            try:
+                requests.get(f"{self.base_url}/api/verify/healthcheck", timeout=2)
+                return self
+            except requests.ConnectionError:
+                time.sleep(0.5)
+        self.__exit__()
+        raise RuntimeError("gunicorn did not start within 60s")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def parse_users(text):
+    users = dict(DEFAULT_USERS)
+    if text:
+        users = {role: 0 for role in DEFAULT_USERS}
+        for part in text.split(','):
+            role, _, count = part.partition('=')
+            if role not in DEFAULT_USERS:
+                raise argparse.ArgumentTypeError(f"unknown role {role!r} (choices: {', '.join(DEFAULT_USERS)})")
+            users[role] = int(count)
+    return users
+
+
+def parse_env(values):
+    env = {}
+    for value in values or []:
+        key, _, val = value.partition('=')
+        env[key] = val
+    return env
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test HTTP dengan data sintetis seed-perf')
+    parser.add_argument('--base-url', default='http://127.0.0.1:2224', help='server yang sudah jalan (tanpa --start-server)')
+    parser.add_argument('--start-server', action='store_true', help='jalankan gunicorn sendiri per konfigurasi')
+    parser.add_argument('--workers', type=int, action='append', help='jumlah worker gunicorn (boleh berulang, default 1)')
+    parser.add_argument('--threads', type=int, default=1, help='thread per worker gunicorn')
+    parser.add_argument('--port', type=int, default=8055)
+    parser.add_argument('--env', action='append', metavar='KEY=VALUE', help='env tambahan untuk server (boleh berulang)')
+    parser.add_argument('--label', default='', help='label konfigurasi di nama file hasil')
+    parser.add_argument('--users', type=parse_users, default=dict(DEFAULT_USERS),
+                        help='virtual user per role, misal mahasiswa=50,dosen=5,admin=2,anon=100')
+    parser.add_argument('--duration', type=float, default=60, help='detik per run')
+    parser.add_argument('--warmup', type=float, default=5, help='detik warmup (tidak dihitung)')
+    parser.add_argument('--think-ms', type=float, default=200, help='rata-rata jeda antar iterasi per user')
+    parser.add_argument('--create-ratio', type=float, default=0.05, help='peluang mahasiswa membuat permohonan per iterasi')
+    parser.add_argument('--batch-ratio', type=float, default=0.3, help='peluang dosen batch sign (sisanya single sign)')
+    parser.add_argument('--batch-size', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output-dir', default=os.path.join('benchmarks', 'results'))
+    args = parser.parse_args(argv)
+
+    server_env = parse_env(args.env)
+    # Dataset dibaca dengan env yang sama dengan server (DATABASE_URL, JWT_SECRET_KEY)
+    os.environ.update(server_env)
+    dataset = Dataset(seed=args.seed).load()
+    print(f"👥 {len(dataset.mahasiswa)} mahasiswa, {len(dataset.dosen)} dosen, "
+          f"{len(dataset.admins)} admin, {len(dataset.verify_ids)} verify ids", file=sys.stderr)
+
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    runs = {}
+    for workers in (args.workers or [1]) if args.start_server else [None]:
+        name = '-'.join(part for part in ('loadtest', f"w{workers}" if workers else None, args.label, stamp) if part)
+
+        def load(base_url):
+            if args.warmup:
+                LoadRunner(base_url, dataset, args.users, args.warmup, args.think_ms, seed=args.seed + 1).run()
+            runner = LoadRunner(
+                base_url, dataset, args.users, args.duration, args.think_ms,
+                create_ratio=args.create_ratio, batch_ratio=args.batch_ratio,
+                batch_size=args.batch_size, seed=args.seed
+            )
+            return runner.run()
+
+        print(f"🚀 {name}: {sum(args.users.values())} users for {args.duration:.0f}s", file=sys.stderr)
+        if workers:
+            with GunicornServer(workers, args.port, server_env, args.threads) as server:
+                results = load(server.base_url)
+        else:
+            results = load(args.base_url)
+
+        output = os.path.join(args.output_dir, f"{name}.json")
+        write_results(
+            output, SUITE, results, workers=workers, threads=args.threads if workers else None,
+            server_env=server_env, users=args.users, duration_s=args.duration, think_ms=args.think_ms,
+            base_url=None if workers else args.base_url
+        )
+        print(f"\n== {name} ==")
+        print_table(results, columns=('requests', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'error_rate'))
+        print(f"📄 Results written to {output}")
+        runs[name] = results['TOTAL']
+
+    if len(runs) > 1:
+        print("\n== TOTAL per configuration ==")
+        print_table(runs, columns=('requests', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'error_rate'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
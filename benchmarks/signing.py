@@ -0,0 +1,221 @@
+# benchmarks/signing.py
+"""
+Benchmark pipeline tanda tangan dokumen
+
+    python -m benchmarks.signing                        # semua case, tiap case di proses sendiri
+    python -m benchmarks.signing --case qr --case batch_sign_10 --iterations 20
+    python -m benchmarks.signing --output benchmarks/results/baseline.json
+    python -m benchmarks.compare baseline.json current.json
+
+Case:
+    qr                      generate_qr_code
+    pdf_single_page         add_signature_to_pdf, 1 halaman teks
+    pdf_many_pages          add_signature_to_pdf, 60 halaman teks
+    pdf_scanned             add_signature_to_pdf, 5 halaman scan A4 300 dpi
+    pdf_review_notes        add_signature_to_pdf, jenis 'Review' (catatan tambahan)
+    signature_resize        save_and_resize_signature, upload JPEG 3000x1500
+    batch_sign_10 / _50     PermohonanService.batch_sign_permohonan end to end (SQLite)
+
+Throughput = item per detik (dokumen untuk batch_sign). Peak RSS per case
+hanya akurat jika case dijalankan terisolasi (default).
+"""
+import io
+import os
+import sys
+import json
+import uuid
+import argparse
+from datetime import datetime
+from benchmarks import fixtures
+from benchmarks.harness import measure, run_isolated, write_results, print_table
+
+SUITE = 'signing'
+
+# name: (iterations default, units per iterasi)
+CASES = {
+    'qr': (200, 1),
+    'pdf_single_page': (50, 1),
+    'pdf_many_pages': (20, 1),
+    'pdf_scanned': (10, 1),
+    'pdf_review_notes': (50, 1),
+    'signature_resize': (30, 1),
+    'batch_sign_10': (5, 10),
+    'batch_sign_50': (3, 50),
+}
+
+
+class SigningBench:
+    """Data & file fixture untuk satu proses benchmark"""
+
+    def __init__(self, fixture_dir=None):
+        self.files = fixtures.ensure_signing_files(fixture_dir)
+        self.app, self.workdir = fixtures.bench_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self._seed()
+
+    def _seed(self):
+        from werkzeug.datastructures import FileStorage
+        from extensions import db
+        from app.models import Fakultas, ProgramStudi, JenisPermohonan, User, Mahasiswa, Dosen
+        from utils.file_utils import save_and_resize_signature
+
+        db.create_all()
+        db.session.add(Fakultas(id=1, nama_fakultas='Fakultas Teknologi Informasi'))
+        db.session.add(ProgramStudi(id=1, fakultas_id=1, nama_prodi='Teknik Informatika'))
+        db.session.add(JenisPermohonan(id=1, nama_jenis_permohonan='Surat Keterangan', is_active=True))
+        db.session.add(JenisPermohonan(id=2, nama_jenis_permohonan='Review', is_active=True))
+        db.session.add(User(id='bench-dosen', nomor_induk='D0001', nama='Dosen Benchmark',
+                            email='dosen@bench.local', role='dosen', no_hp='0'))
+        db.session.add(User(id='bench-mhs', nomor_induk='672000001', nama='Mahasiswa Benchmark',
+                            email='mhs@bench.local', role='mahasiswa', no_hp='0'))
+        db.session.flush()
+
+        with open(self.files['ttd.png'], 'rb') as f:
+            ttd_path, error = save_and_resize_signature(FileStorage(stream=f, filename='ttd.png'))
+        if error:
+            raise RuntimeError(error)
+        db.session.add(Dosen(user_id='bench-dosen', fakultas_id=1, gelar_depan='Dr.',
+                             jabatan='Kaprodi', ttd_path=ttd_path))
+        db.session.add(Mahasiswa(user_id='bench-mhs', fakultas_id=1, program_studi_id=1, semester=7))
+        db.session.commit()
+
+        self.ttd_path = ttd_path
+        self.qr_file = self._qr_file()
+
+    def _qr_file(self):
+        from utils.storage import storage
+        from utils.qr_utils import generate_qr_code
+        filename, _, error = generate_qr_code({'signed_by': 'bench-dosen', 'signed_at': 'x'}, 'bench')
+        if error:
+            raise RuntimeError(error)
+        return os.path.join(storage.local_root('qr_codes'), filename)
+
+    # ===== CASES =====
+
+    def qr(self, iterations):
+        from utils.qr_utils import generate_qr_code
+        payload = {'signed_by': 'bench-dosen', 'signed_at': datetime.utcnow().isoformat(),
+                   'request_by': {'nama': 'Mahasiswa Benchmark', 'nomor_induk': '672000001'}}
+        return measure(lambda: generate_qr_code(payload, str(uuid.uuid4())), iterations)
+
+    def _sign_pdf(self, pdf_key, jenis, iterations):
+        from utils.pdf_utils import add_signature_to_pdf
+        output = os.path.join(self.workdir, 'out', pdf_key)
+
+        def run():
+            success, error = add_signature_to_pdf(
+                self.files[pdf_key], self.files['ttd.png'], self.qr_file, output,
+                'Dr. Dosen Benchmark', 'Kaprodi', jenis, '01/01/2025'
+            )
+            if not success:
+                raise RuntimeError(error)
+        return measure(run, iterations)
+
+    def pdf_single_page(self, iterations):
+        return self._sign_pdf('single.pdf', 'Surat Keterangan', iterations)
+
+    def pdf_many_pages(self, iterations):
+        return self._sign_pdf('many.pdf', 'Surat Keterangan', iterations)
+
+    def pdf_scanned(self, iterations):
+        return self._sign_pdf('scanned.pdf', 'Surat Keterangan', iterations)
+
+    def pdf_review_notes(self, iterations):
+        return self._sign_pdf('single.pdf', 'Review', iterations)
+
+    def signature_resize(self, iterations):
+        from werkzeug.datastructures import FileStorage
+        from utils.file_utils import save_and_resize_signature
+
+        with open(self.files['ttd_large.jpg'], 'rb') as f:
+            upload = f.read()
+
+        def run():
+            path, error = save_and_resize_signature(FileStorage(stream=io.BytesIO(upload), filename='ttd.jpg'))
+            if error:
+                raise RuntimeError(error)
+        return measure(run, iterations)
+
+    def _batch_sign(self, size, iterations):
+        from extensions import db
+        from app.models import Permohonan
+        from app.services.permohonan_service import PermohonanService
+        from utils.storage import storage
+
+        service = PermohonanService()
+        with open(self.files['upload.pdf'], 'rb') as f:
+            pdf_upload = f.read()
+
+        def setup():
+            ids = []
+            for _ in range(size):
+                permohonan_id = str(uuid.uuid4())
+                file_path = f"permohonan/bench_{permohonan_id}.pdf"
+                storage.put_bytes('uploads', file_path, pdf_upload, content_type='application/pdf')
+                db.session.add(Permohonan(
+                    id=permohonan_id, id_jenis_permohonan=1, id_mahasiswa='bench-mhs',
+                    id_dosen='bench-dosen', judul='Benchmark', status_permohonan='pending',
+                    file_path=file_path
+                ))
+                ids.append(permohonan_id)
+            db.session.commit()
+            return ids
+
+        def run(ids):
+            results, error = service.batch_sign_permohonan(ids, 'bench-dosen')
+            if error or results['failed']:
+                raise RuntimeError(error or results['failed'][:3])
+        return measure(run, iterations, setup=setup, units=size)
+
+    def batch_sign_10(self, iterations):
+        return self._batch_sign(10, iterations)
+
+    def batch_sign_50(self, iterations):
+        return self._batch_sign(50, iterations)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark pipeline tanda tangan dokumen')
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help='case (boleh berulang), default semua')
+    parser.add_argument('--iterations', type=int, help='override jumlah iterasi semua case')
+    parser.add_argument('--output', default=None, help='file JSON hasil (default benchmarks/results/signing-<waktu>.json)')
+    parser.add_argument('--no-isolate', action='store_true', help='semua case di satu proses (RSS tidak per case)')
+    parser.add_argument('--fixture-dir', default=fixtures.default_fixture_dir(), help='cache file fixture (PDF, TTD)')
+    parser.add_argument('--child-output', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    cases = args.case or list(CASES)
+    fixtures.ensure_signing_files(args.fixture_dir)
+    extra = ['--fixture-dir', args.fixture_dir]
+    if args.iterations:
+        extra += ['--iterations', str(args.iterations)]
+
+    if args.child_output:
+        name = cases[0]
+        bench = SigningBench(args.fixture_dir)
+        stats = getattr(bench, name)(args.iterations or CASES[name][0])
+        with open(args.child_output, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+        return 0
+
+    results = {}
+    bench = SigningBench(args.fixture_dir) if args.no_isolate else None
+    for name in cases:
+        print(f"⏱️  {name} ...", file=sys.stderr)
+        if bench is not None:
+            results[name] = getattr(bench, name)(args.iterations or CASES[name][0])
+        else:
+            results[name] = run_isolated('benchmarks.signing', name, extra)
+
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{SUITE}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    write_results(output, SUITE, results, isolated=not args.no_isolate)
+    print_table(results)
+    print(f"\n📄 Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
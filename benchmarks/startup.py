@@ -0,0 +1,184 @@
+# benchmarks/startup.py
+"""
+Benchmark cold start create_app (interpreter baru per iterasi, `python -X importtime`)
+
+    python -m benchmarks.startup                         # ukur + tabel package termahal
+    python -m benchmarks.startup --check                 # gagal (exit 1) jika startup regresi
+    python -m benchmarks.startup --check --baseline benchmarks/results/startup-baseline.json
+
+Case:
+    create_app      wall time proses `create_app('testing')` dari nol (p50/p95 ms)
+    imports         jumlah modul dan total waktu import (self time -X importtime)
+
+--check gagal jika:
+    - library berat (FORBIDDEN_AT_STARTUP) ter-import saat startup; library ini
+      harus di-import lazy di code path signing / QR / OAuth / scheduler
+    - jumlah modul melebihi --max-modules
+    - dengan --baseline: p50 create_app / import_ms regresi melebihi --threshold persen
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+from datetime import datetime
+from benchmarks.harness import summarize, write_results, print_table
+
+SUITE = 'startup'
+
+CHILD_CODE = "from benchmarks.fixtures import bench_app; bench_app()"
+
+# Tidak boleh ter-import oleh create_app (prefix nama modul)
+FORBIDDEN_AT_STARTUP = (
+    'reportlab', 'PyPDF2', 'PIL', 'qrcode', 'pypdfium2',
+    'google.auth', 'google.oauth2', 'apscheduler',
+)
+
+# Budget jumlah modul saat startup (906 saat budget ini dibuat), naikkan dengan sadar
+MODULE_BUDGET = 960
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(stderr):
+    """
+    Returns:
+        list (name, self_us, cumulative_us, depth) urut seperti output importtime
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return rows
+
+
+def import_chain(rows, index):
+    """Rantai importer modul rows[index] sampai top level (importtime mencetak child sebelum parent)"""
+    chain = [rows[index][0]]
+    depth = rows[index][3]
+    for name, _, _, row_depth in rows[index + 1:]:
+        if row_depth < depth:
+            chain.append(name)
+            depth = row_depth
+            if depth == 0:
+                break
+    return chain
+
+
+def run_once(cwd):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_CODE],
+        cwd=cwd, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"create_app failed:\n{completed.stderr[-4000:]}")
+    return elapsed, parse_importtime(completed.stderr)
+
+
+def top_packages(rows, limit=15):
+    totals = {}
+    for name, self_us, _, _ in rows:
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    ordered = sorted(totals.items(), key=lambda item: -item[1])[:limit]
+    return {package: round(us / 1000, 2) for package, us in ordered}
+
+
+def forbidden_imports(rows):
+    """
+    Returns:
+        {prefix: rantai import pertama yang memuatnya}
+    """
+    found = {}
+    for index, (name, _, _, _) in enumerate(rows):
+        for prefix in FORBIDDEN_AT_STARTUP:
+            if prefix not in found and (name == prefix or name.startswith(prefix + '.')):
+                found[prefix] = import_chain(rows, index)
+    return found
+
+
+def collect(iterations, cwd=None):
+    """
+    Jalankan create_app di proses baru sebanyak iterations (setelah satu warmup)
+
+    Returns:
+        (results, rows importtime iterasi terakhir)
+    """
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    run_once(cwd)  # warmup: .pyc & page cache
+
+    samples, import_ms, rows = [], [], []
+    for _ in range(iterations):
+        elapsed, rows = run_once(cwd)
+        samples.append(elapsed)
+        import_ms.append(sum(self_us for _, self_us, _, _ in rows) / 1000)
+
+    import_ms.sort()
+    results = {
+        'create_app': summarize(samples),
+        'imports': {'modules': len(rows), 'import_ms': round(import_ms[len(import_ms) // 2], 2)},
+    }
+    return results, rows
+
+
+def check(results, rows, max_modules=MODULE_BUDGET, baseline=None, threshold=20.0):
+    """
+    Returns:
+        list pesan kegagalan (kosong jika startup lolos)
+    """
+    failures = []
+    for prefix, chain in forbidden_imports(rows).items():
+        failures.append(f"{prefix} imported at startup: {' <- '.join(chain)}")
+    if results['imports']['modules'] > max_modules:
+        failures.append(f"{results['imports']['modules']} modules imported at startup (budget {max_modules})")
+    if baseline:
+        from benchmarks.compare import load, compare
+        _, regressions = compare(load(baseline), {'results': results}, ['p50_ms', 'import_ms'], threshold)
+        for case, metric, pct in regressions:
+            failures.append(f"{case} {metric} regressed {pct:+.1f}% vs baseline")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark cold start create_app')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--output', default=None, help='file JSON hasil (default benchmarks/results/startup-<waktu>.json)')
+    parser.add_argument('--check', action='store_true', help='exit 1 jika startup regresi')
+    parser.add_argument('--max-modules', type=int, default=MODULE_BUDGET)
+    parser.add_argument('--baseline', help='hasil startup sebelumnya untuk --check')
+    parser.add_argument('--threshold', type=float, default=20.0, help='batas regresi vs baseline dalam persen')
+    args = parser.parse_args(argv)
+
+    results, rows = collect(args.iterations)
+    packages = top_packages(rows)
+    forbidden = forbidden_imports(rows)
+
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{SUITE}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    write_results(output, SUITE, results, top_packages_ms=packages, forbidden=sorted(forbidden))
+    print_table({'create_app': results['create_app']}, columns=('p50_ms', 'p95_ms', 'min_ms', 'max_ms'))
+    print(f"\n📦 {results['imports']['modules']} modules, {results['imports']['import_ms']} ms import time")
+    for package, ms in packages.items():
+        print(f"   {package:<28} {ms:>8} ms")
+    print(f"\n📄 Results written to {output}")
+
+    if not args.check:
+        return 0
+
+    failures = check(results, rows, args.max_modules, args.baseline, args.threshold)
+    if failures:
+        print(f"\n❌ Startup check failed:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+    print("\n✅ Startup check passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
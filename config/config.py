@@ -1,5 +1,5 @@
 # config.py
-import os, pytz
+import os, pytz, tempfile
 from datetime import timedelta
 from decouple import config
 
@@ -36,13 +36,50 @@ class Config:
     UPLOAD_SIGNED = config('UPLOAD_SIGNED', default='storage/signed')
     DOCUMENT_PERMOHONAN_TTD_PATH = config('DOCUMENT_PERMOHONAN_TTD_PATH', default='storage/signed/permohonan_ttd')
     MAX_CONTENT_LENGTH = int(config('MAX_CONTENT_LENGTH', default=16777216))  # 16MB
+    UPLOAD_MAX_FILE_SIZE = config('UPLOAD_MAX_FILE_SIZE', default=MAX_CONTENT_LENGTH, cast=int)  # batas per file
+    # Sibling UPLOAD_FOLDER (bukan di dalamnya, agar upload setengah jadi tidak bisa diakses lewat /api/files/uploads)
+    # dan harus 1 filesystem dgn UPLOAD_FOLDER agar file bisa dipindah atomik
+    UPLOAD_STAGING_FOLDER = config(
+        'UPLOAD_STAGING_FOLDER',
+        default=os.path.join(os.path.dirname(os.path.normpath(UPLOAD_FOLDER)), 'upload_staging')
+    )
     ALLOWED_EXTENSIONS = set(config('ALLOWED_EXTENSIONS', default='pdf,doc,docx,jpg,jpeg,png').split(','))
     FRONTEND_URL = config('FRONTEND_URL', default='https://fti-service.netlify.app')
 
+    # File delivery: 'python' (stream dari worker), 'x-accel' (nginx), 'x-sendfile' (apache/lighttpd)
+    FILE_DELIVERY_MODE = config('FILE_DELIVERY_MODE', default='python')
+    FILE_ACCEL_UPLOADS_PREFIX = config('FILE_ACCEL_UPLOADS_PREFIX', default='/_protected/uploads')
+    FILE_ACCEL_SIGNED_PREFIX = config('FILE_ACCEL_SIGNED_PREFIX', default='/_protected/signed')
+    FILE_CACHE_MAX_AGE = config('FILE_CACHE_MAX_AGE', default=3600, cast=int)
+
+    # Thumbnail halaman pertama PDF upload (butuh pypdfium2, tanpa itu hanya page count)
+    PREVIEW_ENABLED = config('PREVIEW_ENABLED', default=True, cast=bool)
+    PREVIEW_WORKERS = config('PREVIEW_WORKERS', default=1, cast=int)
+    PREVIEW_THUMBNAIL_WIDTH = config('PREVIEW_THUMBNAIL_WIDTH', default=320, cast=int)  # pixel
+    PREVIEW_CACHE_MAX_AGE = config('PREVIEW_CACHE_MAX_AGE', default=86400, cast=int)    # detik
+
+    # Storage backend: 'local' (folder di atas) / 's3' (S3-compatible: AWS, MinIO)
+    STORAGE_BACKEND = config('STORAGE_BACKEND', default='local')
+    S3_BUCKET = config('S3_BUCKET', default='')
+    S3_ENDPOINT_URL = config('S3_ENDPOINT_URL', default='')        # misal http://minio:9000
+    S3_REGION = config('S3_REGION', default='us-east-1')
+    S3_ACCESS_KEY_ID = config('S3_ACCESS_KEY_ID', default='')
+    S3_SECRET_ACCESS_KEY = config('S3_SECRET_ACCESS_KEY', default='')
+    S3_KEY_PREFIX = config('S3_KEY_PREFIX', default='')
+    S3_ADDRESSING_STYLE = config('S3_ADDRESSING_STYLE', default='auto')   # 'path' untuk MinIO
+    S3_PRESIGN_EXPIRES = config('S3_PRESIGN_EXPIRES', default=300, cast=int)  # detik
+
     # Admin Email untuk maintenance report
     ADMIN_EMAIL = config('ADMIN_EMAIL', default='brilliancw06@gmail.com')
     
     # APScheduler Configuration
+    # Scheduler hanya start di proses server (gunicorn worker / python main.py), False = mati total
+    SCHEDULER_ENABLED = config('SCHEDULER_ENABLED', default=True, cast=bool)
+    # Satu scheduler saja: advisory lock Postgres (key) atau flock file (database lain)
+    SCHEDULER_LOCK_KEY = config('SCHEDULER_LOCK_KEY', default=728341, cast=int)
+    SCHEDULER_LOCK_FILE = config(
+        'SCHEDULER_LOCK_FILE', default=os.path.join(tempfile.gettempdir(), 'fti-service-scheduler.lock')
+    )
     SCHEDULER_API_ENABLED = True
     SCHEDULER_TIMEZONE = pytz.timezone('Asia/Jakarta')
 
@@ -59,6 +96,79 @@ class Config:
     EMAIL_BATCH_SIZE = 20          # Send 20 emails per batch
     MAX_EMAIL_WORKERS = 5          # Max 5 concurrent email threads
     MAX_BATCH_PERMOHONAN = 100     # Hard limit untuk safety
+    BATCH_SIGN_WORKERS = config('BATCH_SIGN_WORKERS', default=4, cast=int)  # worker signing (tanpa koneksi DB)
+
+    # Cache ImageReader TTD dosen (decode sekali per ttd_path)
+    SIGNATURE_CACHE_MAX_SIZE = config('SIGNATURE_CACHE_MAX_SIZE', default=64, cast=int)
+
+    # Verify (QR scan) read model cache
+    VERIFY_CACHE_TTL = config('VERIFY_CACHE_TTL', default=300, cast=int)            # detik
+    VERIFY_CACHE_MAX_SIZE = config('VERIFY_CACHE_MAX_SIZE', default=2048, cast=int)
+
+    # Rate limiting endpoint publik (format: 'capacity/period_seconds')
+    RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+    RATE_LIMIT_BACKEND = config('RATE_LIMIT_BACKEND', default='memory')   # 'memory' / 'database' (multi-worker)
+    RATE_LIMIT_TRUST_PROXY = config('RATE_LIMIT_TRUST_PROXY', default=False, cast=bool)
+    RATE_LIMIT_VERIFY_IP = config('RATE_LIMIT_VERIFY_IP', default='60/60')
+    RATE_LIMIT_CHECK_EMAIL_IP = config('RATE_LIMIT_CHECK_EMAIL_IP', default='10/60')
+    RATE_LIMIT_CHECK_EMAIL_EMAIL = config('RATE_LIMIT_CHECK_EMAIL_EMAIL', default='3/300')
+    RATE_LIMIT_RESEND_OTP_IP = config('RATE_LIMIT_RESEND_OTP_IP', default='10/60')
+    RATE_LIMIT_RESEND_OTP_EMAIL = config('RATE_LIMIT_RESEND_OTP_EMAIL', default='3/300')
+
+    # OTP store
+    OTP_STORE_BACKEND = config('OTP_STORE_BACKEND', default='memory')    # 'memory' / 'database' (multi-worker)
+    OTP_MAX_ENTRIES = config('OTP_MAX_ENTRIES', default=10000, cast=int)  # batas entry backend memory
+    OTP_MAX_ATTEMPTS = config('OTP_MAX_ATTEMPTS', default=5, cast=int)
+    # Data registrasi disimpan lebih lama dari kode OTP agar resend OTP tetap bisa setelah kadaluarsa
+    OTP_REGISTRATION_TTL_MINUTES = config('OTP_REGISTRATION_TTL_MINUTES', default=60, cast=int)
+    
+    # Instrumentasi per request (header Server-Timing + log JSON 'app.perf')
+    PERF_METRICS_ENABLED = config('PERF_METRICS_ENABLED', default=True, cast=bool)
+    PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default=True, cast=bool)
+    PERF_LOG_ENABLED = config('PERF_LOG_ENABLED', default=True, cast=bool)
+    PERF_LOG_MIN_DURATION_MS = config('PERF_LOG_MIN_DURATION_MS', default=0, cast=float)  # log hanya request >= ms ini
+
+    # Prometheus metrics (GET /metrics), multi-worker lihat gunicorn.conf.py
+    METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+    METRICS_AUTH_TOKEN = config('METRICS_AUTH_TOKEN', default='')  # kosong = tanpa auth (batasi lewat network)
+
+    # Detektor N+1 + budget query per endpoint (utils/query_budget.py)
+    QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='off')  # 'off' / 'warn' / 'raise'
+    QUERY_N_PLUS_ONE_THRESHOLD = config('QUERY_N_PLUS_ONE_THRESHOLD', default=3, cast=int)  # statement sama >= n kali
+    QUERY_BUDGET_DEFAULT = 15
+    # Budget per blueprint, override per endpoint dengan @query_budget(n)
+    QUERY_BUDGETS = {
+        'auth_manual': 8,
+        'google_auth': 8,
+        'users': 8,
+        'dosen': 6,
+        'permohonan': 12,
+        'fakultas': 2,
+        'jenis_permohonan': 4,
+        'files': 4,
+        'verify': 4,
+        'history': 6,
+        'admin': 8,
+        'search': 16,
+        'metrics': 1,
+    }
+
+    # Slow query log (opt-in), lihat GET /api/admin/slow-queries
+    SLOW_QUERY_LOG_ENABLED = config('SLOW_QUERY_LOG_ENABLED', default=False, cast=bool)
+    SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)
+    SLOW_QUERY_EXPLAIN = config('SLOW_QUERY_EXPLAIN', default=True, cast=bool)  # Postgres: EXPLAIN (ANALYZE, BUFFERS), SELECT saja
+    SLOW_QUERY_EXPLAIN_INTERVAL = config('SLOW_QUERY_EXPLAIN_INTERVAL', default=300, cast=int)  # detik, per fingerprint SQL
+    SLOW_QUERY_EXPLAIN_MAX_KEYS = config('SLOW_QUERY_EXPLAIN_MAX_KEYS', default=1000, cast=int)  # fingerprint yang diingat untuk interval EXPLAIN
+    SLOW_QUERY_LOG_PATH = config('SLOW_QUERY_LOG_PATH', default='storage/perf/slow_queries.jsonl')
+    SLOW_QUERY_LOG_MAX_BYTES = config('SLOW_QUERY_LOG_MAX_BYTES', default=5 * 1024 * 1024, cast=int)
+    SLOW_QUERY_LOG_BACKUPS = config('SLOW_QUERY_LOG_BACKUPS', default=3, cast=int)
+
+    # Profiling on-demand satu request (token dari POST /api/admin/profiles/token)
+    PROFILER_ENABLED = config('PROFILER_ENABLED', default=True, cast=bool)
+    PROFILER_TOKEN_TTL = config('PROFILER_TOKEN_TTL', default=600, cast=int)  # detik
+    PROFILER_INTERVAL_MS = config('PROFILER_INTERVAL_MS', default=5, cast=float)  # interval sampling
+    PROFILER_FOLDER = config('PROFILER_FOLDER', default='storage/perf/profiles')
+    PROFILER_MAX_PROFILES = config('PROFILER_MAX_PROFILES', default=50, cast=int)
     
     # Database Optimization
     SQLALCHEMY_ENGINE_OPTIONS = {
@@ -71,16 +181,19 @@ class Config:
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='warn')
 
 class ProductionConfig(Config):
     DEBUG = False
 
-# class TestingConfig(Config):
-#     TESTING = True
-#     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = config('TEST_DATABASE_URL', default='sqlite:///:memory:')
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # pool_size / max_overflow tidak berlaku untuk SQLite in-memory
+    QUERY_BUDGET_MODE = 'raise'
 
 config_dict = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
-    # 'testing': TestingConfig
+    'testing': TestingConfig
 }
\ No newline at end of file
@@ -6,6 +6,7 @@ from flask_marshmallow import Marshmallow
 from flask_cors import CORS
 from flask_mail import Mail
 from flask_bcrypt import Bcrypt
+import os
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -31,11 +32,87 @@ def init_extensions(app):
         allow_headers=["Content-Type", "Authorization"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS","PATCH"]
     )
+
+
+# Lock scheduler yang dipegang proses ini sampai exit (file / koneksi Postgres)
+_scheduler_lock = None
+
+
+def _acquire_scheduler_lock(app):
+    """
+    Pastikan hanya satu proses yang menjalankan scheduler
+
+    Postgres: pg_try_advisory_lock di koneksi khusus (berlaku untuk semua worker
+    dan semua host yang memakai database yang sama). Database lain: flock
+    non-blocking pada SCHEDULER_LOCK_FILE (semua worker di host yang sama).
+    Lock lepas otomatis saat proses mati, worker pengganti bisa mengambilnya.
+
+    Returns:
+        True jika lock didapat
+    """
+    global _scheduler_lock
+    if _scheduler_lock is not None:
+        return True
+
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy import text
+        conn = db.engine.connect()
+        acquired = conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {'key': app.config['SCHEDULER_LOCK_KEY']}
+        ).scalar()
+        conn.commit()
+        if not acquired:
+            conn.close()
+            return False
+        _scheduler_lock = conn
+        return True
+
+    try:
+        import fcntl
+    except ImportError:
+        # Tanpa fcntl (Windows, development): tidak ada koordinasi antar proses
+        _scheduler_lock = True
+        return True
+
+    lock_file = open(app.config['SCHEDULER_LOCK_FILE'], 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _scheduler_lock = lock_file
+    return True
+
+
+def start_schedulers(app):
+    """
+    Jalankan APScheduler (notifikasi mingguan + maintenance)
+
+    Hanya dipanggil dari proses server (hook post_worker_init gunicorn.conf.py,
+    `python main.py`), bukan dari create_app, agar `flask db upgrade`, shell,
+    CLI dan benchmark tidak memulai thread scheduler (dan tidak meng-import
+    apscheduler). Dengan banyak worker, hanya pemegang lock scheduler yang
+    menjalankan job (lihat _acquire_scheduler_lock).
+
+    Returns:
+        True jika scheduler dijalankan
+    """
+    if not app.config['SCHEDULER_ENABLED']:
+        print("⏸️  Schedulers disabled (SCHEDULER_ENABLED=False)")
+        return False
+
+    with app.app_context():
+        acquired = _acquire_scheduler_lock(app)
+    if not acquired:
+        print(f"⏸️  Schedulers already running in another process (pid {os.getpid()} skipped)")
+        return False
+
     from utils.scheduler_utils import start_scheduler
     start_scheduler(app)
 
     from utils.maintenance_utils import start_maintenance_scheduler
     start_maintenance_scheduler(app)
+    return True
 
 
         
@@ -0,0 +1,32 @@
+# gunicorn.conf.py
+# Dibaca otomatis oleh gunicorn dari working directory (/app di Docker)
+import os
+import shutil
+
+# prometheus_client multiprocess mode: setiap worker menulis metric ke file
+# di direktori ini, GET /metrics menggabungkan semua worker.
+# Harus di-set sebelum worker meng-import prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+
+
+def on_starting(server):
+    # Buang file metric dari run sebelumnya
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def post_worker_init(worker):
+    # Scheduler hanya di worker gunicorn, bukan di setiap create_app (CLI, migration, shell)
+    # Semua worker mencoba, hanya pemegang lock scheduler yang benar-benar menjalankan job
+    from extensions import start_schedulers
+    start_schedulers(worker.wsgi)
+
+
+def child_exit(server, worker):
+    # Gauge 'livesum' worker yang mati tidak ikut dihitung lagi
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -11,14 +11,62 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config_dict[config_name])
+
+    # Upload ditulis langsung ke staging folder (hash + size limit per chunk)
+    from utils.upload_stream import IngestRequest
+    app.request_class = IngestRequest
     
-    # Initialize extensions
+    # Initialize extensions (pool engine di-instrument untuk /metrics)
+    from utils.metrics import metrics
+    metrics.configure_engine_options(app)
     init_extensions(app)
+    metrics.init_app(app)
     from app import models
 
-    # Create upload directories
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-    os.makedirs(app.config['QR_CODE_FOLDER'], exist_ok=True)
+    # Configure verify (QR scan) cache
+    from utils.verify_cache import verify_cache
+    verify_cache.configure(
+        max_size=app.config['VERIFY_CACHE_MAX_SIZE'],
+        ttl_seconds=app.config['VERIFY_CACHE_TTL']
+    )
+
+    # Cache ImageReader TTD untuk signing PDF
+    from utils.signature_cache import signature_cache
+    signature_cache.configure(max_size=app.config['SIGNATURE_CACHE_MAX_SIZE'])
+
+    # Rate limiter backend (memory / database)
+    from utils.rate_limit_utils import rate_limiter
+    rate_limiter.init_app(app)
+
+    # OTP store backend (memory / database)
+    from utils.otp_cache import otp_cache
+    otp_cache.init_app(app)
+
+    # Per-request timing, DB time dan query count
+    from utils.request_metrics import request_metrics
+    request_metrics.init_app(app)
+
+    # Detektor N+1 / budget query per endpoint (development & testing)
+    from utils.query_budget import query_budget_guard
+    query_budget_guard.init_app(app)
+
+    # Slow query log + EXPLAIN (opt-in)
+    from utils.slow_query_log import slow_query_log
+    slow_query_log.init_app(app)
+
+    # Profiling on-demand (admin, token bertanda tangan)
+    from utils.request_profiler import request_profiler
+    request_profiler.init_app(app)
+
+    # Storage driver (local / s3)
+    from utils.storage import storage
+    storage.init_app(app)
+
+    # Create upload directories (staging selalu lokal)
+    if app.config['STORAGE_BACKEND'] == 'local':
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        os.makedirs(app.config['QR_CODE_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['UPLOAD_STAGING_FOLDER'], exist_ok=True)
     
     # Register blueprints
     from app.controllers.auth_manual_controller import auth_manual_bp
@@ -68,6 +116,19 @@ def create_app(config_name=None):
     # admin get history
     from app.controllers.admin_controller import admin_bp
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+
+    # unified full-text search
+    from app.controllers.search_controller import search_bp
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+
+    # Prometheus scrape endpoint
+    if app.config['METRICS_ENABLED']:
+        from app.controllers.metrics_controller import metrics_bp
+        app.register_blueprint(metrics_bp, url_prefix='/metrics')
+    
+    # Flask CLI commands (flask search-index, dst)
+    from app.commands import register_commands
+    register_commands(app)
     
     # Error handlers
     from utils.error_handlers import register_error_handlers
@@ -77,6 +138,10 @@ def create_app(config_name=None):
 
 if __name__ == '__main__':
     app = create_app()
+    # Dengan reloader, scheduler hanya di proses child yang melayani request
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from extensions import start_schedulers
+        start_schedulers(app)
     app.run(debug=True, host='0.0.0.0', port=4000)
 
 
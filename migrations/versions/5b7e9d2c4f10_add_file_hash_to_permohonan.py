@@ -0,0 +1,26 @@
+"""add file hash to permohonan
+
+Revision ID: 5b7e9d2c4f10
+Revises: 8c2d4e6f1a93
+Create Date: 2026-10-19 10:48:05.226741
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e9d2c4f10'
+down_revision = '8c2d4e6f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('permohonan', sa.Column('file_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_permohonan_file_hash', 'permohonan', ['file_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_permohonan_file_hash', table_name='permohonan')
+    op.drop_column('permohonan', 'file_hash')
@@ -0,0 +1,34 @@
+"""create otp codes
+
+Revision ID: 8c2d4e6f1a93
+Revises: 3f9a1c7e5b21
+Create Date: 2026-10-19 10:02:47.115390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2d4e6f1a93'
+down_revision = '3f9a1c7e5b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('otp_codes',
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('otp_hash', sa.String(length=64), nullable=False),
+    sa.Column('registration_data', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('email')
+    )
+    op.create_index('ix_otp_codes_expires_at', 'otp_codes', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_otp_codes_expires_at', table_name='otp_codes')
+    op.drop_table('otp_codes')
@@ -0,0 +1,34 @@
+"""create file blobs
+
+Revision ID: a4c6e8f0b2d5
+Revises: 5b7e9d2c4f10
+Create Date: 2026-10-19 11:31:52.670214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c6e8f0b2d5'
+down_revision = '5b7e9d2c4f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('file_blobs',
+    sa.Column('store', sa.String(length=20), nullable=False),
+    sa.Column('path', sa.String(length=255), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('store', 'path')
+    )
+    op.create_index('ix_file_blobs_sha256', 'file_blobs', ['sha256'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_file_blobs_sha256', table_name='file_blobs')
+    op.drop_table('file_blobs')
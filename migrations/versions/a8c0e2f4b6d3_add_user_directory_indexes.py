@@ -0,0 +1,31 @@
+"""add user directory indexes
+
+Revision ID: a8c0e2f4b6d3
+Revises: f3b5d7e9a1c2
+Create Date: 2026-10-19 16:48:27.903114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c0e2f4b6d3'
+down_revision = 'f3b5d7e9a1c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset paging directory admin: filter role + urut nama (id sebagai tie-breaker)
+    op.create_index('ix_users_role_nama_id', 'users', ['role', 'nama', 'id'], unique=False)
+    op.create_index('ix_mahasiswa_prodi_semester', 'mahasiswa', ['program_studi_id', 'semester'], unique=False)
+    op.create_index('ix_mahasiswa_fakultas_id', 'mahasiswa', ['fakultas_id'], unique=False)
+    op.create_index('ix_dosen_fakultas_id', 'dosen', ['fakultas_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_dosen_fakultas_id', table_name='dosen')
+    op.drop_index('ix_mahasiswa_fakultas_id', table_name='mahasiswa')
+    op.drop_index('ix_mahasiswa_prodi_semester', table_name='mahasiswa')
+    op.drop_index('ix_users_role_nama_id', table_name='users')
@@ -0,0 +1,26 @@
+"""add preview columns to permohonan
+
+Revision ID: c7d9f1a3e5b8
+Revises: a4c6e8f0b2d5
+Create Date: 2026-10-19 14:05:12.408117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d9f1a3e5b8'
+down_revision = 'a4c6e8f0b2d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('permohonan', sa.Column('page_count', sa.Integer(), nullable=True))
+    op.add_column('permohonan', sa.Column('thumbnail_path', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    op.drop_column('permohonan', 'thumbnail_path')
+    op.drop_column('permohonan', 'page_count')
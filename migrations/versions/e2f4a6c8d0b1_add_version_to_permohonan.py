@@ -0,0 +1,24 @@
+"""add version to permohonan
+
+Revision ID: e2f4a6c8d0b1
+Revises: c7d9f1a3e5b8
+Create Date: 2026-10-19 15:32:40.117284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f4a6c8d0b1'
+down_revision = 'c7d9f1a3e5b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('permohonan', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('permohonan', 'version')
@@ -0,0 +1,74 @@
+"""add full-text search indexes
+
+Revision ID: f3b5d7e9a1c2
+Revises: e2f4a6c8d0b1
+Create Date: 2026-10-19 16:05:12.540391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b5d7e9a1c2'
+down_revision = 'e2f4a6c8d0b1'
+branch_labels = None
+depends_on = None
+
+# Harus sama dengan utils/search_index.py (SEARCH_DOCUMENTS)
+SEARCH_DOCUMENTS = {
+    'permohonan': ('judul', 'deskripsi'),
+    'users': ('nama', 'nomor_induk', 'email'),
+    'jenis_permohonan': ('nama_jenis_permohonan', 'deskripsi'),
+}
+
+
+def _tsvector(columns):
+    body = " || ' ' || ".join(f"coalesce({name}, '')" for name in columns)
+    return f"to_tsvector('simple', {body})"
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    for table, columns in SEARCH_DOCUMENTS.items():
+        if dialect == 'postgresql':
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin (({_tsvector(columns)}))")
+
+        elif dialect == 'sqlite':
+            fts = f"{table}_fts"
+            cols = ', '.join(columns)
+            new_cols = ', '.join(f"new.{name}" for name in columns)
+            old_cols = ', '.join(f"old.{name}" for name in columns)
+            op.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{cols}, content='{table}', tokenize='unicode61 remove_diacritics 2')"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols}); "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols}); END"
+            )
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    for table in SEARCH_DOCUMENTS:
+        if dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search")
+
+        elif dialect == 'sqlite':
+            fts = f"{table}_fts"
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
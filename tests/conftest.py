@@ -0,0 +1,110 @@
+# tests/conftest.py
+import os
+import tempfile
+from datetime import datetime, timedelta
+import pytest
+
+# Config class membaca env saat import: storage & database di-set sebelum import main
+_STORAGE_ROOT = tempfile.mkdtemp(prefix='fti-test-')
+os.environ.update({
+    'TEST_DATABASE_URL': os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:'),
+    'UPLOAD_FOLDER': os.path.join(_STORAGE_ROOT, 'uploads'),
+    'QR_CODE_FOLDER': os.path.join(_STORAGE_ROOT, 'uploads', 'qr_codes'),
+    'UPLOAD_SIGNED': os.path.join(_STORAGE_ROOT, 'signed'),
+    'DOCUMENT_PERMOHONAN_TTD_PATH': os.path.join(_STORAGE_ROOT, 'signed', 'permohonan_ttd'),
+    'UPLOAD_STAGING_FOLDER': os.path.join(_STORAGE_ROOT, 'upload_staging'),
+    'PROFILER_FOLDER': os.path.join(_STORAGE_ROOT, 'profiles'),
+    'STORAGE_BACKEND': 'local',
+    'PERF_LOG_ENABLED': 'False',
+    'RATE_LIMIT_ENABLED': 'False',
+})
+
+pytest_plugins = ['tests.pytest_query_budget']
+
+STATUSES = ('pending', 'disetujui', 'ditolak', 'ditandatangani', 'selesai')
+
+
+@pytest.fixture
+def app():
+    """create_app('testing'): SQLite in-memory, QUERY_BUDGET_MODE = 'raise'"""
+    from main import create_app
+    from extensions import db
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        _seed(db)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def tokens(app):
+    """Header Authorization per user id seed"""
+    from flask_jwt_extended import create_access_token, create_refresh_token
+
+    with app.app_context():
+        def headers(user_id, refresh=False):
+            token = create_refresh_token(identity=user_id) if refresh else create_access_token(identity=user_id)
+            return {'Authorization': f"Bearer {token}"}
+        return {
+            'admin': headers('admin-1'),
+            'dosen': headers('dosen-1'),
+            'mahasiswa': headers('mhs-1'),
+            'refresh': headers('mhs-1', refresh=True),
+        }
+
+
+def _seed(db):
+    """
+    Data kecil tapi cukup beragam untuk memicu N+1: beberapa fakultas, prodi,
+    dosen dan mahasiswa, permohonan di semua status
+    """
+    from app.models import Fakultas, ProgramStudi, JenisPermohonan, User, Mahasiswa, Dosen, Permohonan
+    from utils.password_utils import hash_password
+
+    for fakultas_id in (1, 2):
+        db.session.add(Fakultas(id=fakultas_id, nama_fakultas=f"Fakultas {fakultas_id}"))
+    for prodi_id in range(1, 7):
+        db.session.add(ProgramStudi(id=prodi_id, fakultas_id=1 + prodi_id % 2, nama_prodi=f"Prodi {prodi_id}"))
+    for jenis_id in range(1, 5):
+        db.session.add(JenisPermohonan(id=jenis_id, nama_jenis_permohonan=f"Jenis {jenis_id}", is_active=True))
+
+    db.session.add(User(id='admin-1', nomor_induk='A0001', nama='Admin', email='admin@test.local',
+                        role='admin', no_hp='0'))
+    for index in range(1, 5):
+        user_id = f"dosen-{index}"
+        db.session.add(User(id=user_id, nomor_induk=f"D{index:04d}", nama=f"Dosen {index}",
+                            email=f"{user_id}@test.local", role='dosen', no_hp='0'))
+        db.session.add(Dosen(user_id=user_id, fakultas_id=1 + index % 2, gelar_depan='Dr.',
+                             gelar_belakang='Ph.D.' if index == 2 else 'M.Kom.', jabatan='Dosen', ttd_path=f"signatures/{user_id}.png"))
+    for index in range(1, 9):
+        user_id = f"mhs-{index}"
+        db.session.add(User(id=user_id, nomor_induk=f"6720{index:05d}", nama=f"Mahasiswa {index}",
+                            email=f"{user_id}@test.local", role='mahasiswa', no_hp='0',
+                            password=hash_password('rahasia123') if index == 1 else None))
+        prodi_id = 1 + (index - 1) % 6
+        db.session.add(Mahasiswa(user_id=user_id, fakultas_id=1 + prodi_id % 2,
+                                 program_studi_id=prodi_id, semester=1 + index % 14))
+    db.session.flush()
+
+    created = datetime(2025, 1, 1)
+    for index in range(40):
+        db.session.add(Permohonan(
+            id=f"permohonan-{index:03d}",
+            id_jenis_permohonan=1 + index % 4,
+            # mhs-1 dan dosen-1 mendapat banyak permohonan dengan relasi berbeda-beda
+            id_mahasiswa=f"mhs-{1 + index % 8}" if index % 2 else 'mhs-1',
+            id_dosen='dosen-1' if index % 3 else f"dosen-{1 + index % 4}",
+            judul=f"Permohonan {index}",
+            status_permohonan=STATUSES[index % len(STATUSES)] if index >= 10 else 'pending',
+            created_at=created + timedelta(days=index),
+        ))
+    db.session.commit()
@@ -0,0 +1,80 @@
+# tests/pytest_query_budget.py
+"""
+Fixture pytest untuk budget query / deteksi N+1
+
+Aktifkan di conftest.py:
+
+    pytest_plugins = ['tests.pytest_query_budget']
+
+    @pytest.fixture
+    def app():
+        return create_app('testing')   # QUERY_BUDGET_MODE = 'raise'
+
+Dengan config 'testing', setiap request test client otomatis dicek terhadap
+@query_budget / QUERY_BUDGETS. Untuk ceiling eksplisit di dalam test:
+
+    def test_list_dosen(client, max_queries, dosen_headers):
+        with max_queries(6):
+            client.get('/api/permohonan/dosen', headers=dosen_headers)
+
+    def test_endpoint_budget(client, endpoint_budget, dosen_headers):
+        endpoint_budget(client.get, '/api/permohonan/dosen', headers=dosen_headers)
+"""
+from contextlib import contextmanager
+import pytest
+from utils.query_budget import capture_queries, query_budget_guard
+
+
+def _fail(problems, log):
+    details = '\n'.join(f"  {key}" for key, _ in log.statements)
+    pytest.fail('Query budget violated: ' + '; '.join(problems) + '\nStatements:\n' + details, pytrace=False)
+
+
+@pytest.fixture
+def query_log():
+    """QueryLog semua query selama test"""
+    with capture_queries() as log:
+        yield log
+
+
+@pytest.fixture
+def max_queries():
+    """
+    Factory context manager: gagal jika blok melebihi n query atau memicu N+1
+    (n=None = hanya cek N+1)
+    """
+    @contextmanager
+    def _max_queries(n=None, n_plus_one_threshold=3):
+        with capture_queries() as log:
+            yield log
+        problems = log.violations(n, n_plus_one_threshold)
+        if problems:
+            _fail(problems, log)
+
+    return _max_queries
+
+
+@pytest.fixture
+def endpoint_budget(app):
+    """
+    Panggil endpoint lewat test client dan assert terhadap budget yang
+    dideklarasikan (@query_budget, QUERY_BUDGETS, QUERY_BUDGET_DEFAULT)
+
+    Returns:
+        fungsi (client_method, url, **kwargs) -> response
+    """
+    def _call(client_method, url, **kwargs):
+        with capture_queries() as log:
+            response = client_method(url, **kwargs)
+
+        method = client_method.__name__.upper()
+        adapter = app.url_map.bind('localhost')
+        endpoint, _ = adapter.match(url.split('?', 1)[0], method=method)
+        with app.app_context():
+            budget = query_budget_guard.budget_for(endpoint)
+        problems = log.violations(budget, app.config.get('QUERY_N_PLUS_ONE_THRESHOLD', 3))
+        if problems:
+            _fail([f"{method} {url} ({endpoint})"] + problems, log)
+        return response
+
+    return _call
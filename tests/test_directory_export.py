@@ -0,0 +1,27 @@
+# tests/test_directory_export.py
+import json
+from app.repositories.view_user_repository import UserDirectoryRepository
+
+
+def test_iter_rows_releases_connection_between_batches(app):
+    from extensions import db
+
+    with app.app_context():
+        in_transaction = []
+        rows = []
+        for row in UserDirectoryRepository().iter_rows({}, batch_size=3):
+            # Consumer (response stream) berjalan tanpa transaksi / koneksi terbuka
+            in_transaction.append(db.session().in_transaction())
+            rows.append(row)
+
+    assert len(rows) == 13
+    assert len({row['user_id'] for row in rows}) == 13
+    assert not any(in_transaction)
+
+
+def test_export_ndjson_streams_all_users(client, tokens):
+    response = client.get('/api/admin/users/directory/export?format=ndjson', headers=tokens['admin'])
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 13
@@ -0,0 +1,22 @@
+# tests/test_email_utils.py
+from unittest.mock import patch
+from utils.email_utils import send_batch_rejected_email_sync
+
+
+def test_batch_rejected_email_escapes_user_content(app):
+    permohonan = [{
+        'judul': '<script>alert(1)</script>',
+        'jenis': 'Surat <b>Aktif</b>',
+        'komentar_penolakan': 'Lampiran <img src=x onerror=alert(1)> kurang',
+    }]
+
+    with app.app_context(), patch('utils.email_utils.mail.send') as send:
+        ok, error = send_batch_rejected_email_sync('mhs@student.uksw.edu', 'Mhs <i>', 'Dosen & Co', permohonan)
+
+    assert (ok, error) == (True, None)
+    message = send.call_args.args[0]
+    assert '<script>' not in message.html and '&lt;script&gt;alert(1)&lt;/script&gt;' in message.html
+    assert '<img' not in message.html and '&lt;img src=x onerror=alert(1)&gt;' in message.html
+    assert 'Dosen &amp; Co' in message.html and 'Mhs &lt;i&gt;' in message.html
+    # Plain text tetap apa adanya
+    assert '<script>alert(1)</script>' in message.body
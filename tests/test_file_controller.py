@@ -0,0 +1,14 @@
+# tests/test_file_controller.py
+import os
+import pytest
+
+
+@pytest.mark.parametrize('path', ['.staging/upload_abc', 'permohonan/.tmp_abc', '.env'])
+def test_hidden_upload_paths_are_not_served(app, client, path):
+    target = os.path.join(app.config['UPLOAD_FOLDER'], path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(b'setengah jadi')
+
+    assert client.get(f"/api/files/uploads/{path}").status_code == 404
+
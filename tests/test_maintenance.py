@@ -0,0 +1,68 @@
+# tests/test_maintenance.py
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from utils import maintenance_utils
+
+
+@pytest.fixture
+def old_signed(app):
+    from extensions import db
+    from app.models import Permohonan
+
+    with app.app_context():
+        signed_at = datetime.utcnow() - timedelta(days=90)
+        for permohonan_id in ('permohonan-013', 'permohonan-018'):
+            permohonan = db.session.get(Permohonan, permohonan_id)
+            assert permohonan.status_permohonan == 'ditandatangani'
+            permohonan.file_signed_path = 'blobs/ab/shared.pdf'
+            permohonan.signed_at = signed_at
+        db.session.commit()
+        yield
+
+
+def _signed_paths():
+    from app.models import Permohonan
+    return {p.id: p.file_signed_path for p in Permohonan.query.filter(Permohonan.id.in_(['permohonan-013', 'permohonan-018']))}
+
+
+def test_expires_rows_then_releases_refs(app, old_signed):
+    with app.app_context(), \
+            patch.object(maintenance_utils, 'delete_signed_file', return_value=True) as release, \
+            patch.object(maintenance_utils, 'send_maintenance_report'):
+        maintenance_utils.delete_old_signed_files()
+
+        assert _signed_paths() == {'permohonan-013': 'expired', 'permohonan-018': 'expired'}
+        assert release.call_count == 2
+
+
+def test_failed_commit_releases_nothing(app, old_signed):
+    from extensions import db
+
+    with app.app_context(), \
+            patch.object(maintenance_utils, 'delete_signed_file') as release, \
+            patch.object(maintenance_utils, 'send_maintenance_report'), \
+            patch.object(db.session, 'commit', side_effect=RuntimeError('database down')):
+        maintenance_utils.delete_old_signed_files()
+
+    release.assert_not_called()
+    with app.app_context():
+        assert set(_signed_paths().values()) == {'blobs/ab/shared.pdf'}
+
+
+def test_row_changed_by_other_process_is_not_released(app, old_signed):
+    from app.repositories.permohonan_repository import PermohonanRepository
+
+    expire = PermohonanRepository.expire_signed_file
+
+    def concurrent(self, permohonan_id, old_path):
+        # Proses lain sudah meng-expire permohonan-018 lebih dulu
+        return permohonan_id != 'permohonan-018' and expire(self, permohonan_id, old_path)
+
+    with app.app_context(), \
+            patch.object(maintenance_utils, 'delete_signed_file', return_value=True) as release, \
+            patch.object(maintenance_utils, 'send_maintenance_report'), \
+            patch.object(PermohonanRepository, 'expire_signed_file', concurrent):
+        maintenance_utils.delete_old_signed_files()
+
+    release.assert_called_once_with('blobs/ab/shared.pdf')
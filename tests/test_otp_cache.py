@@ -0,0 +1,67 @@
+# tests/test_otp_cache.py
+import pytest
+from utils.otp_cache import MemoryOTPStore, DatabaseOTPStore, OTP_EXPIRED, OTP_NOT_FOUND
+
+REGISTRATION = {'email': 'baru@student.uksw.edu', 'role': 'mahasiswa', 'nama': 'Baru'}
+
+
+@pytest.fixture(params=['memory', 'database'])
+def make_store(request, app):
+    def make(registration_ttl_minutes=60):
+        if request.param == 'memory':
+            return MemoryOTPStore(registration_ttl_minutes=registration_ttl_minutes)
+        from extensions import db
+        return DatabaseOTPStore(db, 'test-secret', registration_ttl_minutes=registration_ttl_minutes)
+
+    with app.app_context():
+        yield make
+
+
+def test_registration_data_outlives_otp(make_store):
+    store = make_store()
+    otp = store.create_otp(REGISTRATION['email'], REGISTRATION, expiry_minutes=-1)
+
+    assert store.verify_otp(REGISTRATION['email'], otp) == (None, OTP_EXPIRED)
+    assert not store.has_otp(REGISTRATION['email'])
+    # Resend OTP membaca data registrasi setelah kode kadaluarsa
+    assert store.get_registration_data(REGISTRATION['email']) == REGISTRATION
+    assert store.cleanup_expired() == 0
+
+    otp = store.create_otp(REGISTRATION['email'], REGISTRATION)
+    assert store.verify_otp(REGISTRATION['email'], otp) == (REGISTRATION, None)
+    assert store.verify_otp(REGISTRATION['email'], otp) == (None, OTP_NOT_FOUND)
+
+
+def test_cleanup_removes_records_past_registration_ttl(make_store):
+    store = make_store(registration_ttl_minutes=0)
+    store.create_otp(REGISTRATION['email'], REGISTRATION, expiry_minutes=-1)
+
+    assert store.cleanup_expired() == 1
+    assert store.get_registration_data(REGISTRATION['email']) is None
+    assert store.size() == 0
+
+
+def test_lockout_keeps_registration_for_resend(make_store, monkeypatch):
+    from app.services.auth_manual_service import AuthManualService
+    from utils.otp_cache import otp_cache, OTP_INVALID, OTP_TOO_MANY_ATTEMPTS
+
+    store = make_store()
+    monkeypatch.setattr(otp_cache, '_store', store)
+    sent = []
+    monkeypatch.setattr('app.services.auth_manual_service.send_otp_email',
+                        lambda **kwargs: sent.append(kwargs['otp_code']))
+    email = REGISTRATION['email']
+    otp = store.create_otp(email, REGISTRATION)
+    wrong = '000000' if otp != '000000' else '111111'
+
+    results = [store.verify_otp(email, wrong) for _ in range(store.max_attempts)]
+    assert results[:-1] == [(None, OTP_INVALID)] * (store.max_attempts - 1)
+    assert results[-1] == (None, OTP_TOO_MANY_ATTEMPTS)
+    # Kode lama terkunci walaupun benar
+    assert store.verify_otp(email, otp) == (None, OTP_TOO_MANY_ATTEMPTS)
+    assert not store.has_otp(email)
+
+    result, error = AuthManualService().resend_otp(email)
+    assert error is None and result['otp_sent']
+    assert store.has_otp(email)
+    assert store.verify_otp(email, sent[-1]) == (REGISTRATION, None)
@@ -0,0 +1,55 @@
+# tests/test_permohonan_create.py
+import io
+import hashlib
+from unittest.mock import patch
+from sqlalchemy.exc import IntegrityError
+
+PDF = b'%PDF-1.4\n1 0 obj << >> endobj\ntrailer << >>\n%%EOF\n'
+
+
+def _post(client, tokens):
+    return client.post('/api/permohonan/', headers=tokens['mahasiswa'], data={
+        'id_jenis_permohonan': '1',
+        'id_dosen': 'dosen-1',
+        'judul': 'Surat keterangan aktif',
+        'file': (io.BytesIO(PDF), 'surat.pdf'),
+    }, content_type='multipart/form-data')
+
+
+def _blobs(app):
+    from app.models.file_blob_model import FileBlob
+    with app.app_context():
+        return {blob.path: blob.ref_count for blob in FileBlob.query.filter_by(store='uploads')}
+
+
+def _fail_commit():
+    from extensions import db
+    return patch.object(db.session, 'commit', side_effect=IntegrityError('INSERT', {}, Exception('fk')))
+
+
+def test_failed_create_releases_upload_ref(app, client, tokens):
+    from utils.storage import storage
+    from utils.blob_store import upload_blobs
+
+    with _fail_commit():
+        response = _post(client, tokens)
+
+    assert response.status_code == 400
+    assert _blobs(app) == {}
+    with app.app_context():
+        path = upload_blobs.relative_path('permohonan', hashlib.sha256(PDF).hexdigest(), '.pdf')
+        assert not storage.exists('uploads', path)
+
+
+def test_failed_create_keeps_shared_blob(app, client, tokens):
+    assert _post(client, tokens).status_code == 201
+    (path, refs), = _blobs(app).items()
+    assert refs == 1
+
+    with _fail_commit():
+        assert _post(client, tokens).status_code == 400
+
+    assert _blobs(app) == {path: 1}
+    with app.app_context():
+        from utils.storage import storage
+        assert storage.exists('uploads', path)
@@ -0,0 +1,53 @@
+# tests/test_permohonan_preview.py
+import pytest
+
+PREVIEW = {'thumbnail_path': 'previews/ab/abcdef.jpg', 'page_count': 3}
+
+
+@pytest.fixture
+def with_previews(app):
+    from extensions import db
+    from app.models import Permohonan
+
+    with app.app_context():
+        for permohonan_id in ('permohonan-001', 'permohonan-002', 'permohonan-003'):
+            permohonan = db.session.get(Permohonan, permohonan_id)
+            assert permohonan.status_permohonan == 'pending'
+            permohonan.thumbnail_path = PREVIEW['thumbnail_path']
+            permohonan.page_count = PREVIEW['page_count']
+        db.session.commit()
+        yield
+
+
+def _preview(permohonan_id):
+    from app.repositories.permohonan_repository import PermohonanRepository
+    row = PermohonanRepository().get_preview_projection(permohonan_id)
+    return {'thumbnail_path': row['thumbnail_path'], 'page_count': row['page_count']}
+
+
+def test_releasing_transitions_clear_preview(app, client, with_previews):
+    from extensions import db
+    from app.repositories.permohonan_repository import PermohonanRepository
+    from app.services.permohonan_state import PermohonanStateMachine
+
+    with app.app_context():
+        state_machine = PermohonanStateMachine(PermohonanRepository())
+        assert state_machine.apply('permohonan-001', 'approve') == (True, None)
+        assert state_machine.apply('permohonan-002', 'reject', komentar_penolakan='Kurang lengkap') == (True, None)
+        assert state_machine.apply_many('sign', [{'id': 'permohonan-003', 'file_signed_path': 'ttd/a.pdf'}]) \
+            == ['permohonan-003']
+        db.session.commit()
+
+        # Approve tidak melepas file upload, preview tetap
+        assert _preview('permohonan-001') == PREVIEW
+        assert _preview('permohonan-002') == {'thumbnail_path': None, 'page_count': None}
+        assert _preview('permohonan-003') == {'thumbnail_path': None, 'page_count': None}
+
+    response = client.get('/api/files/previews/permohonan-002')
+    assert response.status_code == 404
+    assert response.get_json()['message'] == 'Preview not available'
+    assert 'Retry-After' not in response.headers
+
+    response = client.get('/api/files/previews/permohonan-004')
+    assert response.status_code == 404
+    assert response.headers['Retry-After'] == '5'
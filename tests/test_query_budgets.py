@@ -0,0 +1,94 @@
+# tests/test_query_budgets.py
+"""
+Satu endpoint per blueprint terhadap ceiling query-nya (@query_budget /
+QUERY_BUDGETS / QUERY_BUDGET_DEFAULT) dan detektor N+1
+"""
+import io
+
+
+def test_auth_manual_login(client, endpoint_budget):
+    response = endpoint_budget(client.post, '/api/auth_manual/login',
+                               json={'nomor_induk': '672000001', 'password': 'rahasia123'})
+    assert response.status_code == 200
+
+
+def test_google_auth_refresh(client, endpoint_budget, tokens):
+    response = endpoint_budget(client.post, '/api/auth/refresh', headers=tokens['refresh'])
+    assert response.status_code == 200
+
+
+def test_users_update_profile(client, endpoint_budget, tokens):
+    response = endpoint_budget(client.put, '/api/users/profile', json={'no_hp': '08123456789'},
+                               headers=tokens['mahasiswa'])
+    assert response.status_code == 200
+
+
+def test_dosen_list(client, endpoint_budget):
+    response = endpoint_budget(client.get, '/api/dosen/')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 4
+
+
+def test_permohonan_create(client, endpoint_budget, tokens):
+    pdf = b'%PDF-1.4\n1 0 obj << >> endobj\ntrailer << >>\n%%EOF\n'
+    response = endpoint_budget(client.post, '/api/permohonan/', headers=tokens['mahasiswa'], data={
+        'id_jenis_permohonan': '1',
+        'id_dosen': 'dosen-1',
+        'judul': 'Surat keterangan aktif',
+        'file': (io.BytesIO(pdf), 'surat.pdf'),
+    }, content_type='multipart/form-data')
+    assert response.status_code == 201
+    assert response.get_json()['data']['dosen']['user']['id'] == 'dosen-1'
+
+
+def test_permohonan_for_dosen(client, endpoint_budget, tokens):
+    response = endpoint_budget(client.get, '/api/permohonan/dosen?status=pending', headers=tokens['dosen'])
+    assert response.status_code == 200
+    assert len(response.get_json()['data']) > 3
+
+
+def test_fakultas_list(client, endpoint_budget):
+    response = endpoint_budget(client.get, '/api/fakultas/')
+    assert response.status_code == 200
+
+
+def test_jenis_permohonan_list(client, tokens, endpoint_budget):
+    response = endpoint_budget(client.get, '/api/jenis-permohonan/', headers=tokens['admin'])
+    assert response.status_code == 200
+
+
+def test_files_uploads(app, client, endpoint_budget):
+    from utils.storage import storage
+
+    with app.app_context():
+        storage.put_bytes('uploads', 'permohonan/budget.pdf', b'%PDF-1.4 test', content_type='application/pdf')
+    response = endpoint_budget(client.get, '/api/files/uploads/permohonan/budget.pdf')
+    assert response.status_code == 200
+
+
+def test_verify(client, endpoint_budget):
+    response = endpoint_budget(client.get, '/api/verify/permohonan-013')
+    assert response.status_code == 200
+    assert response.get_json()['data']['status'] == 'valid'
+
+
+def test_history_by_status(client, endpoint_budget, tokens):
+    for role in ('mahasiswa', 'dosen', 'admin'):
+        response = endpoint_budget(client.get, '/api/history/pending', headers=tokens[role])
+        assert response.status_code == 200
+        assert len(response.get_json()['data']) > 3
+
+
+def test_admin_user_directory(client, endpoint_budget, tokens):
+    response = endpoint_budget(client.get, '/api/admin/users/directory?role=mahasiswa', headers=tokens['admin'])
+    assert response.status_code == 200
+
+
+def test_search(client, endpoint_budget, tokens):
+    response = endpoint_budget(client.get, '/api/search?q=permohonan', headers=tokens['admin'])
+    assert response.status_code == 200
+
+
+def test_metrics(client, endpoint_budget):
+    response = endpoint_budget(client.get, '/metrics')
+    assert response.status_code == 200
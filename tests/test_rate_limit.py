@@ -0,0 +1,41 @@
+# tests/test_rate_limit.py
+from utils.rate_limit_utils import MemoryRateLimitBackend, parse_limit
+
+
+def test_memory_backend_enforces_limit():
+    backend = MemoryRateLimitBackend()
+    capacity, refill_rate = parse_limit('3/300')
+
+    results = [backend.consume('ip:1', capacity, refill_rate) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert 0 < results[-1][1] <= 100
+
+
+def test_memory_backend_is_bounded_lru():
+    backend = MemoryRateLimitBackend(max_keys=3)
+    capacity, refill_rate = parse_limit('2/60')
+
+    for key in ('a', 'b', 'c'):
+        backend.consume(key, capacity, refill_rate)
+    backend.consume('a', capacity, refill_rate)   # 'a' jadi paling baru dipakai
+    backend.consume('d', capacity, refill_rate)   # 'b' paling lama -> dibuang
+
+    assert list(backend._buckets) == ['c', 'a', 'd']
+    # Bucket 'a' (sudah habis) tidak ikut terbuang, limit tetap berlaku
+    assert backend.consume('a', capacity, refill_rate)[0] is False
+
+    for index in range(100):
+        backend.consume(f"scraper-{index}", capacity, refill_rate)
+    assert len(backend._buckets) == 3
+
+
+def test_memory_backend_purge_idle():
+    backend = MemoryRateLimitBackend()
+    capacity, refill_rate = parse_limit('2/60')
+    for key in ('a', 'b'):
+        backend.consume(key, capacity, refill_rate)
+
+    assert backend.purge_idle(max_idle_seconds=3600) == 0
+    assert backend.purge_idle(max_idle_seconds=-1) == 2
+    assert not backend._buckets
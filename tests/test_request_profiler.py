@@ -0,0 +1,38 @@
+# tests/test_request_profiler.py
+from utils.request_profiler import request_profiler, PROFILE_HEADER, PROFILE_ID_HEADER
+
+
+def _token(client, tokens, path=None):
+    response = client.post('/api/admin/profiles/token', json={'path': path} if path else {}, headers=tokens['admin'])
+    assert response.status_code == 201
+    return response.get_json()['data']['token']
+
+
+def test_profile_token_is_single_use(app, client, tokens):
+    token = _token(client, tokens)
+
+    first = client.get('/api/fakultas/', headers={PROFILE_HEADER: token})
+    second = client.get('/api/fakultas/', headers={PROFILE_HEADER: token})
+
+    assert first.status_code == 200 and first.headers.get(PROFILE_ID_HEADER)
+    assert second.status_code == 200 and PROFILE_ID_HEADER not in second.headers
+    with app.app_context():
+        assert first.headers[PROFILE_ID_HEADER] in [profile['id'] for profile in request_profiler.list_profiles()]
+
+
+def test_profile_token_only_accepted_in_header(client, tokens):
+    token = _token(client, tokens)
+
+    response = client.get(f"/api/fakultas/?_profile={token}")
+
+    assert PROFILE_ID_HEADER not in response.headers
+    # Token belum terpakai, masih berlaku lewat header
+    assert client.get('/api/fakultas/', headers={PROFILE_HEADER: token}).headers.get(PROFILE_ID_HEADER)
+
+
+def test_profile_token_wrong_path_is_not_consumed(client, tokens):
+    token = _token(client, tokens, path='/api/jenis-permohonan')
+
+    assert PROFILE_ID_HEADER not in client.get('/api/fakultas/', headers={PROFILE_HEADER: token}).headers
+    response = client.get('/api/jenis-permohonan/', headers={PROFILE_HEADER: token, **tokens['admin']})
+    assert response.headers.get(PROFILE_ID_HEADER)
@@ -0,0 +1,40 @@
+# tests/test_schedulers.py
+import fcntl
+from unittest.mock import patch
+import pytest
+import extensions
+
+
+@pytest.fixture
+def lock_app(app, tmp_path, monkeypatch):
+    app.config['SCHEDULER_LOCK_FILE'] = str(tmp_path / 'scheduler.lock')
+    monkeypatch.setattr(extensions, '_scheduler_lock', None)
+    yield app
+    if extensions._scheduler_lock not in (None, True):
+        extensions._scheduler_lock.close()
+
+
+def test_only_lock_holder_starts_schedulers(lock_app):
+    # Worker lain (open file description lain) sudah memegang lock
+    with open(lock_app.config['SCHEDULER_LOCK_FILE'], 'a') as other_worker:
+        fcntl.flock(other_worker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with patch('utils.scheduler_utils.start_scheduler') as start:
+            assert extensions.start_schedulers(lock_app) is False
+        start.assert_not_called()
+
+    # Worker pemegang lock mati -> lock lepas, worker berikutnya mengambil alih
+    with patch('utils.scheduler_utils.start_scheduler') as start, \
+            patch('utils.maintenance_utils.start_maintenance_scheduler') as start_maintenance:
+        assert extensions.start_schedulers(lock_app) is True
+    start.assert_called_once_with(lock_app)
+    start_maintenance.assert_called_once_with(lock_app)
+
+    with open(lock_app.config['SCHEDULER_LOCK_FILE'], 'a') as other_worker:
+        with pytest.raises(OSError):
+            fcntl.flock(other_worker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def test_scheduler_disabled(lock_app):
+    lock_app.config['SCHEDULER_ENABLED'] = False
+    assert extensions.start_schedulers(lock_app) is False
+    assert extensions._scheduler_lock is None
@@ -0,0 +1,31 @@
+# tests/test_search.py
+import pytest
+from app.repositories.dosen_repository import DosenRepository
+from utils import search_index
+
+
+@pytest.fixture(params=['like', 'fts5'])
+def search_app(request, app):
+    from extensions import db
+
+    with app.app_context():
+        if request.param == 'fts5':
+            search_index.ensure_search_index(db.engine)
+        try:
+            yield app
+        finally:
+            # Cache per URL engine: database in-memory berikutnya belum punya tabel FTS
+            search_index._fts_available.clear()
+
+
+def _search(term):
+    return [dosen.user_id for dosen in DosenRepository().search_dosen(term)]
+
+
+def test_search_dosen_by_name(search_app):
+    assert _search('dosen 3') == ['dosen-3']
+
+
+def test_search_dosen_by_gelar(search_app):
+    assert _search('Ph.D') == ['dosen-2']
+    assert sorted(_search('M.Kom')) == ['dosen-1', 'dosen-3', 'dosen-4']
@@ -0,0 +1,24 @@
+# tests/test_slow_query_log.py
+from utils import slow_query_log
+from utils.slow_query_log import SlowQueryLog
+
+
+def test_explained_fingerprints_are_bounded(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(slow_query_log.time, 'monotonic', lambda: clock[0])
+    log = SlowQueryLog()
+    log.explain_interval = 60
+    log.explain_max_keys = 3
+
+    assert log._should_explain('SELECT a')
+    assert not log._should_explain('SELECT a')
+    for key in ('SELECT b', 'SELECT c', 'SELECT d'):
+        assert log._should_explain(key)
+    # Melebihi max keys: fingerprint paling lama dibuang
+    assert list(log._explained) == ['SELECT b', 'SELECT c', 'SELECT d']
+
+    clock[0] += 61
+    assert log._should_explain('SELECT e')
+    # Interval sudah lewat: entry lama ikut dibersihkan
+    assert list(log._explained) == ['SELECT e']
+    assert log._should_explain('SELECT b')
@@ -0,0 +1,22 @@
+# tests/test_startup.py
+from benchmarks import startup
+
+
+def test_startup_check_passes():
+    """create_app tanpa library berat (PDF, QR, OAuth, scheduler) dan dalam budget modul"""
+    results, rows = startup.collect(iterations=1)
+
+    assert startup.check(results, rows) == []
+
+
+def test_startup_check_reports_forbidden_import():
+    rows = startup.parse_importtime(
+        "import time:       120 |        120 |     reportlab.pdfgen\n"
+        "import time:       300 |        420 |   utils.file_utils\n"
+        "import time:       500 |        920 | main\n"
+    )
+    results = {'imports': {'modules': len(rows), 'import_ms': 0.92}}
+
+    assert startup.check(results, rows) == [
+        "reportlab imported at startup: reportlab.pdfgen <- utils.file_utils <- main"
+    ]
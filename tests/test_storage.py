@@ -0,0 +1,88 @@
+# tests/test_storage.py
+import os
+from urllib.parse import urlparse, parse_qs
+import pytest
+import boto3
+from moto import mock_aws
+from utils.storage import StorageProxy, LocalStorage, S3Storage
+
+BUCKET = 'fti-test'
+
+
+@pytest.fixture
+def s3_app(app, monkeypatch):
+    # Kredensial palsu agar boto3 tidak membaca ~/.aws
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    app.config.update(
+        STORAGE_BACKEND='s3',
+        S3_BUCKET=BUCKET,
+        S3_ENDPOINT_URL='',
+        S3_REGION='us-east-1',
+        S3_KEY_PREFIX='test/',
+    )
+    with mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket=BUCKET)
+        with app.app_context():
+            yield app
+
+
+def test_s3_storage_roundtrip(s3_app):
+    driver = S3Storage(s3_app)
+    path = os.path.join('permohonan', 'surat.pdf')
+
+    assert not driver.exists('uploads', path)
+    driver.put_bytes('uploads', path, b'%PDF-1.4 isi')
+    assert driver.exists('uploads', path)
+    assert driver.size('uploads', path) == len(b'%PDF-1.4 isi')
+    assert driver.read_bytes('uploads', path) == b'%PDF-1.4 isi'
+
+    head = driver.client.head_object(Bucket=BUCKET, Key='test/uploads/permohonan/surat.pdf')
+    assert head['ContentType'] == 'application/pdf'
+
+    with driver.local_path('uploads', path) as local:
+        with open(local, 'rb') as f:
+            assert f.read() == b'%PDF-1.4 isi'
+    assert not os.path.exists(local)
+
+    url = driver.presigned_url('uploads', path, expires_in=60)
+    parsed = urlparse(url)
+    assert parsed.path.endswith('/test/uploads/permohonan/surat.pdf')
+    assert parse_qs(parsed.query)['X-Amz-Expires'] == ['60']
+
+    assert driver.delete('uploads', path) is True
+    assert driver.delete('uploads', path) is False
+    assert not driver.exists('uploads', path)
+
+
+def test_s3_storage_missing_object(s3_app):
+    driver = S3Storage(s3_app)
+
+    with pytest.raises(FileNotFoundError):
+        driver.read_bytes('signed', 'tidak-ada.pdf')
+    with pytest.raises(FileNotFoundError):
+        with driver.local_path('signed', 'tidak-ada.pdf'):
+            pass
+    with pytest.raises(ValueError):
+        driver.key('lainnya', 'a.pdf')
+
+
+def test_storage_proxy_switches_backend(s3_app):
+    proxy = StorageProxy()
+    assert isinstance(proxy.driver, LocalStorage)
+
+    proxy.init_app(s3_app)
+    assert isinstance(proxy.driver, S3Storage)
+    assert s3_app.extensions['storage'] is proxy.driver
+    proxy.put_bytes('qr_codes', 'qr.png', b'png')
+    assert proxy.read_bytes('qr_codes', 'qr.png') == b'png'
+
+    s3_app.config['STORAGE_BACKEND'] = 'local'
+    proxy.init_app(s3_app)
+    assert isinstance(proxy.driver, LocalStorage)
+    assert proxy.presigned_url('qr_codes', 'qr.png') is None
+    assert not proxy.exists('qr_codes', 'qr.png')
+
+    s3_app.config['STORAGE_BACKEND'] = 'ftp'
+    with pytest.raises(RuntimeError):
+        proxy.init_app(s3_app)
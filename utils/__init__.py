@@ -1,11 +1,32 @@
 # utils/__init__.py
-from .password_utils import hash_password, check_password
-from .jwt_utils import get_current_user, role_required, get_jwt_identity
-from .file_utils import allowed_file, save_uploaded_file, generate_unique_filename
-from .qr_utils import generate_qr_code, generate_verification_signature,verify_qr_signature
-from .response_utils import success_response, error_response, paginated_response
-
+# Re-export di-resolve saat pertama diakses (PEP 562): `from utils.storage import ...`
+# tidak ikut meng-import PIL, qrcode dan model lewat file_utils / qr_utils / jwt_utils
+from importlib import import_module
 
+_EXPORTS = {
+    'hash_password': 'password_utils',
+    'check_password': 'password_utils',
+    'get_current_user': 'jwt_utils',
+    'role_required': 'jwt_utils',
+    'get_jwt_identity': 'jwt_utils',
+    'allowed_file': 'file_utils',
+    'save_uploaded_file': 'file_utils',
+    'generate_unique_filename': 'file_utils',
+    'generate_qr_code': 'qr_utils',
+    'generate_verification_signature': 'qr_utils',
+    'verify_qr_signature': 'qr_utils',
+    'success_response': 'response_utils',
+    'error_response': 'response_utils',
+    'paginated_response': 'response_utils',
+}
 
+__all__ = list(_EXPORTS)
 
 
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'utils' has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,159 @@
+# utils/blob_store.py
+import os
+import re
+import hashlib
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from utils.storage import storage
+
+CHUNK_SIZE = 64 * 1024
+
+# <prefix>/ab/cd/<sha256><ext>
+BLOB_PATH_PATTERN = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)?$')
+
+
+def file_sha256(path):
+    """Hitung SHA-256 file per chunk"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """
+    Penyimpanan content-addressed dengan layout sharded dan reference count
+
+    File dengan isi sama disimpan sekali di <area>/<prefix>/ab/cd/<sha256><ext>
+    (lewat driver storage aktif). Reference count ada di tabel file_blobs agar
+    konsisten antar worker, file fisik baru dihapus saat reference terakhir dilepas.
+    """
+
+    def __init__(self, name, area):
+        self.name = name
+        self.area = area
+
+    @property
+    def table(self):
+        from app.models.file_blob_model import FileBlob
+        return FileBlob.__table__
+
+    @staticmethod
+    def relative_path(prefix, sha256, ext=''):
+        return os.path.join(prefix, sha256[:2], sha256[2:4], f"{sha256}{ext}")
+
+    @staticmethod
+    def is_blob_path(relative_path):
+        return bool(relative_path) and bool(BLOB_PATH_PATTERN.search(relative_path.replace(os.sep, '/')))
+
+    def _acquire(self, relative_path, sha256, size, place):
+        """
+        Tambah reference ke blob; jika belum ada, place(relative_path) menaruh file-nya
+
+        Returns:
+            bool: True jika blob baru dibuat, False jika dedup ke blob yang sudah ada
+        """
+        table = self.table
+        key = (table.c.store == self.name) & (table.c.path == relative_path)
+
+        for _ in range(2):
+            try:
+                with db.engine.begin() as conn:
+                    row = conn.execute(
+                        select(table.c.ref_count).where(key).with_for_update()
+                    ).first()
+
+                    if row is not None:
+                        # File hilang dari disk (dihapus manual), taruh ulang
+                        if not storage.exists(self.area, relative_path):
+                            place(relative_path)
+                        conn.execute(update(table).where(key).values(ref_count=table.c.ref_count + 1))
+                        return False
+
+                    place(relative_path)
+                    conn.execute(insert(table).values(
+                        store=self.name,
+                        path=relative_path,
+                        sha256=sha256,
+                        size=size,
+                        ref_count=1,
+                        created_at=datetime.utcnow()
+                    ))
+                    return True
+            except IntegrityError:
+                # Worker lain membuat blob yang sama bersamaan, ulangi sebagai increment
+                continue
+
+        raise RuntimeError(f"Failed to register blob {relative_path}")
+
+    def put_staged(self, staged, prefix, ext=''):
+        """
+        Simpan HashingUploadFile (hash sudah dihitung saat upload)
+
+        Returns:
+            str: path relatif blob
+        """
+        relative_path = self.relative_path(prefix, staged.sha256, ext)
+
+        def place(path):
+            storage.put_file(self.area, path, staged.finish())
+
+        self._acquire(relative_path, staged.sha256, staged.size, place)
+        return relative_path
+
+    def put_file(self, source_path, prefix, ext='', sha256=None):
+        """
+        Pindahkan file yang sudah ada di disk (misal hasil PDF signed) ke blob store
+        File sumber dipindah ke storage atau dihapus jika isi yang sama sudah ada
+
+        Returns:
+            str: path relatif blob
+        """
+        sha256 = sha256 or file_sha256(source_path)
+        size = os.path.getsize(source_path)
+        relative_path = self.relative_path(prefix, sha256, ext)
+
+        def place(path):
+            storage.put_file(self.area, path, source_path)
+
+        created = self._acquire(relative_path, sha256, size, place)
+        if not created and os.path.exists(source_path):
+            os.remove(source_path)
+        return relative_path
+
+    def release(self, relative_path):
+        """
+        Lepas satu reference; hapus file fisik jika reference habis
+
+        Returns:
+            bool or None: True jika file dihapus, False jika masih dipakai,
+                None jika path bukan blob terdaftar (file lama / legacy)
+        """
+        if not self.is_blob_path(relative_path):
+            return None
+
+        table = self.table
+        key = (table.c.store == self.name) & (table.c.path == relative_path)
+
+        with db.engine.begin() as conn:
+            row = conn.execute(
+                select(table.c.ref_count).where(key).with_for_update()
+            ).first()
+            if row is None:
+                return None
+
+            if row.ref_count > 1:
+                conn.execute(update(table).where(key).values(ref_count=table.c.ref_count - 1))
+                return False
+
+            # Hapus file selagi row masih di-lock agar tidak balapan dengan put
+            storage.delete(self.area, relative_path)
+            conn.execute(delete(table).where(key))
+            return True
+
+
+upload_blobs = BlobStore('uploads', 'uploads')
+signed_blobs = BlobStore('signed', 'signed')
@@ -1,15 +1,18 @@
 from flask_mail import Message
 from extensions import mail
 from flask import current_app
+from markupsafe import escape
 from datetime import datetime
 import threading
 import os
+from utils.metrics import track_email
 
 def _send_async_email(app, msg):
     """Helper function to send email asynchronously"""
     with app.app_context():
         try:
-            mail.send(msg)
+            with track_email('permohonan'):
+                mail.send(msg)
         except Exception as e:
             print(f"❌ Email send error: {str(e)}")
 
@@ -330,7 +333,8 @@ Terima kasih.
         
         # ✅ Kirim email SYNCHRONOUSLY (langsung, tanpa thread baru)
         # Karena sudah dalam ThreadPoolExecutor DAN app.app_context()
-        mail.send(msg)
+        with track_email('batch_permohonan'):
+            mail.send(msg)
         
         return True, None
         
@@ -341,6 +345,101 @@ Terima kasih.
         return False, str(e)
 
 
+def send_batch_rejected_email_sync(to_email: str, mahasiswa_name: str, dosen_name: str, permohonan_list: list):
+    """
+    Send batch rejected notification email (SYNCHRONOUS - direct send)
+    Satu email per mahasiswa berisi semua permohonan yang ditolak beserta alasannya
+    Use this when already running in a ThreadPoolExecutor
+
+    Args:
+        permohonan_list: list dict {'judul', 'jenis', 'komentar_penolakan'}
+    """
+    try:
+        now = datetime.now()
+        
+        subject = f"❌ {len(permohonan_list)} Permohonan Ditolak - {now.strftime('%d %b %Y')}"
+        
+        permohonan_items = ""
+        plain_items = ""
+        for idx, p in enumerate(permohonan_list, 1):
+            jenis = p.get('jenis') or '-'
+            alasan = p.get('komentar_penolakan') or '-'
+            # Judul & komentar diisi user: escape sebelum masuk HTML
+            permohonan_items += f"""
+            <li style="margin-bottom: 12px; padding: 10px; background: #fef2f2; border-left: 4px solid #dc2626; border-radius: 6px;">
+                <strong style="color: #1f2937;">{idx}. {escape(p['judul'])}</strong><br>
+                <small style="color: #6b7280;">Jenis: {escape(jenis)}</small><br>
+                <span style="color: #7f1d1d;"><strong>Alasan Penolakan:</strong> {escape(alasan)}</span>
+            </li>
+            """
+            plain_items += f"{idx}. {p['judul']} (Jenis: {jenis})\n   Alasan Penolakan: {alasan}\n"
+        
+        html_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 10px; background: #ffffff;">
+                <div style="text-align: center; margin-bottom: 20px;">
+                    <h2 style="color: #ef4444; margin: 0;">❌ Permohonan Ditolak</h2>
+                </div>
+                
+                <p>Halo <strong>{escape(mahasiswa_name)}</strong>,</p>
+                
+                <p>Dosen <strong>{escape(dosen_name)}</strong> menolak <strong style="color: #ef4444;">{len(permohonan_list)} permohonan</strong> Anda:</p>
+                
+                <ul style="padding: 0; list-style: none;">
+                    {permohonan_items}
+                </ul>
+                
+                <p style="margin-top:25px;">Silakan lakukan revisi di aplikasi.</p>
+                
+                <div style="text-align: center; margin-top: 30px;">
+                    <a href="{os.getenv('FRONTEND_URL', 'https://fti-service.netlify.app')}/mahasiswa/history" 
+                       style="background: #3b82f6; color: white; padding: 14px 32px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: 600;">
+                        Lihat History Permohonan Saya
+                    </a>
+                </div>
+                
+                <hr style="margin: 30px 0; border: none; border-top: 1px solid #e5e7eb;">
+                
+                <p style="font-size: 12px; color: #9ca3af; text-align: center; margin: 0;">
+                    Email otomatis dari Sistem Tanda Tangan Digital<br>
+                    Tanggal: {now.strftime('%A, %d %B %Y')}<br>
+                    Jangan balas email ini
+                </p>
+            </div>
+        </body>
+        </html>
+        """
+        
+        plain_body = f"""
+Halo {mahasiswa_name},
+
+Dosen {dosen_name} menolak {len(permohonan_list)} permohonan Anda:
+
+{plain_items}
+Tanggal: {now.strftime('%A, %d %B %Y')}
+
+Silakan lakukan revisi di aplikasi.
+        """
+        
+        msg = Message(
+            subject=subject,
+            recipients=[to_email],
+            body=plain_body,
+            html=html_body,
+            sender=current_app.config.get("MAIL_DEFAULT_SENDER"),
+        )
+        
+        with track_email('batch_rejected'):
+            mail.send(msg)
+        
+        return True, None
+        
+    except Exception as e:
+        print(f"  ❌ Email send error to {to_email}: {str(e)}")
+        return False, str(e)
+
+
 # ==========================================
 # MAINTENANCE REPORT EMAIL to Admin
 # ==========================================
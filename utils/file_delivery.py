@@ -0,0 +1,81 @@
+# utils/file_delivery.py
+import os
+import mimetypes
+from datetime import datetime, timezone
+from flask import current_app, request, send_file, abort, Response
+from werkzeug.security import safe_join
+
+
+def _strong_etag(stat_result):
+    """ETag kuat dari mtime (ns) + size, sama seperti gaya nginx"""
+    return f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+
+
+def _offload_response(full_path, relative_path, stat_result, etag, mode, internal_prefix):
+    """
+    Response kosong dengan header X-Accel-Redirect / X-Sendfile
+    Proxy di depan (nginx / apache) yang mengirim byte file dan menangani Range
+    """
+    mimetype = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    response = Response(mimetype=mimetype)
+
+    if mode == 'x-accel':
+        response.headers['X-Accel-Redirect'] = f"{internal_prefix.rstrip('/')}/{relative_path}"
+    else:
+        response.headers['X-Sendfile'] = os.path.abspath(full_path)
+
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.set_etag(etag)
+    response.last_modified = datetime.fromtimestamp(stat_result.st_mtime, tz=timezone.utc)
+    # Hanya 304/412 yang ditangani di sini, Range diserahkan ke proxy
+    return response.make_conditional(request, accept_ranges=False)
+
+
+def serve_file(base_folder, relative_path, internal_prefix=None, max_age=None):
+    """
+    Kirim file dari base_folder dengan dukungan Range, ETag/Last-Modified (304)
+    dan offload ke proxy sesuai config FILE_DELIVERY_MODE:
+        'python'     : di-stream oleh worker (default)
+        'x-accel'    : nginx X-Accel-Redirect ke internal_prefix
+        'x-sendfile' : header X-Sendfile (apache mod_xsendfile / lighttpd)
+
+    Args:
+        base_folder: Folder dasar (misal config UPLOAD_FOLDER)
+        relative_path: Path relatif dari URL
+        internal_prefix: Prefix location internal nginx untuk mode 'x-accel'
+        max_age: Override FILE_CACHE_MAX_AGE (detik)
+    """
+    full_path = safe_join(base_folder, relative_path)
+    if full_path is None:
+        abort(404)
+
+    try:
+        stat_result = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        abort(404)
+
+    if not os.path.isfile(full_path):
+        abort(404)
+
+    etag = _strong_etag(stat_result)
+    mode = current_app.config.get('FILE_DELIVERY_MODE', 'python')
+    if max_age is None:
+        max_age = current_app.config.get('FILE_CACHE_MAX_AGE', 3600)
+
+    if mode in ('x-accel', 'x-sendfile') and (mode != 'x-accel' or internal_prefix):
+        response = _offload_response(full_path, relative_path, stat_result, etag, mode, internal_prefix)
+    else:
+        response = send_file(
+            os.path.abspath(full_path),
+            as_attachment=False,
+            conditional=True,
+            etag=etag,
+            last_modified=stat_result.st_mtime,
+            max_age=max_age
+        )
+
+    # Dokumen berisi data pribadi, jangan di-cache oleh shared cache / CDN
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response
@@ -1,10 +1,10 @@
 # utils/file_utils.py
 import os
 import uuid
-from PIL import Image
 from datetime import datetime
 from flask import current_app
 from werkzeug.utils import secure_filename
+from utils.storage import storage
 
 
 def allowed_file(filename):
@@ -29,108 +29,244 @@ def generate_unique_filename(original_filename):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     return f"{timestamp}_{unique_id}{ext}"
 
-def save_uploaded_file(file, subfolder=''):
-    """Save uploaded file and return file path"""
+def _stage_stream(file):
+    """
+    Tulis stream FileStorage biasa ke staging folder per chunk (fallback jika
+    request tidak memakai IngestRequest), sambil hashing dan cek ukuran
+    """
+    from utils.upload_stream import HashingUploadFile, CHUNK_SIZE
+
+    max_size = current_app.config.get('UPLOAD_MAX_FILE_SIZE') or current_app.config.get('MAX_CONTENT_LENGTH')
+    staged = HashingUploadFile(current_app.config['UPLOAD_STAGING_FOLDER'], max_size)
+    try:
+        file.stream.seek(0)
+        while True:
+            chunk = file.stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            staged.write(chunk)
+    except Exception:
+        staged.close()
+        raise
+    return staged
+
+def ingest_uploaded_file(file, subfolder='', dedup=False):
+    """
+    Simpan file upload: validasi ekstensi + magic bytes, lalu pindahkan
+    file staging ke storage area 'uploads'
+
+    Args:
+        dedup: True = simpan content-addressed di <subfolder>/ab/cd/<sha256>.<ext>
+            (upload identik memakai file yang sama, reference counted)
+
+    Returns:
+        (dict, error): dict berisi 'path' (relatif), 'sha256', 'size', 'kind'
+    """
+    from utils.upload_stream import HashingUploadFile, EXTENSION_KINDS
+    from werkzeug.exceptions import RequestEntityTooLarge
+
     if not file or not allowed_file(file.filename):
         return None, "File type not allowed"
-    
+
+    staged = None
     try:
-        # Generate unique filename
-        filename = generate_unique_filename(file.filename)
-        
-        # Create full path
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        if subfolder:
-            upload_folder = os.path.join(upload_folder, subfolder)
-            os.makedirs(upload_folder, exist_ok=True)
-        
-        file_path = os.path.join(upload_folder, filename)
-        
-        # Save file
-        file.save(file_path)
-        
-        # Return relative path
-        if subfolder:
-            return os.path.join(subfolder, filename), None
+        # Stream sudah ditulis + di-hash saat parsing request (IngestRequest)
+        if isinstance(file.stream, HashingUploadFile):
+            staged = file.stream
+        else:
+            staged = _stage_stream(file)
+
+        ext = file.filename.rsplit('.', 1)[1].lower()
+        expected_kind = EXTENSION_KINDS.get(ext)
+        if expected_kind and staged.kind != expected_kind:
+            return None, "File content does not match its extension"
+
+        if dedup:
+            from utils.blob_store import upload_blobs
+            relative_path = upload_blobs.put_staged(staged, subfolder or 'blobs', f".{ext}")
         else:
-            return filename, None
-            
+            # Generate unique filename
+            filename = generate_unique_filename(file.filename)
+            relative_path = os.path.join(subfolder, filename) if subfolder else filename
+
+            # Lokal: atomic rename dari staging, S3: upload lalu hapus staging
+            storage.put_file('uploads', relative_path, staged.finish())
+
+        return {
+            'path': relative_path,
+            'sha256': staged.sha256,
+            'size': staged.size,
+            'kind': staged.kind
+        }, None
+
+    except RequestEntityTooLarge:
+        return None, "File too large"
     except Exception as e:
         return None, str(e)
+    finally:
+        if staged is not None:
+            staged.close()
+
+def save_uploaded_file(file, subfolder=''):
+    """Save uploaded file (content-addressed, deduplicated) and return file path"""
+    result, error = ingest_uploaded_file(file, subfolder, dedup=True)
+    if error:
+        return None, error
+    return result['path'], None
+
+# Ukuran maksimum TTD tersimpan: kotak TTD di PDF 120x60 pt @ ~300 DPI
+SIGNATURE_RENDER_SIZE = (500, 250)
+SIGNATURE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+# Pixel tanpa alpha yang lebih terang dari ini dianggap background (transparan)
+SIGNATURE_BACKGROUND_THRESHOLD = 240
 
-def save_and_resize_signature(file,target_size=(724,344)):
+def normalize_signature_image(img, max_size=SIGNATURE_RENDER_SIZE):
     """
-    Save and resize signature image to target size
-    
-    Args:
-        file: FileStorage object from Flask
-        target_size: Tuple (width, height) for target size
-    
+    Normalisasi TTD sekali saat upload ke bentuk siap render:
+    - RGBA dengan alpha benar (background putih tanpa alpha dijadikan transparan)
+    - Trim area kosong di sekitar coretan
+    - Perkecil (premultiplied alpha, tanpa halo) ke resolusi PDF
+
     Returns:
-        (file_path, error)
+        PIL.Image (mode RGBA)
     """
-    if not file or not file.filename:
-        return None, "no file provided"
-    
-    if not allowed_file(file.filename):
-        return None, "File type not allowed, Please upload PNG"
-    
-    try:
-        filename = generate_unique_filename(file.filename)
+    from PIL import Image
 
-        ext = filename.rsplit('.', 1)[1].lower()
-        if ext not in ['png', 'jpg', 'jpeg', 'gif']:
-            return None, "File must be an image (PNG, JPG, JPEG, or GIF)"
-        
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        signature_dir = os.path.join(upload_folder,'signatures')
-        os.makedirs(signature_dir,exist_ok=True)
+    img.load()
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+    else:
+        img = img.convert('RGBA')
+        luminance = img.convert('L')
+        threshold = SIGNATURE_BACKGROUND_THRESHOLD
+        img.putalpha(luminance.point(lambda value: 0 if value >= threshold else 255))
 
-        file_path = os.path.join(signature_dir,filename)
+    bbox = img.getchannel('A').getbbox()
+    if bbox is None:
+        raise ValueError("Signature image is empty")
+    img = img.crop(bbox)
 
-        img = Image.open(file)
+    if img.width > max_size[0] or img.height > max_size[1]:
+        img = img.convert('RGBa')
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        img = img.convert('RGBA')
 
-        if img.mode in ('RGBA', 'LA','P'):
-            
-            background = Image.new('RGB',img.size, (255,255,255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            if img.mode == 'RGBA':
-                background.paste(img, mask=img.split()[-1])
-            else:
-                background.paste(img)
-            img = background
+    return img
 
-        img_resized = img.resize(target_size,Image.Resampling.LANCZOS)
+def _save_normalized_signature(file, subfolder='signatures', max_size=SIGNATURE_RENDER_SIZE):
+    """
+    Decode upload TTD, normalisasi, lalu simpan sebagai PNG di storage area 'uploads'
 
-        img_resized.save(file_path,quality=95, optimize=True)
+    Returns:
+        (file_path, error)
+    """
+    import io
+    from PIL import Image
+
+    if not file or not file.filename:
+        return None, "No file provided"
+
+    if not allowed_file(file.filename):
+        return None, "File type not allowed"
+
+    ext = file.filename.rsplit('.', 1)[1].lower()
+    if ext not in SIGNATURE_EXTENSIONS:
+        return None, "File must be an image (PNG, JPG, JPEG, or GIF)"
 
-        relative_path = os.path.join('signatures',filename)
+    try:
+        file.stream.seek(0)
+        img = normalize_signature_image(Image.open(file.stream), max_size)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', optimize=True)
 
-        return relative_path,None
+        relative_path = os.path.join(subfolder, generate_unique_filename('signature.png'))
+        storage.put_bytes('uploads', relative_path, buffer.getvalue(), content_type='image/png')
+        return relative_path, None
 
     except Exception as e:
         return None, f"Failed to process image: {str(e)}"
+
+def save_and_resize_signature(file, target_size=SIGNATURE_RENDER_SIZE):
+    """
+    Save signature image, normalized and scaled down to fit target_size
+    
+    Args:
+        file: FileStorage object from Flask
+        target_size: Tuple (width, height) ukuran maksimum
+    
+    Returns:
+        (file_path, error)
+    """
+    return _save_normalized_signature(file, max_size=target_size)
     
 
 def delete_file(file_path):
-    """Delete file from filesystem"""
+    """
+    Delete file from filesystem
+    Blob content-addressed hanya dihapus jika reference terakhir dilepas
+    """
     if not file_path:
         return False
     
     try:
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-        full_path = os.path.join(upload_folder, file_path)
-        
-        if os.path.exists(full_path):
-            os.remove(full_path)
-            return True
-        return False
+        from utils.blob_store import upload_blobs
+        released = upload_blobs.release(file_path)
+        if released is not None:
+            if released and file_path.lower().endswith('.pdf'):
+                # Reference terakhir hilang, thumbnail isi ini ikut dihapus
+                from utils.preview_utils import delete_preview
+                delete_preview(os.path.splitext(os.path.basename(file_path))[0])
+            return released
+
+        return storage.delete('uploads', file_path)
     except Exception as e:
         print(f"Error deleting file: {e}")
         return False
 
 
+def delete_signed_file(file_path):
+    """Delete signed PDF (relatif terhadap UPLOAD_SIGNED)"""
+    if not file_path:
+        return False
+
+    try:
+        from utils.blob_store import signed_blobs
+        released = signed_blobs.release(file_path)
+        if released is not None:
+            return released
+
+        return storage.delete('signed', file_path)
+    except Exception as e:
+        print(f"Error deleting signed file: {e}")
+        return False
+
+
+def delete_files(file_paths, max_workers=4):
+    """
+    Hapus banyak file upload paralel (misal setelah batch reject di-commit)
+    Setiap worker memakai app context sendiri karena release blob butuh database
+
+    Returns:
+        int: jumlah file yang benar-benar dihapus
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    file_paths = [path for path in file_paths if path]
+    if not file_paths:
+        return 0
+
+    app = current_app._get_current_object()
+
+    def _delete(path):
+        with app.app_context():
+            return delete_file(path)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(file_paths))),
+                            thread_name_prefix='delete-files') as executor:
+        return sum(1 for deleted in executor.map(_delete, file_paths) if deleted)
+
+
 def get_file_url(file_path):
     """
     Get URL for accessing uploaded file
@@ -144,7 +280,6 @@ def get_file_url(file_path):
 
 def is_signature_file(filename):
     """Check if file is valid signature format"""
-    SIGNATURE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     if not filename:
         return False
     return '.' in filename and \
@@ -152,8 +287,8 @@ def is_signature_file(filename):
 
 def save_signature_direct(file, subfolder='signatures'):
     """
-    Save signature file directly without resize
-    (untuk file yang sudah di-resize di frontend)
+    Save signature file (untuk file yang sudah di-resize di frontend)
+    Tetap dinormalisasi agar siap render di PDF
     
     Args:
         file: FileStorage object from Flask
@@ -162,98 +297,17 @@ def save_signature_direct(file, subfolder='signatures'):
     Returns:
         (file_path, error)
     """
-    if not file or not file.filename:
-        return None, "No file provided"
-    
-    # Validate file type
-    if not allowed_file(file.filename):
-        return None, "File type not allowed"
-    
-    try:
-        # Generate unique filename
-        filename = generate_unique_filename(file.filename)
-        
-        # Create directory
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        target_dir = os.path.join(upload_folder, subfolder)
-        os.makedirs(target_dir, exist_ok=True)
-        
-        # Save file
-        file_path = os.path.join(target_dir, filename)
-        file.save(file_path)
-        
-        # Validate dimensions (optional)
-        try:
-            from PIL import Image
-            img = Image.open(file_path)
-            if img.width != 724 or img.height != 344:
-                # File dari frontend should be 724x344
-                # But we can be flexible
-                pass
-        except:
-            pass
-        
-        # Return relative path
-        return os.path.join(subfolder, filename), None
-        
-    except Exception as e:
-        return None, f"Failed to save signature: {str(e)}"
+    return _save_normalized_signature(file, subfolder)
     
-def save_signature_smart(file, target_size=(724, 344)):
+def save_signature_smart(file, target_size=SIGNATURE_RENDER_SIZE):
     """
-    Smart save signature:
-    - If already target size → save directly
-    - If different size → resize
+    Smart save signature (alias normalisasi, ukuran berapapun diterima)
     
     Args:
         file: FileStorage object from Flask
-        target_size: Target size (width, height)
+        target_size: Ukuran maksimum (width, height)
     
     Returns:
         (file_path, error)
     """
-    if not file or not file.filename:
-        return None, "No file provided"
-    
-    if not allowed_file(file.filename):
-        return None, "File type not allowed"
-    
-    try:
-        from PIL import Image
-        import io
-        
-        # Read image
-        img = Image.open(file)
-        
-        # Check if already target size
-        if img.width == target_size[0] and img.height == target_size[1]:
-            # Already perfect size, save directly
-            filename = generate_unique_filename(file.filename)
-            upload_folder = current_app.config['UPLOAD_FOLDER']
-            signatures_dir = os.path.join(upload_folder, 'signatures')
-            os.makedirs(signatures_dir, exist_ok=True)
-            
-            file_path = os.path.join(signatures_dir, filename)
-            
-            # Convert to RGB if needed
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode == 'RGBA':
-                    background.paste(img, mask=img.split()[-1])
-                else:
-                    background.paste(img)
-                img = background
-            
-            # Save
-            img.save(file_path, quality=95, optimize=True)
-            
-            return os.path.join('signatures', filename), None
-        
-        else:
-            # Need resize, use existing function
-            return save_and_resize_signature(file, target_size)
-            
-    except Exception as e:
-        return None, f"Failed to process signature: {str(e)}"
\ No newline at end of file
+    return _save_normalized_signature(file, max_size=target_size)
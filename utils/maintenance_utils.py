@@ -7,7 +7,10 @@ import os
 from flask_mail import Message
 from extensions import db, mail
 from app.models.permohonan_model import Permohonan
+from app.repositories.permohonan_repository import PermohonanRepository
 from flask import current_app
+from utils.file_utils import delete_signed_file
+from utils.metrics import track_email, track_job
 
 # Inisialisasi scheduler dengan timezone Jakarta
 scheduler = BackgroundScheduler(timezone=pytz.timezone("Asia/Jakarta"))
@@ -46,53 +49,48 @@ def delete_old_signed_files():
         failed_count = 0
         deleted_files = []
         failed_files = []
-        
-        # Process setiap permohonan
+        expired = []
+
+        # Tandai 'expired' dengan guarded UPDATE (path masih sama), file belum disentuh
+        repo = PermohonanRepository()
         for permohonan in permohonan_list:
-            try:
-                file_path = permohonan.file_signed_path
-                
-                # Build full path ke file
-                full_path = os.path.join(
-                    current_app.config['UPLOAD_SIGNED'],
-                    file_path
-                )
-                
-                print(f"🗑️  Deleting: {file_path}")
-                
-                # Cek apakah file exists
-                if os.path.exists(full_path):
-                    # Hapus file
-                    os.remove(full_path)
-                    print(f"   ✅ File deleted")
-                else:
-                    print(f"   ⚠️  File not found (will update DB anyway)")
-                
-                # Update database: set file_signed_path jadi 'expired'
-                permohonan.file_signed_path = 'expired'
-                
-                deleted_count += 1
-                deleted_files.append({
+            if repo.expire_signed_file(permohonan.id, permohonan.file_signed_path):
+                expired.append({
                     'id': permohonan.id,
                     'judul': permohonan.judul,
-                    'file': file_path,
+                    'file': permohonan.file_signed_path,
                     'signed_at': permohonan.signed_at.strftime('%Y-%m-%d')
                 })
-                
+            else:
+                print(f"   ⚠️  {permohonan.id} changed by another process, skipped")
+
+        # Commit dulu: reference blob hanya dilepas untuk baris yang benar-benar berubah
+        db.session.commit()
+        print(f"💾 Database updated")
+
+        for item in expired:
+            try:
+                print(f"🗑️  Deleting: {item['file']}")
+
+                # Lepas reference blob / hapus file lama
+                if delete_signed_file(item['file']):
+                    print(f"   ✅ File deleted")
+                else:
+                    print(f"   ⚠️  File not found or still referenced")
+
+                deleted_count += 1
+                deleted_files.append(item)
+
             except Exception as e:
                 failed_count += 1
                 error_msg = str(e)
                 print(f"   ❌ Failed: {error_msg}")
                 failed_files.append({
-                    'id': permohonan.id,
-                    'file': permohonan.file_signed_path,
+                    'id': item['id'],
+                    'file': item['file'],
                     'error': error_msg
                 })
-        
-        # Commit semua perubahan database
-        db.session.commit()
-        print(f"💾 Database updated")
-        
+
         # Summary
         print(f"")
         print(f"📊 SUMMARY:")
@@ -251,7 +249,8 @@ Sistem Maintenance
             body=plain_body,
             html=html_body
         )
-        mail.send(msg)
+        with track_email('maintenance_report'):
+            mail.send(msg)
         print(f"📧 Maintenance report sent to {admin_email}")
         
     except Exception as e:
@@ -265,7 +264,7 @@ def start_maintenance_scheduler(app):
     """
     # Bungkus fungsi job agar memiliki app_context dari Flask
     def job_wrapper():
-        with app.app_context():
+        with app.app_context(), track_job('delete_old_signed_files'):
             delete_old_signed_files()
     
     # Jadwalkan job: setiap tanggal 1, jam 02:00 WIB
@@ -280,5 +279,44 @@ def start_maintenance_scheduler(app):
         replace_existing=True
     )
     
+    # Bersihkan bucket rate limit yang idle: setiap hari jam 03:00 WIB
+    def purge_rate_limit_wrapper():
+        with app.app_context():
+            from utils.rate_limit_utils import rate_limiter
+            try:
+                with track_job('purge_rate_limit_buckets'):
+                    purged = rate_limiter.purge_idle(max_idle_seconds=86400)
+                print(f"🧹 [MAINTENANCE] Purged {purged} idle rate limit buckets")
+            except Exception as e:
+                print(f"❌ [ERROR] Failed to purge rate limit buckets: {str(e)}")
+
+    scheduler.add_job(
+        func=purge_rate_limit_wrapper,
+        trigger='cron',
+        hour=3,
+        minute=0,
+        timezone=pytz.timezone("Asia/Jakarta"),
+        id='purge_rate_limit_buckets',
+        replace_existing=True
+    )
+    
+    # Hapus OTP kadaluarsa: setiap 10 menit
+    def cleanup_otp_wrapper():
+        with app.app_context():
+            from utils.otp_cache import otp_cache
+            try:
+                with track_job('cleanup_expired_otp'):
+                    otp_cache.cleanup_expired()
+            except Exception as e:
+                print(f"❌ [ERROR] Failed to cleanup expired OTP: {str(e)}")
+
+    scheduler.add_job(
+        func=cleanup_otp_wrapper,
+        trigger='interval',
+        minutes=10,
+        id='cleanup_expired_otp',
+        replace_existing=True
+    )
+    
     scheduler.start()
     
\ No newline at end of file
@@ -0,0 +1,240 @@
+# utils/metrics.py
+import os
+import time
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # metrics opsional, instrumentasi jadi no-op
+    PROMETHEUS_AVAILABLE = False
+
+# Bucket (detik) untuk operasi berat: signing PDF, email, job scheduler
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def multiprocess_enabled():
+    """Mode multiprocess prometheus_client (gunicorn > 1 worker), lihat gunicorn.conf.py"""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+class _NoopMetric:
+    """Pengganti metric saat prometheus_client tidak terpasang"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def _histogram(name, documentation, labelnames=(), buckets=None):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    if buckets is None:
+        return Histogram(name, documentation, labelnames)
+    return Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+def _counter(name, documentation, labelnames=()):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Counter(name, documentation, labelnames)
+
+
+def _gauge(name, documentation, labelnames=(), multiprocess_mode='livesum'):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Gauge(name, documentation, labelnames, multiprocess_mode=multiprocess_mode)
+
+
+# ===== HTTP =====
+http_request_duration = _histogram(
+    'http_request_duration_seconds', 'Request latency',
+    ('blueprint', 'endpoint', 'method', 'status')
+)
+
+# ===== DATABASE POOL =====
+db_pool_checkout_wait = _histogram(
+    'db_pool_checkout_wait_seconds', 'Waktu menunggu koneksi dari pool (termasuk connect baru)',
+    buckets=FAST_BUCKETS
+)
+db_pool_in_use = _gauge('db_pool_connections_in_use', 'Koneksi yang sedang di-checkout dari pool')
+db_pool_capacity = _gauge('db_pool_capacity', 'pool_size + max_overflow (SQLALCHEMY_ENGINE_OPTIONS)')
+
+# ===== SIGNING / QR =====
+sign_document_duration = _histogram(
+    'sign_document_duration_seconds', 'Durasi QR + tanda tangan satu dokumen', buckets=SLOW_BUCKETS
+)
+qr_generation_duration = _histogram(
+    'qr_generation_duration_seconds', 'Durasi generate QR code', buckets=FAST_BUCKETS
+)
+
+# ===== EMAIL =====
+email_send_duration = _histogram(
+    'email_send_duration_seconds', 'Latency kirim email (SMTP)', ('kind',), buckets=SLOW_BUCKETS
+)
+email_send_failures = _counter('email_send_failures_total', 'Email yang gagal dikirim', ('kind',))
+
+# ===== OTP =====
+otp_cache_entries = _gauge('otp_cache_entries', 'Jumlah OTP di memory store (dijumlah semua worker)')
+
+# ===== SCHEDULER =====
+scheduler_job_duration = _histogram(
+    'scheduler_job_duration_seconds', 'Durasi job APScheduler', ('job',), buckets=SLOW_BUCKETS
+)
+scheduler_job_failures = _counter('scheduler_job_failures_total', 'Job APScheduler yang gagal', ('job',))
+
+
+@contextmanager
+def track_email(kind):
+    """Ukur latency kirim email, hitung gagal jika terjadi exception"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        email_send_failures.labels(kind).inc()
+        raise
+    finally:
+        email_send_duration.labels(kind).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def track_job(job):
+    """Ukur durasi job scheduler"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        scheduler_job_failures.labels(job).inc()
+        raise
+    finally:
+        scheduler_job_duration.labels(job).observe(time.perf_counter() - started)
+
+
+def _otp_store_rows_metric():
+    """
+    OTP store backend database dipakai bersama semua worker, jadi dihitung
+    langsung saat scrape (bukan gauge per proses)
+    """
+    from utils.otp_cache import otp_cache, DatabaseOTPStore
+
+    if not isinstance(otp_cache.store, DatabaseOTPStore):
+        return b''
+    try:
+        rows = otp_cache.size()
+    except Exception:
+        return b''
+    return (
+        b'# HELP otp_store_rows Jumlah OTP di tabel otp_codes\n'
+        b'# TYPE otp_store_rows gauge\n'
+        + f'otp_store_rows {float(rows)}\n'.encode()
+    )
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool yang mencatat waktu tunggu checkout (pool habis = request antri)"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def _uses_queue_pool(database_uri):
+    # SQLite in-memory memakai SingletonThreadPool / StaticPool
+    return not (database_uri.startswith('sqlite') and (':memory:' in database_uri or database_uri.rstrip('/') == 'sqlite:'))
+
+
+class Metrics:
+    """
+    Metrics format Prometheus (GET /metrics)
+
+    Dengan PROMETHEUS_MULTIPROC_DIR (di-set gunicorn.conf.py), setiap worker
+    menulis nilai ke direktori bersama dan /metrics menggabungkan semuanya.
+    """
+
+    def configure_engine_options(self, app):
+        """Dipanggil sebelum db.init_app: pasang TimedQueuePool ke SQLALCHEMY_ENGINE_OPTIONS"""
+        if not PROMETHEUS_AVAILABLE or not app.config.get('METRICS_ENABLED', True):
+            return
+        if not _uses_queue_pool(app.config['SQLALCHEMY_DATABASE_URI']):
+            return
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        options.setdefault('poolclass', TimedQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    def init_app(self, app):
+        app.extensions['metrics'] = self
+        if not PROMETHEUS_AVAILABLE or not app.config.get('METRICS_ENABLED', True):
+            return
+
+        with app.app_context():
+            from extensions import db
+            self._instrument_pool(db.engine)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def _instrument_pool(engine):
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            db_pool_capacity.set(pool.size() + max(pool._max_overflow, 0))
+
+        # Listener di pool tetap terbawa saat pool di-recreate (engine.dispose)
+        event.listen(pool, 'checkout', lambda *args: db_pool_in_use.inc())
+        event.listen(pool, 'checkin', lambda *args: db_pool_in_use.dec())
+
+    @staticmethod
+    def _start_request():
+        g._metrics_started = time.perf_counter()
+
+    @staticmethod
+    def _finish_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            http_request_duration.labels(
+                request.blueprint or '-',
+                request.endpoint or 'unmatched',
+                request.method,
+                str(response.status_code)
+            ).observe(time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def render():
+        """
+        Returns:
+            (bytes payload, content_type)
+        """
+        from prometheus_client import CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+
+        if multiprocess_enabled():
+            from prometheus_client import multiprocess
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+
+        payload = generate_latest(registry) + _otp_store_rows_metric()
+        return payload, CONTENT_TYPE_LATEST
+
+
+# Global metrics instance
+metrics = Metrics()
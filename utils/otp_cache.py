@@ -1,111 +1,383 @@
-import random
+import heapq
+import hmac
+import json
+import hashlib
+import secrets
 import string
+import itertools
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from threading import Lock
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from utils.metrics import otp_cache_entries
 
 
-class OTPCache:
+OTP_NOT_FOUND = "Kode OTP tidak ditemukan. Silakan request OTP baru."
+OTP_EXPIRED = "Kode OTP sudah kadaluarsa. Silakan request OTP baru."
+OTP_INVALID = "Kode OTP salah. Silakan coba lagi."
+OTP_TOO_MANY_ATTEMPTS = "Terlalu banyak percobaan. Silakan request OTP baru."
+
+
+class BaseOTPStore(ABC):
     """
-    Simple in-memory OTP cache
-    Thread-safe storage for OTP verification
+    Interface OTP store
+    Setiap record menyimpan otp, expires_at, registration_data dan attempts
+
+    expires_at hanya membatasi kode OTP; registration_data tetap disimpan sampai
+    registration_ttl_minutes sejak OTP terakhir dibuat agar resend OTP masih bisa
+    dilakukan setelah kode kadaluarsa atau terkunci (attempts >= max_attempts).
+    Kode yang terkunci dikosongkan, resend (create_otp) membuat kode baru dan
+    mereset attempts.
     """
-    
-    def __init__(self):
-        self._cache = {}  # {email: {otp, expires_at, registration_data}}
-        self._lock = Lock()
-    
+
+    def __init__(self, max_attempts=5, registration_ttl_minutes=60):
+        self.max_attempts = max_attempts
+        self.registration_ttl_minutes = registration_ttl_minutes
+
+    def _retain_until(self, now, expires_at):
+        """Batas simpan record (tidak pernah lebih cepat dari expires_at)"""
+        return max(expires_at, now + timedelta(minutes=self.registration_ttl_minutes))
+
     @staticmethod
     def generate_otp():
         """Generate 6-digit OTP"""
-        return ''.join(random.choices(string.digits, k=6))
-    
+        return ''.join(secrets.choice(string.digits) for _ in range(6))
+
+    @abstractmethod
     def create_otp(self, email, registration_data=None, expiry_minutes=10):
         """
-        Create and store OTP for email
-        
+        Create and store OTP for email (replace OTP lama, reset attempts)
+
         Returns:
             str: Generated OTP code
         """
+
+    @abstractmethod
+    def verify_otp(self, email, otp_code):
+        """
+        Verify OTP for email
+
+        Returns:
+            tuple: (registration_data, error_message)
+        """
+
+    @abstractmethod
+    def has_otp(self, email):
+        """Check if email has pending OTP"""
+
+    @abstractmethod
+    def get_registration_data(self, email):
+        """Get registration data without verifying OTP (tetap ada setelah OTP kadaluarsa)"""
+
+    @abstractmethod
+    def cleanup_expired(self):
+        """Remove record yang melewati registration TTL, returns jumlah yang dihapus"""
+
+    @abstractmethod
+    def delete_otp(self, email):
+        """Delete OTP for email"""
+
+    @abstractmethod
+    def size(self):
+        """Jumlah OTP yang tersimpan"""
+
+
+class MemoryOTPStore(BaseOTPStore):
+    """
+    In-memory OTP store (satu worker)
+    Batas simpan (retain_until) dilacak dengan min-heap sehingga eviction O(log n), dan jumlah entry dibatasi
+    """
+
+    def __init__(self, max_entries=10000, max_attempts=5, registration_ttl_minutes=60):
+        super().__init__(max_attempts, registration_ttl_minutes)
+        self._cache = {}  # {email: {otp_code, expires_at, retain_until, registration_data, attempts, created_at}}
+        self._heap = []   # [(retain_until, seq, email)]
+        self._seq = itertools.count()
+        self._lock = Lock()
+        self.max_entries = max_entries
+
+    def _evict_expired(self, now):
+        """Pop entry yang melewati retain_until dari puncak heap (lock harus sudah dipegang)"""
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            retain_until, _, email = heapq.heappop(self._heap)
+            cached = self._cache.get(email)
+            # Abaikan entry heap basi (OTP sudah diganti / dihapus)
+            if cached and cached['retain_until'] == retain_until:
+                del self._cache[email]
+                removed += 1
+        return removed
+
+    def _evict_overflow(self):
+        """Buang record yang paling cepat habis masa simpannya jika melebihi max_entries"""
+        while len(self._cache) > self.max_entries and self._heap:
+            retain_until, _, email = heapq.heappop(self._heap)
+            cached = self._cache.get(email)
+            if cached and cached['retain_until'] == retain_until:
+                del self._cache[email]
+
+    def _publish_size(self):
+        """Update gauge otp_cache_entries (lock harus sudah dipegang)"""
+        otp_cache_entries.set(len(self._cache))
+
+    def _get_retained(self, email, now):
+        """Ambil record yang belum melewati retain_until (lock harus sudah dipegang)"""
+        cached = self._cache.get(email)
+        if cached and now > cached['retain_until']:
+            del self._cache[email]
+            return None
+        return cached
+
+    def create_otp(self, email, registration_data=None, expiry_minutes=10):
         with self._lock:
+            now = datetime.utcnow()
+            self._evict_expired(now)
+
             otp_code = self.generate_otp()
-            expires_at = datetime.utcnow() + timedelta(minutes=expiry_minutes)
-            
+            expires_at = now + timedelta(minutes=expiry_minutes)
+            retain_until = self._retain_until(now, expires_at)
+
             self._cache[email] = {
                 'otp_code': otp_code,
                 'expires_at': expires_at,
+                'retain_until': retain_until,
                 'registration_data': registration_data,
-                'created_at': datetime.utcnow()
+                'attempts': 0,
+                'created_at': now
             }
-            
+            heapq.heappush(self._heap, (retain_until, next(self._seq), email))
+            self._evict_overflow()
+            self._publish_size()
+
             return otp_code
-    
+
     def verify_otp(self, email, otp_code):
-        """
-        Verify OTP for email
-        
-        Returns:
-            tuple: (registration_data, error_message)
-        """
         with self._lock:
-            cached = self._cache.get(email)
-            
-            if not cached:
-                return None, "Kode OTP tidak ditemukan. Silakan request OTP baru."
-            
-            # Check if expired
-            if datetime.utcnow() > cached['expires_at']:
-                del self._cache[email]  # Clean up expired
-                return None, "Kode OTP sudah kadaluarsa. Silakan request OTP baru."
-            
-            # Check if OTP matches
-            if cached['otp_code'] != otp_code:
-                return None, "Kode OTP salah. Silakan coba lagi."
-            
-            # OTP valid - return registration data and delete from cache
-            registration_data = cached['registration_data']
-            del self._cache[email]
-            
-            return registration_data, None
-    
+            try:
+                return self._verify(email, otp_code)
+            finally:
+                self._publish_size()
+
+    def _verify(self, email, otp_code):
+        """Verifikasi OTP (lock harus sudah dipegang)"""
+        now = datetime.utcnow()
+        cached = self._get_retained(email, now)
+
+        if not cached:
+            return None, OTP_NOT_FOUND
+
+        # Check if expired (record tetap disimpan untuk resend OTP)
+        if now > cached['expires_at']:
+            return None, OTP_EXPIRED
+
+        if cached['attempts'] >= self.max_attempts:
+            return None, OTP_TOO_MANY_ATTEMPTS
+
+        # Check if OTP matches (constant-time)
+        if not hmac.compare_digest(cached['otp_code'], str(otp_code)):
+            cached['attempts'] += 1
+            if cached['attempts'] >= self.max_attempts:
+                # Kunci kode saja, registration_data tetap ada untuk resend OTP
+                cached['otp_code'] = ''
+                return None, OTP_TOO_MANY_ATTEMPTS
+            return None, OTP_INVALID
+
+        # OTP valid - return registration data and delete from cache
+        del self._cache[email]
+        return cached['registration_data'], None
+
     def has_otp(self, email):
-        """Check if email has pending OTP"""
         with self._lock:
-            cached = self._cache.get(email)
-            if not cached:
-                return False
-            
-            # Check if expired
-            if datetime.utcnow() > cached['expires_at']:
-                del self._cache[email]
-                return False
-            
-            return True
-    
+            now = datetime.utcnow()
+            cached = self._get_retained(email, now)
+            return cached is not None and now <= cached['expires_at'] \
+                and cached['attempts'] < self.max_attempts
+
     def get_registration_data(self, email):
-        """Get registration data without verifying OTP"""
         with self._lock:
-            cached = self._cache.get(email)
-            if cached:
-                return cached.get('registration_data')
-            return None
-    
+            cached = self._get_retained(email, datetime.utcnow())
+            return cached.get('registration_data') if cached else None
+
     def cleanup_expired(self):
-        """Remove expired OTPs from cache"""
         with self._lock:
-            now = datetime.utcnow()
-            expired_emails = [
-                email for email, data in self._cache.items()
-                if now > data['expires_at']
-            ]
-            for email in expired_emails:
-                del self._cache[email]
-    
+            removed = self._evict_expired(datetime.utcnow())
+            self._publish_size()
+            # Rapikan heap jika terlalu banyak entry basi
+            if len(self._heap) > 2 * len(self._cache) + 64:
+                self._heap = [
+                    (data['retain_until'], next(self._seq), email)
+                    for email, data in self._cache.items()
+                ]
+                heapq.heapify(self._heap)
+            return removed
+
     def delete_otp(self, email):
-        """Delete OTP for email"""
         with self._lock:
-            if email in self._cache:
-                del self._cache[email]
+            self._cache.pop(email, None)
+            self._publish_size()
+
+    def size(self):
+        return len(self._cache)
+
+
+class DatabaseOTPStore(BaseOTPStore):
+    """
+    OTP store di tabel otp_codes (dibagi antar worker / node)
+    Kode disimpan sebagai HMAC, attempts ada di record yang sama dan diupdate dengan row lock
+    Memakai koneksi terpisah dari db.session agar tidak ikut commit/rollback request
+    Batas simpan record dihitung dari created_at (OTP terakhir) + registration TTL
+    """
+
+    def __init__(self, db, secret_key, max_attempts=5, registration_ttl_minutes=60):
+        super().__init__(max_attempts, registration_ttl_minutes)
+        self.db = db
+        self.secret_key = secret_key
+
+    @property
+    def table(self):
+        from app.models.otp_model import OTPCode
+        return OTPCode.__table__
+
+    def _hash(self, email, otp_code):
+        message = f"{email}:{otp_code}".encode()
+        return hmac.new(self.secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+    def create_otp(self, email, registration_data=None, expiry_minutes=10):
+        table = self.table
+        otp_code = self.generate_otp()
+        now = datetime.utcnow()
+        values = {
+            'otp_hash': self._hash(email, otp_code),
+            'registration_data': json.dumps(registration_data) if registration_data is not None else None,
+            'attempts': 0,
+            'expires_at': now + timedelta(minutes=expiry_minutes),
+            'created_at': now
+        }
+
+        with self.db.engine.begin() as conn:
+            result = conn.execute(update(table).where(table.c.email == email).values(**values))
+            if result.rowcount == 0:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(insert(table).values(email=email, **values))
+                except IntegrityError:
+                    # Worker lain insert bersamaan, OTP terbaru menang
+                    conn.execute(update(table).where(table.c.email == email).values(**values))
+
+        return otp_code
+
+    def verify_otp(self, email, otp_code):
+        table = self.table
+        with self.db.engine.begin() as conn:
+            row = conn.execute(
+                select(table).where(table.c.email == email).with_for_update()
+            ).first()
+
+            if not row:
+                return None, OTP_NOT_FOUND
+
+            if datetime.utcnow() > row.expires_at:
+                # Record tetap disimpan untuk resend OTP, dibersihkan cleanup_expired
+                return None, OTP_EXPIRED
+
+            if row.attempts >= self.max_attempts:
+                return None, OTP_TOO_MANY_ATTEMPTS
+
+            if not hmac.compare_digest(row.otp_hash, self._hash(email, otp_code)):
+                attempts = row.attempts + 1
+                if attempts >= self.max_attempts:
+                    # Kunci kode saja (hash dikosongkan), registration_data tetap ada untuk resend OTP
+                    conn.execute(
+                        update(table).where(table.c.email == email).values(attempts=attempts, otp_hash='')
+                    )
+                    return None, OTP_TOO_MANY_ATTEMPTS
+                conn.execute(update(table).where(table.c.email == email).values(attempts=attempts))
+                return None, OTP_INVALID
+
+            conn.execute(delete(table).where(table.c.email == email))
+            return json.loads(row.registration_data) if row.registration_data else None, None
+
+    def _get_retained(self, email):
+        """Ambil record yang belum melewati registration TTL"""
+        table = self.table
+        with self.db.engine.connect() as conn:
+            row = conn.execute(
+                select(table.c.registration_data, table.c.expires_at, table.c.created_at, table.c.attempts)
+                .where(table.c.email == email)
+            ).first()
+        if not row or datetime.utcnow() > self._retain_until(row.created_at, row.expires_at):
+            return None
+        return row
+
+    def has_otp(self, email):
+        row = self._get_retained(email)
+        return row is not None and datetime.utcnow() <= row.expires_at and row.attempts < self.max_attempts
+
+    def get_registration_data(self, email):
+        row = self._get_retained(email)
+        if not row or not row.registration_data:
+            return None
+        return json.loads(row.registration_data)
+
+    def cleanup_expired(self):
+        table = self.table
+        now = datetime.utcnow()
+        cutoff = now - timedelta(minutes=self.registration_ttl_minutes)
+        with self.db.engine.begin() as conn:
+            # expires_at memakai index, created_at menjaga data registrasi selama TTL
+            result = conn.execute(
+                delete(table).where(table.c.expires_at < now, table.c.created_at < cutoff)
+            )
+            return result.rowcount
+
+    def delete_otp(self, email):
+        table = self.table
+        with self.db.engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.email == email))
+
+    def size(self):
+        from sqlalchemy import func
+        with self.db.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(self.table)).scalar()
+
+
+class OTPStoreProxy:
+    """
+    Titik akses global OTP store
+    Backend dipilih dari config OTP_STORE_BACKEND ('memory' / 'database') saat create_app
+    """
+
+    def __init__(self):
+        self._store = MemoryOTPStore()
+
+    def init_app(self, app):
+        max_attempts = app.config.get('OTP_MAX_ATTEMPTS', 5)
+        registration_ttl = app.config.get('OTP_REGISTRATION_TTL_MINUTES', 60)
+        if app.config.get('OTP_STORE_BACKEND', 'memory') == 'database':
+            from extensions import db
+            self._store = DatabaseOTPStore(
+                db, app.config['SECRET_KEY'],
+                max_attempts=max_attempts,
+                registration_ttl_minutes=registration_ttl
+            )
+        else:
+            self._store = MemoryOTPStore(
+                max_entries=app.config.get('OTP_MAX_ENTRIES', 10000),
+                max_attempts=max_attempts,
+                registration_ttl_minutes=registration_ttl
+            )
+
+    @property
+    def store(self):
+        return self._store
+
+    def __getattr__(self, name):
+        return getattr(self._store, name)
+
 
+# Backward compatible name
+OTPCache = MemoryOTPStore
 
 # Global OTP cache instance
-otp_cache = OTPCache()
\ No newline at end of file
+otp_cache = OTPStoreProxy()
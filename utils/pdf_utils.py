@@ -6,6 +6,7 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from io import BytesIO
 from flask import current_app
+from utils.storage import storage
 
 # def add_signature_to_pdf(pdf_path, signature_path, qr_path, output_path,dosen_nama):
 #     """
@@ -114,7 +115,8 @@ def add_signature_to_pdf(
     try:
         if not os.path.exists(pdf_path):
             return False, f"PDF file not found: {pdf_path}"
-        if not os.path.exists(signature_path):
+        # signature_path boleh berupa path atau ImageReader (dari signature_cache)
+        if isinstance(signature_path, str) and not os.path.exists(signature_path):
             return False, f"Signature file not found: {signature_path}"
         if not os.path.exists(qr_path):
             return False, f"QR code file not found: {qr_path}"
@@ -168,7 +170,8 @@ def add_signature_to_pdf(
             signature_y,
             width=signature_width,
             height=signature_height,
-            preserveAspectRatio=True
+            preserveAspectRatio=True,
+            mask='auto'
         )
 
         # ================= QR =================
@@ -239,9 +242,44 @@ def add_signature_to_pdf(
     except Exception as e:
         return False, f"Error processing PDF: {str(e)}"
 
+def add_signature_to_stored_pdf(
+    file_path,
+    ttd_path,
+    qr_filename,
+    output_path,
+    dosen_nama,
+    jabatan_dosen,
+    nama_jenis_permohonan,
+    signed_at
+):
+    """
+    add_signature_to_pdf untuk file yang ada di storage (path relatif database)
+    Input diambil lewat driver storage aktif (S3: di-download sementara),
+    TTD dari signature_cache (sudah di-decode), hasil ditulis ke output_path lokal
+    """
+    from utils.signature_cache import signature_cache
+
+    try:
+        signature_reader = signature_cache.get(ttd_path)
+        with storage.local_path('uploads', file_path) as pdf_path, \
+                storage.local_path('qr_codes', qr_filename) as qr_path:
+            return add_signature_to_pdf(
+                pdf_path,
+                signature_reader,
+                qr_path,
+                output_path,
+                dosen_nama,
+                jabatan_dosen,
+                nama_jenis_permohonan,
+                signed_at
+            )
+    except FileNotFoundError as e:
+        return False, f"File not found in storage: {e}"
+
 def get_full_file_path(relative_path, base_folder='uploads'):
     """
     Get full file path from relative path
+    Hanya untuk STORAGE_BACKEND lokal, backend lain pakai storage.local_path()
     
     Args:
         relative_path: Path relatif file (misal: 'permohonan/file.pdf' atau 'qr_xxx.png')
@@ -250,13 +288,11 @@ def get_full_file_path(relative_path, base_folder='uploads'):
     Returns:
         str: Full absolute path
     """
-    if base_folder == 'uploads':
-        base_path = current_app.config['UPLOAD_FOLDER']
-    elif base_folder == 'signed':
-        base_path = current_app.config['UPLOAD_SIGNED']  
-    elif base_folder == 'qr_codes':
-        base_path = current_app.config['QR_CODE_FOLDER']
-    else:
-        base_path = current_app.config['UPLOAD_FOLDER']
+    if base_folder not in ('uploads', 'signed', 'qr_codes'):
+        base_folder = 'uploads'
+
+    base_path = storage.local_root(base_folder)
+    if base_path is None:
+        raise RuntimeError("get_full_file_path requires local storage, use storage.local_path()")
     
-    return os.path.join(base_path, relative_path)
\ No newline at end of file
+    return os.path.join(base_path, relative_path)
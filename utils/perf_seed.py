@@ -0,0 +1,512 @@
+# utils/perf_seed.py
+import io
+import os
+import csv
+import json
+import uuid
+import random
+import bisect
+import hashlib
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, update, func
+from extensions import db
+
+# Semua user sintetis memakai domain ini (.invalid tidak pernah bisa menerima email)
+PERF_EMAIL_DOMAIN = 'perf.invalid'
+PERF_NAME_PREFIX = 'Perf'
+
+# Rentang waktu data: 3 tahun sampai PERF_END_TIME (tetap, agar deterministik)
+PERF_END_TIME = datetime(2025, 12, 31)
+PERF_SPAN_DAYS = 3 * 365
+
+DEFAULT_VOLUMES = {
+    'fakultas': 5,
+    'prodi': 50,
+    'dosen': 2000,
+    'mahasiswa': 60000,
+    'permohonan': 2000000,
+    'admins': 3,
+}
+
+# Permohonan baru (< 14 hari) masih banyak di pending, yang lama mayoritas selesai
+RECENT_STATUS_WEIGHTS = (('pending', 55), ('disetujui', 15), ('ditolak', 10), ('ditandatangani', 15), ('selesai', 5))
+OLD_STATUS_WEIGHTS = (('pending', 4), ('disetujui', 3), ('ditolak', 12), ('ditandatangani', 26), ('selesai', 55))
+
+JENIS_DEFAULTS = (
+    'Surat Keterangan Aktif Kuliah', 'Review', 'Surat Rekomendasi', 'Cuti Akademik',
+    'Perpanjangan Studi', 'Surat Izin Penelitian', 'Transkip Sementara', 'Pindah Program Studi',
+)
+JABATAN = ('Dosen', 'Dosen', 'Dosen', 'Kaprodi', 'Wakil Dekan', 'Dekan')
+FIRST_NAMES = (
+    'Agus', 'Budi', 'Citra', 'Dewi', 'Eko', 'Fitri', 'Galih', 'Hana', 'Indra', 'Joko',
+    'Kartika', 'Lukas', 'Maria', 'Nanda', 'Oki', 'Putri', 'Rizky', 'Sari', 'Teguh', 'Yohana',
+)
+LAST_NAMES = (
+    'Santoso', 'Wijaya', 'Pratama', 'Saputra', 'Kurniawan', 'Lestari', 'Hidayat', 'Nugroho',
+    'Setiawan', 'Siregar', 'Simanjuntak', 'Tanoto', 'Halim', 'Gunawan', 'Susanto',
+)
+JUDUL_WORDS = (
+    'permohonan', 'surat', 'keterangan', 'aktif', 'kuliah', 'rekomendasi', 'beasiswa',
+    'penelitian', 'magang', 'cuti', 'semester', 'yudisium', 'transkip', 'nilai', 'skripsi',
+)
+
+
+def _skewed_cum_weights(count, exponent):
+    """Cumulative weights Zipf-like: item awal jauh lebih sering dipilih"""
+    total = 0.0
+    cum = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank ** exponent
+        cum.append(total)
+    return cum
+
+
+def _pick(rng, items, cum_weights):
+    return items[bisect.bisect_left(cum_weights, rng.random() * cum_weights[-1])]
+
+
+class BulkWriter:
+    """
+    Insert batch besar: COPY FROM STDIN (Postgres) atau executemany (lainnya)
+    """
+
+    def __init__(self, connection, batch_size=10000):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.use_copy = connection.dialect.name == 'postgresql'
+
+    def write(self, table, rows):
+        """
+        Args:
+            rows: iterable dict (key = nama kolom, semua row punya key yang sama)
+
+        Returns:
+            jumlah row
+        """
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                total += self._flush(table, batch)
+                batch = []
+        if batch:
+            total += self._flush(table, batch)
+        return total
+
+    def _flush(self, table, batch):
+        if self.use_copy:
+            self._copy(table, batch)
+        else:
+            self.connection.execute(insert(table), batch)
+        return len(batch)
+
+    def _copy(self, table, batch):
+        columns = list(batch[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow([self._csv_value(row[name]) for name in columns])
+        buffer.seek(0)
+
+        cursor = self.connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _csv_value(value):
+        # CSV COPY: field kosong tanpa quote = NULL
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, datetime):
+            return value.isoformat(sep=' ')
+        return value
+
+
+class PerfSeeder:
+    """
+    Generator data sintetis deterministik untuk load / scaling test
+
+    Seed yang sama menghasilkan data yang sama (id, nama, status, timestamp).
+    Skew realistis: dosen dan mahasiswa populer menerima jauh lebih banyak
+    permohonan (Zipf), status bergantung umur permohonan.
+    """
+
+    def __init__(self, app, seed=42, volumes=None, batch_size=10000, with_files=True, echo=print):
+        self.app = app
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.volumes = dict(DEFAULT_VOLUMES, **(volumes or {}))
+        self.batch_size = batch_size
+        self.with_files = with_files
+        self.echo = echo
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _tables(self):
+        from app.models.fakultas_model import Fakultas, ProgramStudi
+        from app.models.permohonan_model import Permohonan, JenisPermohonan
+        from app.models.user_model import User
+        from app.models.dosen_model import Dosen
+        from app.models.mahasiswa_model import Mahasiswa
+        from app.models.file_blob_model import FileBlob
+        return {
+            'fakultas': Fakultas.__table__,
+            'program_studi': ProgramStudi.__table__,
+            'jenis_permohonan': JenisPermohonan.__table__,
+            'users': User.__table__,
+            'dosen': Dosen.__table__,
+            'mahasiswa': Mahasiswa.__table__,
+            'permohonan': Permohonan.__table__,
+            'file_blobs': FileBlob.__table__,
+        }
+
+    # ===== RESET =====
+
+    def has_data(self, connection):
+        users = self._tables()['users']
+        return connection.execute(
+            select(func.count()).select_from(users).where(users.c.email.like(f"%@{PERF_EMAIL_DOMAIN}"))
+        ).scalar() > 0
+
+    def reset(self, connection):
+        """Hapus data sintetis sebelumnya (user @perf.invalid dan turunannya)"""
+        from app.models.history_model import History
+        from app.models.notification_model import Notification
+
+        tables = self._tables()
+        users = tables['users']
+        permohonan = tables['permohonan']
+        perf_users = select(users.c.id).where(users.c.email.like(f"%@{PERF_EMAIL_DOMAIN}"))
+        perf_permohonan = select(permohonan.c.id).where(permohonan.c.id_mahasiswa.in_(perf_users))
+
+        connection.execute(delete(Notification.__table__).where(Notification.__table__.c.permohonan_id.in_(perf_permohonan)))
+        connection.execute(delete(History.__table__).where(History.__table__.c.permohonan_id.in_(perf_permohonan)))
+        connection.execute(delete(permohonan).where(permohonan.c.id_mahasiswa.in_(perf_users)))
+        connection.execute(delete(tables['mahasiswa']).where(tables['mahasiswa'].c.user_id.in_(perf_users)))
+        connection.execute(delete(tables['dosen']).where(tables['dosen'].c.user_id.in_(perf_users)))
+        connection.execute(delete(Notification.__table__).where(Notification.__table__.c.user_id.in_(perf_users)))
+        connection.execute(delete(users).where(users.c.email.like(f"%@{PERF_EMAIL_DOMAIN}")))
+
+        fakultas, prodi = tables['fakultas'], tables['program_studi']
+        perf_fakultas = select(fakultas.c.id).where(fakultas.c.nama_fakultas.like(f"{PERF_NAME_PREFIX} %"))
+        connection.execute(delete(prodi).where(prodi.c.fakultas_id.in_(perf_fakultas)))
+        connection.execute(delete(fakultas).where(fakultas.c.nama_fakultas.like(f"{PERF_NAME_PREFIX} %")))
+
+        blobs = tables['file_blobs']
+        connection.execute(delete(blobs).where(blobs.c.path.like('%/perf/%')))
+
+    # ===== GENERATE =====
+
+    def run(self, reset=False):
+        """
+        Returns:
+            dict jumlah row per tabel
+        """
+        counts = {}
+        with db.engine.begin() as connection:
+            if self.has_data(connection):
+                if not reset:
+                    raise RuntimeError("Synthetic data already exists, rerun with --reset")
+                self.echo("🧹 Removing previous synthetic data ...")
+                self.reset(connection)
+
+            writer = BulkWriter(connection, self.batch_size)
+            tables = self._tables()
+
+            prodi_by_fakultas = self._seed_fakultas(connection, writer, tables, counts)
+            jenis_ids = self._seed_jenis(connection, writer, tables, counts)
+            files = self._seed_files() if self.with_files else None
+            dosen_by_fakultas = self._seed_dosen(writer, tables, counts, prodi_by_fakultas, files)
+            mahasiswa = self._seed_mahasiswa(writer, tables, counts, prodi_by_fakultas)
+            self._seed_admins(writer, tables, counts)
+            self._seed_permohonan(writer, tables, counts, mahasiswa, dosen_by_fakultas, jenis_ids, files)
+            if files:
+                self._register_blobs(connection, tables, files)
+            if db.engine.dialect.name == 'postgresql':
+                self._sync_sequences(connection)
+
+        if db.engine.dialect.name == 'postgresql':
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                for name in ('users', 'dosen', 'mahasiswa', 'permohonan'):
+                    connection.exec_driver_sql(f"ANALYZE {name}")
+        return counts
+
+    def _sync_sequences(self, connection):
+        """Majukan sequence serial setelah insert dengan id eksplisit (COPY tidak memakai nextval)"""
+        for name in ('fakultas', 'program_studi', 'jenis_permohonan'):
+            connection.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                f"COALESCE((SELECT max(id) FROM {name}), 1), "
+                f"(SELECT max(id) FROM {name}) IS NOT NULL)"
+            )
+
+    def _next_id(self, connection, table):
+        return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def _seed_fakultas(self, connection, writer, tables, counts):
+        fakultas_start = self._next_id(connection, tables['fakultas'])
+        prodi_start = self._next_id(connection, tables['program_studi'])
+        created = datetime(2020, 1, 1)
+
+        fakultas_ids = [fakultas_start + i for i in range(self.volumes['fakultas'])]
+        counts['fakultas'] = writer.write(tables['fakultas'], (
+            {'id': fakultas_id, 'nama_fakultas': f"{PERF_NAME_PREFIX} Fakultas {index + 1:02d}",
+             'created_at': created, 'updated_at': created}
+            for index, fakultas_id in enumerate(fakultas_ids)
+        ))
+
+        prodi_by_fakultas = {fakultas_id: [] for fakultas_id in fakultas_ids}
+        rows = []
+        for index in range(self.volumes['prodi']):
+            fakultas_id = fakultas_ids[index % len(fakultas_ids)]
+            prodi_id = prodi_start + index
+            prodi_by_fakultas[fakultas_id].append(prodi_id)
+            rows.append({'id': prodi_id, 'fakultas_id': fakultas_id,
+                         'nama_prodi': f"{PERF_NAME_PREFIX} Prodi {index + 1:03d}",
+                         'created_at': created, 'updated_at': created})
+        counts['program_studi'] = writer.write(tables['program_studi'], rows)
+        return prodi_by_fakultas
+
+    def _seed_jenis(self, connection, writer, tables, counts):
+        """Pakai jenis permohonan yang sudah ada (migration data awal), buat default jika kosong"""
+        jenis = tables['jenis_permohonan']
+        ids = [row.id for row in connection.execute(select(jenis.c.id).order_by(jenis.c.id))]
+        if ids:
+            counts['jenis_permohonan'] = 0
+            return ids
+
+        created = datetime(2020, 1, 1)
+        start = self._next_id(connection, jenis)
+        ids = [start + i for i in range(len(JENIS_DEFAULTS))]
+        counts['jenis_permohonan'] = writer.write(jenis, (
+            {'id': jenis_id, 'nama_jenis_permohonan': name, 'deskripsi': None, 'route_path': None,
+             'is_active': True, 'created_at': created, 'updated_at': created}
+            for jenis_id, name in zip(ids, JENIS_DEFAULTS)
+        ))
+        return ids
+
+    def _seed_files(self, uploads=12, signed=12, signatures=10):
+        """
+        Contoh PDF & TTD (sedikit file, dipakai bersama banyak row lewat blob store)
+
+        Returns:
+            dict: upload/signed = [(path, sha256, size)], signatures = [path], refs = {path: count}
+        """
+        from benchmarks.fixtures import pdf_bytes, signature_png
+        from utils.blob_store import upload_blobs, signed_blobs
+        from utils.storage import storage
+
+        config = self.app.config
+        signed_prefix = os.path.join(
+            os.path.relpath(config['DOCUMENT_PERMOHONAN_TTD_PATH'], config['UPLOAD_SIGNED']), 'perf'
+        )
+
+        def store(blob_store, area, prefix, data):
+            sha256 = hashlib.sha256(data).hexdigest()
+            path = blob_store.relative_path(prefix, sha256, '.pdf')
+            storage.put_bytes(area, path, data, content_type='application/pdf')
+            return path, sha256, len(data)
+
+        files = {
+            'upload': [store(upload_blobs, 'uploads', 'permohonan/perf', pdf_bytes(1 + i % 3, seed=self.seed + i))
+                       for i in range(uploads)],
+            'signed': [store(signed_blobs, 'signed', signed_prefix, pdf_bytes(1 + i % 3, seed=self.seed + 100 + i))
+                       for i in range(signed)],
+            'signatures': [],
+            'refs': {},
+        }
+        for i in range(signatures):
+            path = f"signatures/perf/ttd_{i:02d}.png"
+            storage.put_bytes('uploads', path, signature_png(seed=self.seed + i), content_type='image/png')
+            files['signatures'].append(path)
+        self.echo(f"📄 Stored {uploads + signed} sample PDFs and {signatures} signatures")
+        return files
+
+    def _user_row(self, user_id, nomor_induk, email, role, created_at):
+        return {
+            'id': user_id,
+            'nomor_induk': nomor_induk,
+            'password': None,
+            'nama': self._name(),
+            'email': email,
+            'role': role,
+            'is_active': self.rng.random() > 0.02,
+            'no_hp': f"08{self.rng.randint(10 ** 9, 10 ** 10 - 1)}",
+            'last_login': created_at + timedelta(days=self.rng.randint(0, 900)) if self.rng.random() > 0.1 else None,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+    def _seed_dosen(self, writer, tables, counts, prodi_by_fakultas, files):
+        fakultas_ids = list(prodi_by_fakultas)
+        users, dosen = [], []
+        dosen_by_fakultas = {fakultas_id: [] for fakultas_id in fakultas_ids}
+        for index in range(self.volumes['dosen']):
+            user_id = self._uuid()
+            fakultas_id = fakultas_ids[index % len(fakultas_ids)]
+            created_at = PERF_END_TIME - timedelta(days=PERF_SPAN_DAYS + self.rng.randint(0, 1000))
+            users.append(self._user_row(
+                user_id, f"PD{index:06d}", f"dosen{index:05d}@{PERF_EMAIL_DOMAIN}", 'dosen', created_at
+            ))
+            dosen.append({
+                'user_id': user_id,
+                'fakultas_id': fakultas_id,
+                'gelar_depan': self.rng.choice(('', 'Dr.', 'Prof.', 'Ir.')) or None,
+                'gelar_belakang': self.rng.choice(('S.Kom., M.Cs.', 'M.Kom.', 'Ph.D.', 'M.T.')),
+                'jabatan': self.rng.choice(JABATAN),
+                'ttd_path': files['signatures'][index % len(files['signatures'])] if files else None,
+                'signature_upload_at': created_at,
+            })
+            dosen_by_fakultas[fakultas_id].append(user_id)
+
+        counts['users'] = counts.get('users', 0) + writer.write(tables['users'], users)
+        counts['dosen'] = writer.write(tables['dosen'], dosen)
+        self.echo(f"👨‍🏫 {counts['dosen']} dosen")
+        return dosen_by_fakultas
+
+    def _seed_mahasiswa(self, writer, tables, counts, prodi_by_fakultas):
+        """
+        Returns:
+            list[(user_id, fakultas_id)]
+        """
+        prodi = [(fakultas_id, prodi_id) for fakultas_id, ids in prodi_by_fakultas.items() for prodi_id in ids]
+        mahasiswa = []
+
+        def rows():
+            for index in range(self.volumes['mahasiswa']):
+                user_id = self._uuid()
+                fakultas_id, prodi_id = self.rng.choice(prodi)
+                created_at = PERF_END_TIME - timedelta(days=self.rng.randint(0, PERF_SPAN_DAYS + 365))
+                mahasiswa.append((user_id, fakultas_id, prodi_id))
+                yield self._user_row(
+                    user_id, f"PM{index:08d}", f"mhs{index:06d}@{PERF_EMAIL_DOMAIN}", 'mahasiswa', created_at
+                )
+
+        counts['users'] = counts.get('users', 0) + writer.write(tables['users'], rows())
+        counts['mahasiswa'] = writer.write(tables['mahasiswa'], (
+            {'user_id': user_id, 'fakultas_id': fakultas_id, 'program_studi_id': prodi_id,
+             'semester': min(14, 1 + int(self.rng.expovariate(1 / 4)))}
+            for user_id, fakultas_id, prodi_id in mahasiswa
+        ))
+        self.echo(f"🎓 {counts['mahasiswa']} mahasiswa")
+        return [(user_id, fakultas_id) for user_id, fakultas_id, _ in mahasiswa]
+
+    def _seed_admins(self, writer, tables, counts):
+        created_at = datetime(2020, 1, 1)
+        counts['users'] = counts.get('users', 0) + writer.write(tables['users'], (
+            self._user_row(self._uuid(), f"PA{index:04d}", f"admin{index:02d}@{PERF_EMAIL_DOMAIN}", 'admin', created_at)
+            for index in range(self.volumes['admins'])
+        ))
+
+    def _seed_permohonan(self, writer, tables, counts, mahasiswa, dosen_by_fakultas, jenis_ids, files):
+        from utils.qr_utils import generate_verification_signature
+
+        secret_key = self.app.config['SECRET_KEY']
+        frontend_url = self.app.config.get('FRONTEND_URL', 'https://fti-service.netlify.app')
+        mahasiswa_cum = _skewed_cum_weights(len(mahasiswa), 0.6)
+        dosen_cum = {fakultas_id: _skewed_cum_weights(len(ids), 1.0) for fakultas_id, ids in dosen_by_fakultas.items() if ids}
+        jenis_cum = _skewed_cum_weights(len(jenis_ids), 1.2)
+        recent_statuses, recent_weights = zip(*RECENT_STATUS_WEIGHTS)
+        old_statuses, old_weights = zip(*OLD_STATUS_WEIGHTS)
+        refs = files['refs'] if files else None
+        start = PERF_END_TIME - timedelta(days=PERF_SPAN_DAYS)
+
+        def rows():
+            for index in range(self.volumes['permohonan']):
+                rng = self.rng
+                permohonan_id = self._uuid()
+                mahasiswa_id, fakultas_id = _pick(rng, mahasiswa, mahasiswa_cum)
+                dosen_id = _pick(rng, dosen_by_fakultas[fakultas_id], dosen_cum[fakultas_id])
+                created_at = start + timedelta(seconds=rng.randint(0, PERF_SPAN_DAYS * 86400))
+                recent = (PERF_END_TIME - created_at).days < 14
+                status = rng.choices(*(
+                    (recent_statuses, recent_weights) if recent else (old_statuses, old_weights)
+                ))[0]
+
+                row = {
+                    'id': permohonan_id,
+                    'id_jenis_permohonan': _pick(rng, jenis_ids, jenis_cum),
+                    'id_mahasiswa': mahasiswa_id,
+                    'id_dosen': dosen_id,
+                    'judul': ' '.join(rng.choice(JUDUL_WORDS) for _ in range(rng.randint(3, 8))).capitalize(),
+                    'deskripsi': None if rng.random() < 0.4 else ' '.join(rng.choice(JUDUL_WORDS) for _ in range(20)),
+                    'file_path': None, 'file_name': None, 'file_hash': None, 'file_signed_path': None,
+                    'page_count': None, 'thumbnail_path': None,
+                    'komentar': None, 'komentar_penolakan': None,
+                    'qr_code_data': None, 'qr_code_path': None,
+                    'status_permohonan': status,
+                    'approved_at': None, 'signed_at': None, 'rejected_at': None,
+                    'version': 1,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+                acted_at = created_at + timedelta(minutes=rng.randint(10, 60 * 24 * 7))
+
+                if status in ('pending', 'disetujui') and files:
+                    sample = index % len(files['upload'])
+                    path, sha256, _ = files['upload'][sample]
+                    row.update(file_path=path, file_name=f"permohonan_{index}.pdf", file_hash=sha256,
+                               page_count=1 + sample % 3)
+                    refs[path] = refs.get(path, 0) + 1
+                if status == 'disetujui':
+                    row.update(approved_at=acted_at, version=2)
+                elif status == 'ditolak':
+                    row.update(rejected_at=acted_at, komentar_penolakan='Dokumen belum lengkap', version=2)
+                elif status in ('ditandatangani', 'selesai'):
+                    signed_at = acted_at.isoformat()
+                    signature = generate_verification_signature(
+                        {'permohonan_id': permohonan_id, 'signed_at': signed_at, 'signed_by': dosen_id}, secret_key
+                    )
+                    row.update(
+                        signed_at=acted_at,
+                        version=2 if status == 'ditandatangani' else 3,
+                        qr_code_data=json.dumps({
+                            'permohonan_id': permohonan_id,
+                            'verify_url': f"{frontend_url}/verify-document/{permohonan_id}",
+                            'signature': signature,
+                            'timestamp': signed_at,
+                            'data': {'permohonan_id': permohonan_id, 'signed_by': dosen_id, 'signed_at': signed_at},
+                        })
+                    )
+                    if files:
+                        path = files['signed'][index % len(files['signed'])][0]
+                        row['file_signed_path'] = path
+                        refs[path] = refs.get(path, 0) + 1
+                row['updated_at'] = max(created_at, acted_at) if status != 'pending' else created_at
+
+                if index and index % 200000 == 0:
+                    self.echo(f"   ... {index} permohonan")
+                yield row
+
+        counts['permohonan'] = writer.write(tables['permohonan'], rows())
+        self.echo(f"📝 {counts['permohonan']} permohonan")
+
+    def _register_blobs(self, connection, tables, files):
+        """Reference count blob = jumlah row yang memakai file contoh"""
+        blobs = tables['file_blobs']
+        now = datetime.utcnow()
+        for store_name, entries in (('uploads', files['upload']), ('signed', files['signed'])):
+            for path, sha256, size in entries:
+                ref_count = files['refs'].get(path, 0)
+                if not ref_count:
+                    continue
+                key = (blobs.c.store == store_name) & (blobs.c.path == path)
+                updated = connection.execute(
+                    update(blobs).where(key).values(ref_count=blobs.c.ref_count + ref_count)
+                ).rowcount
+                if not updated:
+                    connection.execute(insert(blobs).values(
+                        store=store_name, path=path, sha256=sha256, size=size,
+                        ref_count=ref_count, created_at=now
+                    ))
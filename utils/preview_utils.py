@@ -0,0 +1,134 @@
+# utils/preview_utils.py
+import os
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import update
+from extensions import db
+from utils.storage import storage
+
+# pdfium tidak thread-safe, render diserialisasi per proses
+_render_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def preview_relative_path(sha256):
+    """Thumbnail disimpan per isi file (upload identik berbagi thumbnail)"""
+    return os.path.join('previews', sha256[:2], f"{sha256}.jpg")
+
+
+def render_pdf_preview(pdf_path, width):
+    """
+    Render halaman pertama PDF ke JPEG dan hitung jumlah halaman
+
+    Returns:
+        (page_count, jpeg_bytes): jpeg_bytes None jika renderer (pypdfium2) tidak terpasang
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        from PyPDF2 import PdfReader
+        return len(PdfReader(pdf_path).pages), None
+
+    with _render_lock:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page_count = len(pdf)
+            page = pdf[0]
+            page_width, _ = page.get_size()
+            image = page.render(scale=width / page_width).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+
+    buffer = BytesIO()
+    image.convert('RGB').save(buffer, format='JPEG', quality=80, optimize=True)
+    return page_count, buffer.getvalue()
+
+
+def generate_permohonan_preview(permohonan_id):
+    """
+    Buat thumbnail halaman pertama + page count untuk permohonan, simpan di
+    storage area 'uploads' (previews/) dan update kolom permohonan
+
+    Returns:
+        (dict, error)
+    """
+    from app.models.permohonan_model import Permohonan
+    from app.services.permohonan_state import UPLOAD_STATUSES
+    from utils.blob_store import file_sha256
+
+    table = Permohonan.__table__
+    row = db.session.query(
+        Permohonan.file_path, Permohonan.file_hash
+    ).filter(Permohonan.id == permohonan_id).first()
+
+    if not row or not row.file_path or not row.file_path.lower().endswith('.pdf'):
+        return None, "No PDF to preview"
+
+    try:
+        with storage.local_path('uploads', row.file_path) as pdf_path:
+            sha256 = row.file_hash or file_sha256(pdf_path)
+            thumbnail_path = preview_relative_path(sha256)
+
+            if storage.exists('uploads', thumbnail_path):
+                # Isi sama sudah pernah di-render, cukup hitung halaman
+                from PyPDF2 import PdfReader
+                page_count, jpeg_bytes = len(PdfReader(pdf_path).pages), None
+            else:
+                page_count, jpeg_bytes = render_pdf_preview(
+                    pdf_path, current_app.config.get('PREVIEW_THUMBNAIL_WIDTH', 320)
+                )
+                if jpeg_bytes is None:
+                    thumbnail_path = None
+                else:
+                    storage.put_bytes('uploads', thumbnail_path, jpeg_bytes, content_type='image/jpeg')
+
+        db.session.execute(
+            update(table)
+            .where(table.c.id == permohonan_id)
+            # Sign / reject yang selesai duluan sudah mengosongkan preview, jangan ditulis ulang
+            .where(table.c.status_permohonan.in_(UPLOAD_STATUSES))
+            .values(page_count=page_count, thumbnail_path=thumbnail_path, file_hash=sha256)
+        )
+        db.session.commit()
+        return {'page_count': page_count, 'thumbnail_path': thumbnail_path}, None
+
+    except Exception as e:
+        db.session.rollback()
+        return None, str(e)
+
+
+def _preview_worker(app, permohonan_id):
+    with app.app_context():
+        try:
+            result, error = generate_permohonan_preview(permohonan_id)
+            if error:
+                print(f"⚠️  Preview {permohonan_id} skipped: {error}")
+        finally:
+            db.session.remove()
+
+
+def _get_executor(max_workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='preview')
+        return _executor
+
+
+def schedule_permohonan_preview(permohonan_id):
+    """Jalankan generate_permohonan_preview di background worker (setelah commit)"""
+    if not current_app.config.get('PREVIEW_ENABLED', True):
+        return None
+    app = current_app._get_current_object()
+    executor = _get_executor(app.config.get('PREVIEW_WORKERS', 1))
+    return executor.submit(_preview_worker, app, permohonan_id)
+
+
+def delete_preview(sha256):
+    """Hapus thumbnail saat blob upload terakhir dengan isi ini dihapus"""
+    if sha256:
+        storage.delete('uploads', preview_relative_path(sha256))
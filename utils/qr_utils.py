@@ -90,14 +90,17 @@
 #         return False
 
 # utils/qr_utils.py
-import qrcode
 import hashlib
 import hmac
 import json
 import os
+import time
 from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
 from flask import current_app
-from PIL import Image
+from utils.storage import storage
+from utils.metrics import qr_generation_duration
 
 def generate_verification_signature(data, secret_key):
     """Generate HMAC signature for QR code security"""
@@ -111,6 +114,9 @@ def generate_verification_signature(data, secret_key):
 
 def generate_qr_code(data, permohonan_id):
     """Generate QR code with verification URL and signature"""
+    import qrcode
+
+    started = time.perf_counter()
     try:
         # Get base URL from config
         frontend_url = current_app.config.get('FRONTEND_URL', 'https://fti-service.netlify.app')
@@ -152,14 +158,13 @@ def generate_qr_code(data, permohonan_id):
         # Create QR code image
         img = qr.make_image(fill_color="black", back_color="white")
         
-        # Save QR code
-        qr_folder = current_app.config['QR_CODE_FOLDER']
-        os.makedirs(qr_folder, exist_ok=True)
-        
+        # Save QR code ke storage area 'qr_codes'
         filename = f"qr_{permohonan_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        file_path = os.path.join(qr_folder, filename)
         
-        img.save(file_path)
+        buffer = BytesIO()
+        img.save(buffer)
+        storage.put_bytes('qr_codes', filename, buffer.getvalue(), content_type='image/png')
+        qr_generation_duration.observe(time.perf_counter() - started)
         
         return filename, json.dumps(qr_data), None
         
@@ -179,3 +184,13 @@ def verify_qr_signature(permohonan_id, signed_at, signed_by, provided_signature,
     except Exception as e:
         print(f"Signature verification error: {e}")
         return False
+
+
+@lru_cache(maxsize=4096)
+def verify_qr_signature_cached(permohonan_id, signed_at, signed_by, provided_signature, secret_key):
+    """
+    Memoized verify_qr_signature
+    Hasil verifikasi untuk kombinasi data + signature yang sama tidak berubah,
+    jadi QR yang sering di-scan tidak perlu menghitung ulang HMAC
+    """
+    return verify_qr_signature(permohonan_id, signed_at, signed_by, provided_signature, secret_key)
@@ -0,0 +1,211 @@
+# utils/query_budget.py
+import re
+import threading
+from contextlib import contextmanager
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_BUDGET_MODES = ('off', 'warn', 'raise')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|%s|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    """Endpoint melebihi budget query atau terdeteksi N+1 (mode 'raise')"""
+
+
+def fingerprint(statement):
+    """
+    Normalisasi SQL agar query yang sama dengan parameter berbeda punya
+    fingerprint yang sama: literal -> ?, IN (?, ?, ?) -> IN (?), whitespace dirapikan
+    """
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    statement = _PLACEHOLDER_LIST.sub('(?)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+class QueryLog:
+    """Statement yang dieksekusi selama satu request / blok capture_queries()"""
+
+    def __init__(self):
+        self.statements = []   # [(fingerprint, parameters)]
+
+    def record(self, statement, parameters):
+        self.statements.append((fingerprint(statement), repr(parameters)))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated(self, threshold=3):
+        """
+        Statement identik yang dieksekusi >= threshold kali dengan parameter
+        berbeda (pola N+1: lazy load per baris)
+
+        Returns:
+            list[(fingerprint, jumlah eksekusi)], terbanyak dulu
+        """
+        executions = {}
+        params = {}
+        for key, parameters in self.statements:
+            executions[key] = executions.get(key, 0) + 1
+            params.setdefault(key, set()).add(parameters)
+
+        return sorted(
+            [(key, total) for key, total in executions.items()
+             if total >= threshold and len(params[key]) > 1],
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+    def violations(self, max_queries=None, n_plus_one_threshold=3):
+        """
+        Returns:
+            list[str]: pesan pelanggaran (kosong = aman)
+        """
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} queries, budget {max_queries}")
+        for key, total in self.repeated(n_plus_one_threshold):
+            problems.append(f"N+1: {total}x {key[:200]}")
+        return problems
+
+
+# Blok capture_queries() yang sedang aktif (pytest / script), per thread
+_captures = threading.local()
+
+
+def _active_captures():
+    if not hasattr(_captures, 'stack'):
+        _captures.stack = []
+    return _captures.stack
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for log in _active_captures():
+        log.record(statement, parameters)
+
+    if has_request_context():
+        log = g.get('_query_log')
+        if log is not None:
+            log.record(statement, parameters)
+
+
+def query_budget(max_queries):
+    """
+    Deklarasi budget query untuk satu endpoint (letakkan di bawah @route / @role_required)
+
+        @permohonan_bp.route('/dosen', methods=['GET'])
+        @role_required('dosen')
+        @query_budget(6)
+        def get_permohonan_dosen(): ...
+    """
+    def decorator(f):
+        f._query_budget = max_queries
+        return f
+    return decorator
+
+
+class QueryBudget:
+    """
+    Detektor N+1 dan budget query per endpoint (development / testing)
+
+    QUERY_BUDGET_MODE:
+        off   -> tidak ada listener, tanpa overhead (production)
+        warn  -> pelanggaran di-print
+        raise -> QueryBudgetExceeded (request gagal, test ikut gagal)
+
+    Budget endpoint: @query_budget(n) di view function, fallback ke
+    QUERY_BUDGETS[blueprint] lalu QUERY_BUDGET_DEFAULT.
+    """
+
+    _listening = False
+
+    def init_app(self, app):
+        app.extensions['query_budget'] = self
+        mode = app.config.get('QUERY_BUDGET_MODE', 'off')
+        if mode not in QUERY_BUDGET_MODES:
+            raise ValueError(f"QUERY_BUDGET_MODE must be one of {QUERY_BUDGET_MODES}, got {mode!r}")
+        if mode == 'off':
+            return
+
+        self.listen()
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @classmethod
+    def listen(cls):
+        # Sekali per proses, untuk semua engine
+        if cls._listening:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        cls._listening = True
+
+    @staticmethod
+    def budget_for(endpoint):
+        """Budget query endpoint (None = tanpa batas jumlah, N+1 tetap dicek)"""
+        if not endpoint:
+            return None
+        view = current_app.view_functions.get(endpoint)
+        budget = getattr(view, '_query_budget', None)
+        if budget is not None:
+            return budget
+
+        blueprint = endpoint.rsplit('.', 1)[0] if '.' in endpoint else None
+        budgets = current_app.config.get('QUERY_BUDGETS') or {}
+        if blueprint in budgets:
+            return budgets[blueprint]
+        return current_app.config.get('QUERY_BUDGET_DEFAULT')
+
+    @staticmethod
+    def _start_request():
+        g._query_log = QueryLog()
+
+    def _finish_request(self, response):
+        log = g.pop('_query_log', None)
+        if log is None:
+            return response
+
+        config = current_app.config
+        problems = log.violations(
+            self.budget_for(request.endpoint),
+            config.get('QUERY_N_PLUS_ONE_THRESHOLD', 3)
+        )
+        if not problems:
+            return response
+
+        message = f"{request.method} {request.path} ({request.endpoint}): " + '; '.join(problems)
+        if config.get('QUERY_BUDGET_MODE') == 'raise':
+            raise QueryBudgetExceeded(message)
+        print(f"⚠️ [QUERY BUDGET] {message}")
+        return response
+
+
+@contextmanager
+def capture_queries():
+    """
+    Rekam semua query di thread ini selama blok (tanpa perlu request context)
+
+        with capture_queries() as log:
+            repo.get_by_dosen_with_filter(...)
+        assert not log.violations(max_queries=2)
+    """
+    QueryBudget.listen()
+    log = QueryLog()
+    stack = _active_captures()
+    stack.append(log)
+    try:
+        yield log
+    finally:
+        stack.remove(log)
+
+
+# Global query budget instance
+query_budget_guard = QueryBudget()
+
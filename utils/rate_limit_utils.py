@@ -0,0 +1,245 @@
+# utils/rate_limit_utils.py
+import math
+import time
+import functools
+from collections import OrderedDict
+from threading import Lock
+from flask import request, current_app
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from utils.response_utils import error_response
+
+
+def parse_limit(value):
+    """
+    Parse limit string 'capacity/period_seconds', misal '10/60'
+
+    Returns:
+        tuple: (capacity, refill_per_second)
+    """
+    capacity, period = str(value).split('/', 1)
+    capacity = float(capacity)
+    return capacity, capacity / float(period)
+
+
+class MemoryRateLimitBackend:
+    """
+    Token bucket in-process (per worker)
+    Thread-safe, LRU dengan batas keras max_keys agar scraper dengan banyak IP tidak
+    menghabiskan memori. Bucket yang dibuang paling lama tidak dipakai, jadi (hampir
+    selalu) sudah terisi penuh lagi dan tidak ada bedanya dengan bucket baru
+    """
+
+    def __init__(self, max_keys=50000):
+        self._buckets = OrderedDict()  # {key: (tokens, updated_at)}, urut dari yang paling lama dipakai
+        self._lock = Lock()
+        self.max_keys = max_keys
+
+    def consume(self, key, capacity, refill_rate):
+        """
+        Ambil 1 token dari bucket, O(1)
+
+        Returns:
+            tuple: (allowed, retry_after_seconds)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1 - tokens) / refill_rate
+
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+            return allowed, retry_after
+
+    def purge_idle(self, max_idle_seconds=3600):
+        """Hapus bucket yang tidak dipakai lebih dari max_idle_seconds (dari ujung LRU)"""
+        cutoff = time.monotonic() - max_idle_seconds
+        removed = 0
+        with self._lock:
+            while self._buckets:
+                key, (_, updated_at) = next(iter(self._buckets.items()))
+                if updated_at >= cutoff:
+                    break
+                del self._buckets[key]
+                removed += 1
+            return removed
+
+
+class DatabaseRateLimitBackend:
+    """
+    Token bucket di tabel rate_limit_buckets (dibagi antar worker / node)
+    Memakai koneksi terpisah dari db.session agar tidak ikut commit/rollback request
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    @property
+    def table(self):
+        from app.models.rate_limit_model import RateLimitBucket
+        return RateLimitBucket.__table__
+
+    def consume(self, key, capacity, refill_rate):
+        """
+        Ambil 1 token dari bucket (row lock FOR UPDATE di Postgres)
+
+        Returns:
+            tuple: (allowed, retry_after_seconds)
+        """
+        table = self.table
+        now = time.time()
+
+        with self.db.engine.begin() as conn:
+            row = conn.execute(
+                select(table.c.tokens, table.c.updated_at)
+                .where(table.c.key == key)
+                .with_for_update()
+            ).first()
+
+            if row is None:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(insert(table).values(key=key, tokens=capacity - 1, updated_at=now))
+                    return True, 0
+                except IntegrityError:
+                    # Worker lain membuat bucket bersamaan, baca ulang dengan lock
+                    row = conn.execute(
+                        select(table.c.tokens, table.c.updated_at)
+                        .where(table.c.key == key)
+                        .with_for_update()
+                    ).first()
+
+            tokens = min(capacity, row.tokens + max(0, now - row.updated_at) * refill_rate)
+            if tokens >= 1:
+                allowed, retry_after = True, 0
+                tokens -= 1
+            else:
+                allowed, retry_after = False, (1 - tokens) / refill_rate
+
+            conn.execute(
+                update(table).where(table.c.key == key).values(tokens=tokens, updated_at=now)
+            )
+            return allowed, retry_after
+
+    def purge_idle(self, max_idle_seconds=3600):
+        """Hapus bucket yang tidak dipakai lebih dari max_idle_seconds"""
+        table = self.table
+        cutoff = time.time() - max_idle_seconds
+        with self.db.engine.begin() as conn:
+            result = conn.execute(delete(table).where(table.c.updated_at < cutoff))
+            return result.rowcount
+
+
+class RateLimiter:
+    """Rate limiter dengan backend memory / database dan counter metrics"""
+
+    def __init__(self):
+        self.backend = MemoryRateLimitBackend()
+        self.enabled = True
+        self._stats = {}  # {scope: {'allowed': n, 'rejected': n}}
+        self._stats_lock = Lock()
+
+    def init_app(self, app):
+        """Pilih backend dari config RATE_LIMIT_BACKEND ('memory' / 'database')"""
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        if app.config.get('RATE_LIMIT_BACKEND', 'memory') == 'database':
+            from extensions import db
+            self.backend = DatabaseRateLimitBackend(db)
+        else:
+            self.backend = MemoryRateLimitBackend(app.config.get('RATE_LIMIT_MAX_KEYS', 50000))
+
+    def hit(self, scope, identity, limit):
+        """
+        Catat 1 request untuk (scope, identity)
+
+        Returns:
+            tuple: (allowed, retry_after_seconds)
+        """
+        capacity, refill_rate = parse_limit(limit)
+        try:
+            allowed, retry_after = self.backend.consume(f"{scope}:{identity}", capacity, refill_rate)
+        except Exception as e:
+            # Fail open: gangguan backend tidak boleh mematikan endpoint
+            print(f"[RATE LIMIT] backend error ({scope}): {e}")
+            return True, 0
+
+        with self._stats_lock:
+            counter = self._stats.setdefault(scope, {'allowed': 0, 'rejected': 0})
+            counter['allowed' if allowed else 'rejected'] += 1
+
+        if not allowed:
+            print(f"[RATE LIMIT] rejected scope={scope} identity={identity} retry_after={retry_after:.1f}s")
+
+        return allowed, retry_after
+
+    def stats(self):
+        """Counter allowed/rejected per scope (per worker)"""
+        with self._stats_lock:
+            return {scope: dict(counter) for scope, counter in self._stats.items()}
+
+    def purge_idle(self, max_idle_seconds=3600):
+        return self.backend.purge_idle(max_idle_seconds)
+
+
+def client_ip():
+    """IP client, memakai X-Forwarded-For hanya jika RATE_LIMIT_TRUST_PROXY aktif"""
+    if current_app.config.get('RATE_LIMIT_TRUST_PROXY') and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+
+def request_email():
+    """Email dari body JSON (lowercase), None jika tidak ada"""
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+def rate_limit(scope, limit_config_key, key_func=client_ip):
+    """
+    Decorator token bucket untuk endpoint publik
+
+    Args:
+        scope: Nama limit (misal 'verify:ip'), dipakai juga untuk metrics
+        limit_config_key: Key config berisi 'capacity/period_seconds'
+        key_func: Fungsi yang mengembalikan identity (IP / email); None = skip
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not rate_limiter.enabled:
+                return f(*args, **kwargs)
+
+            identity = key_func()
+            if identity is None:
+                return f(*args, **kwargs)
+
+            allowed, retry_after = rate_limiter.hit(
+                scope, identity, current_app.config[limit_config_key]
+            )
+            if not allowed:
+                response, status_code = error_response(
+                    "Terlalu banyak permintaan. Silakan coba lagi nanti.",
+                    status_code=429
+                )
+                response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                return response, status_code
+
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
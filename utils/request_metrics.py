@@ -0,0 +1,135 @@
+# utils/request_metrics.py
+import sys
+import json
+import time
+import logging
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+perf_logger = logging.getLogger('app.perf')
+
+
+class RequestStats:
+    """Counter per request (disimpan di flask.g)"""
+
+    __slots__ = ('started', 'db_time', 'queries', 'rows')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+
+
+def current_request_stats():
+    """RequestStats request aktif, None di luar request (CLI, worker thread, scheduler)"""
+    if not has_request_context():
+        return None
+    return g.get('_request_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_query_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    stats = current_request_stats()
+    if stats is None:
+        return
+    stats.db_time += elapsed
+    stats.queries += 1
+    # rowcount SELECT: psycopg2 = jumlah baris hasil, sqlite3 = -1 (tidak dihitung)
+    if cursor.rowcount and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+class RequestMetrics:
+    """
+    Instrumentasi per request: wall time, DB time, jumlah query, rows dan
+    ukuran response. Dikirim sebagai header Server-Timing dan satu log JSON
+    per request (logger 'app.perf').
+    """
+
+    _listening = False
+
+    def init_app(self, app):
+        app.extensions['request_metrics'] = self
+        if not app.config.get('PERF_METRICS_ENABLED', True):
+            return
+
+        self._listen_engine_events()
+        self._configure_logger()
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @classmethod
+    def _listen_engine_events(cls):
+        # Sekali per proses, untuk semua engine (listener di class Engine)
+        if cls._listening:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        cls._listening = True
+
+    @staticmethod
+    def _configure_logger():
+        if perf_logger.handlers:
+            return
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        perf_logger.addHandler(handler)
+        perf_logger.setLevel(logging.INFO)
+        perf_logger.propagate = False
+
+    @staticmethod
+    def _start_request():
+        g._request_stats = RequestStats()
+
+    @staticmethod
+    def _finish_request(response):
+        from flask import current_app
+
+        stats = current_request_stats()
+        if stats is None:
+            return response
+
+        duration_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_time * 1000
+        # None untuk response stream (export, file besar)
+        response_bytes = None if response.is_streamed else response.calculate_content_length()
+
+        config = current_app.config
+        if config.get('PERF_SERVER_TIMING', True):
+            response.headers.add(
+                'Server-Timing',
+                f'app;dur={duration_ms:.1f}, '
+                f'db;dur={db_ms:.1f};desc="{stats.queries} queries, {stats.rows} rows"'
+            )
+
+        if config.get('PERF_LOG_ENABLED', True) and duration_ms >= config.get('PERF_LOG_MIN_DURATION_MS', 0):
+            current_user = g.get('current_user')
+            perf_logger.info(json.dumps({
+                'event': 'request',
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'duration_ms': round(duration_ms, 2),
+                'db_ms': round(db_ms, 2),
+                'queries': stats.queries,
+                'rows': stats.rows,
+                'response_bytes': response_bytes,
+                'user_id': current_user.id if current_user is not None else None,
+            }))
+
+        return response
+
+
+# Global request metrics instance
+request_metrics = RequestMetrics()
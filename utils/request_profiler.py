@@ -0,0 +1,293 @@
+# utils/request_profiler.py
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import threading
+from datetime import datetime
+from flask import g, request, current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILE_FORMATS = {
+    'speedscope': ('.speedscope.json', 'application/json'),
+    'collapsed': ('.collapsed.txt', 'text/plain'),
+}
+
+_TOKEN_SALT = 'request-profiler'
+_PROFILE_ID_PATTERN = re.compile(r'^[0-9]{8}T[0-9]{6}_[0-9a-f]{8}$')
+_NONCE_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+_USED_NONCE_FOLDER = '.used-tokens'
+
+
+class StackSampler(threading.Thread):
+    """
+    Sampling profiler sederhana: thread terpisah mengambil stack thread
+    target setiap `interval` detik lewat sys._current_frames()
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = []   # [tuple(frame key root -> leaf)]
+        self.started = None
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        self.started = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples.append(tuple(reversed(stack)))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.duration = time.perf_counter() - self.started if self.started else 0.0
+
+
+def to_speedscope(samples, interval, name):
+    """Format file speedscope (https://www.speedscope.app), profile 'sampled'"""
+    frames = []
+    index = {}
+    sample_indexes = []
+    for stack in samples:
+        row = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                func, filename, line = frame
+                frames.append({'name': func, 'file': filename, 'line': line})
+            row.append(index[frame])
+        sample_indexes.append(row)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': len(samples) * interval,
+            'samples': sample_indexes,
+            'weights': [interval] * len(samples),
+        }],
+        'name': name,
+        'activeProfileIndex': 0,
+        'exporter': 'fti-service request profiler',
+    }
+
+
+def to_collapsed(samples):
+    """Format collapsed stack ('a;b;c count'), input flamegraph.pl / inferno"""
+    counts = {}
+    for stack in samples:
+        key = ';'.join(f"{func} ({os.path.basename(filename)}:{line})" for func, filename, line in stack)
+        counts[key] = counts.get(key, 0) + 1
+    return '\n'.join(f"{key} {count}" for key, count in sorted(counts.items())) + '\n'
+
+
+class RequestProfiler:
+    """
+    Profiling on-demand satu request di production (admin only)
+
+    Admin membuat token bertanda tangan lewat POST /api/admin/profiles/token,
+    lalu mengirim request target dengan header X-Profile-Token: <token>. Token
+    hanya lewat header (tidak masuk access log / history browser) dan sekali pakai:
+    nonce-nya dicatat di PROFILER_FOLDER saat pertama dipakai, dibagi antar worker.
+    Request tersebut dijalankan di bawah sampling profiler dan hasilnya
+    (speedscope + collapsed stack) disimpan ke PROFILER_FOLDER. Tanpa token,
+    hanya ada satu lookup header per request.
+    """
+
+    def init_app(self, app):
+        app.extensions['request_profiler'] = self
+        if not app.config.get('PROFILER_ENABLED', True):
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    @staticmethod
+    def _serializer():
+        return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=_TOKEN_SALT)
+
+    def create_token(self, admin_id, path_prefix=None):
+        """
+        Returns:
+            token (berlaku PROFILER_TOKEN_TTL detik), opsional hanya untuk path tertentu
+        """
+        return self._serializer().dumps({
+            'admin': admin_id,
+            'path': path_prefix or '',
+            'nonce': uuid.uuid4().hex,
+        })
+
+    def _verify_token(self, token):
+        ttl = current_app.config.get('PROFILER_TOKEN_TTL', 600)
+        try:
+            payload = self._serializer().loads(token, max_age=ttl)
+        except (BadSignature, SignatureExpired):
+            return None
+        if payload.get('path') and not request.path.startswith(payload['path']):
+            return None
+        if not self._claim_nonce(payload.get('nonce'), ttl):
+            return None
+        return payload
+
+    def _claim_nonce(self, nonce, ttl):
+        """
+        Tandai nonce sudah dipakai (file O_EXCL, atomik antar worker)
+
+        Returns:
+            True jika ini pemakaian pertama
+        """
+        if not nonce or not _NONCE_PATTERN.match(nonce):
+            return False
+        folder = os.path.join(self._folder(), _USED_NONCE_FOLDER)
+        os.makedirs(folder, exist_ok=True)
+        self._prune_nonces(folder, ttl)
+        try:
+            os.close(os.open(os.path.join(folder, nonce), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        return True
+
+    @staticmethod
+    def _prune_nonces(folder, ttl):
+        """Nonce lebih tua dari TTL token tidak perlu disimpan (token-nya sudah expired)"""
+        cutoff = time.time() - ttl
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _start_request(self):
+        token = request.headers.get(PROFILE_HEADER)
+        if not token:
+            return
+
+        payload = self._verify_token(token)
+        if payload is None:
+            print(f"⚠️ [PROFILER] Invalid, expired or already used profile token for {request.path}")
+            return
+
+        sampler = StackSampler(
+            threading.get_ident(),
+            current_app.config.get('PROFILER_INTERVAL_MS', 5) / 1000
+        )
+        g._profiler = (sampler, payload)
+        sampler.start()
+
+    def _finish_request(self, response):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return response
+
+        sampler, payload = profiler
+        sampler.stop()
+        try:
+            profile_id = self._save(sampler, payload, response.status_code)
+            response.headers[PROFILE_ID_HEADER] = profile_id
+        except Exception as e:
+            print(f"❌ [PROFILER] Failed to save profile: {str(e)}")
+        return response
+
+    @staticmethod
+    def _teardown_request(exc=None):
+        # Request gagal sebelum after_request: pastikan thread sampler berhenti
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler[0].stop()
+
+    @staticmethod
+    def _folder():
+        folder = current_app.config['PROFILER_FOLDER']
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def _save(self, sampler, payload, status_code):
+        folder = self._folder()
+        now = datetime.utcnow()
+        profile_id = f"{now.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        name = f"{request.method} {request.path}"
+
+        meta = {
+            'id': profile_id,
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': status_code,
+            'duration_ms': round(sampler.duration * 1000, 2),
+            'samples': len(sampler.samples),
+            'interval_ms': sampler.interval * 1000,
+            'requested_by': payload.get('admin'),
+            'created_at': now.isoformat(),
+        }
+
+        base = os.path.join(folder, profile_id)
+        with open(base + PROFILE_FORMATS['speedscope'][0], 'w', encoding='utf-8') as f:
+            json.dump(to_speedscope(sampler.samples, sampler.interval, name), f)
+        with open(base + PROFILE_FORMATS['collapsed'][0], 'w', encoding='utf-8') as f:
+            f.write(to_collapsed(sampler.samples))
+        # Metadata ditulis terakhir: profile hanya muncul di list jika lengkap
+        with open(base + '.meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        self._prune(folder, current_app.config.get('PROFILER_MAX_PROFILES', 50))
+        return profile_id
+
+    @staticmethod
+    def _prune(folder, keep):
+        ids = sorted(name[:-len('.meta.json')] for name in os.listdir(folder) if name.endswith('.meta.json'))
+        for profile_id in ids[:-keep] if keep else []:
+            for suffix in ['.meta.json'] + [ext for ext, _ in PROFILE_FORMATS.values()]:
+                try:
+                    os.remove(os.path.join(folder, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list_profiles(self):
+        """Metadata profile tersimpan, terbaru dulu"""
+        folder = self._folder()
+        profiles = []
+        for name in sorted(os.listdir(folder), reverse=True):
+            if not name.endswith('.meta.json'):
+                continue
+            try:
+                with open(os.path.join(folder, name), encoding='utf-8') as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def profile_path(self, profile_id, fmt='speedscope'):
+        """
+        Returns:
+            (path, mimetype) atau None jika id / format tidak valid
+        """
+        if fmt not in PROFILE_FORMATS or not _PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        suffix, mimetype = PROFILE_FORMATS[fmt]
+        path = os.path.join(self._folder(), profile_id + suffix)
+        if not os.path.exists(path):
+            return None
+        return os.path.abspath(path), mimetype
+
+
+# Global request profiler instance
+request_profiler = RequestProfiler()
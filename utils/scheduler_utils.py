@@ -6,6 +6,7 @@ from extensions import db, mail
 from app.models.permohonan_model import Permohonan
 from app.models.dosen_model import Dosen
 from app.models.user_model import User
+from utils.metrics import track_email, track_job
 
 # Inisialisasi scheduler dengan timezone Jakarta
 scheduler = BackgroundScheduler(timezone=pytz.timezone("Asia/Jakarta"))
@@ -85,7 +86,8 @@ def send_weekly_pending_notifications():
                 body=plain_body,   # fallback
                 html=html_body     # versi berwarna
             )
-            mail.send(msg)
+            with track_email('pending_reminder'):
+                mail.send(msg)
         except Exception as e:
             print(f"[ERROR] gagal kirim email {dosen.email}: {e}")
 
@@ -96,7 +98,7 @@ def start_scheduler(app):
     """Inisialisasi APScheduler"""
     # Bungkus fungsi job agar memiliki app_context dari Flask
     def job_wrapper():
-        with app.app_context():
+        with app.app_context(), track_job('weekly_pending_notifications'):
             send_weekly_pending_notifications()
 
     # Jadwalkan job
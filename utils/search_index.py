@@ -0,0 +1,118 @@
+# utils/search_index.py
+import re
+from sqlalchemy import inspect, text
+
+# Dokumen yang di-index: nama -> (tabel, kolom teks)
+SEARCH_DOCUMENTS = {
+    'permohonan': ('permohonan', ('judul', 'deskripsi')),
+    'users': ('users', ('nama', 'nomor_induk', 'email')),
+    'jenis_permohonan': ('jenis_permohonan', ('nama_jenis_permohonan', 'deskripsi')),
+}
+
+# Postgres: tidak ada text search config bahasa Indonesia, 'simple' = lowercase tanpa stemming
+PG_TEXT_SEARCH_CONFIG = 'simple'
+
+_WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# {(engine url, tabel fts): bool}
+_fts_available = {}
+
+
+def search_words(term):
+    """Pecah input user jadi kata (tanda baca / operator dibuang)"""
+    return _WORD_PATTERN.findall((term or '').lower())[:8]
+
+
+def pg_tsvector_sql(document, qualified=True):
+    """
+    Ekspresi tsvector untuk dokumen; query harus memakai ekspresi yang sama
+    dengan index GIN agar index terpakai
+    """
+    table, columns = SEARCH_DOCUMENTS[document]
+    prefix = f"{table}." if qualified else ''
+    body = " || ' ' || ".join(f"coalesce({prefix}{name}, '')" for name in columns)
+    return f"to_tsvector('{PG_TEXT_SEARCH_CONFIG}', {body})"
+
+
+def pg_tsquery(words):
+    """Setiap kata prefix match, semua kata wajib ada: 'budi:* & 6720:*'"""
+    return ' & '.join(f"{word}:*" for word in words)
+
+
+def fts5_query(words):
+    """Query FTS5 yang sama: '"budi"* "6720"*'"""
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def fts5_table(document):
+    return f"{SEARCH_DOCUMENTS[document][0]}_fts"
+
+
+def has_fts5_table(bind, document):
+    """Cek (sekali per engine) apakah tabel FTS5 dokumen sudah dibuat"""
+    key = (str(bind.engine.url), fts5_table(document))
+    if key not in _fts_available:
+        _fts_available[key] = inspect(bind.engine).has_table(fts5_table(document))
+    return _fts_available[key]
+
+
+def _sqlite_fts_ddl(document):
+    table, columns = SEARCH_DOCUMENTS[document]
+    fts = fts5_table(document)
+    cols = ', '.join(columns)
+    new_cols = ', '.join(f"new.{name}" for name in columns)
+    old_cols = ', '.join(f"old.{name}" for name in columns)
+    # External content table: isi tetap di tabel asli, FTS hanya menyimpan index
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols}); END",
+    ]
+
+
+def _postgres_index_ddl(document):
+    table, _ = SEARCH_DOCUMENTS[document]
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} "
+        f"USING gin (({pg_tsvector_sql(document, qualified=False)}))"
+    ]
+
+
+def ensure_search_index(engine, rebuild=False):
+    """
+    Buat index full-text untuk semua dokumen (idempotent)
+    Postgres: index GIN ekspresi tsvector. SQLite: tabel FTS5 + trigger sinkronisasi.
+
+    Args:
+        rebuild: SQLite saja, isi ulang FTS dari tabel asli (misal setelah VACUUM
+            mengubah rowid, atau database dibuat dengan db.create_all())
+
+    Returns:
+        list nama dokumen yang di-index
+    """
+    dialect = engine.dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return []
+
+    with engine.begin() as conn:
+        for document in SEARCH_DOCUMENTS:
+            if dialect == 'postgresql':
+                for ddl in _postgres_index_ddl(document):
+                    conn.execute(text(ddl))
+                continue
+
+            fts = fts5_table(document)
+            existed = inspect(conn).has_table(fts)
+            for ddl in _sqlite_fts_ddl(document):
+                conn.execute(text(ddl))
+            if rebuild or not existed:
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+    _fts_available.clear()
+    return list(SEARCH_DOCUMENTS)
@@ -0,0 +1,82 @@
+from io import BytesIO
+from collections import OrderedDict
+from threading import Lock
+from utils.storage import storage
+
+
+class SignatureReaderCache:
+    """
+    LRU cache ImageReader reportlab per ttd_path
+
+    Gambar TTD di-decode sekali (termasuk data RGB + alpha mask yang dipakai
+    drawImage), lalu dipakai ulang untuk setiap dokumen yang ditandatangani.
+    ttd_path selalu unik per upload, jadi entry tidak pernah basi.
+    """
+
+    def __init__(self, max_size=64):
+        self._cache = OrderedDict()  # {ttd_path: ImageReader}
+        self._lock = Lock()
+        self.max_size = max_size
+
+    def configure(self, max_size=None):
+        """Atur ukuran cache dari config app"""
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _load(ttd_path):
+        from PIL import Image
+        from reportlab.lib.utils import ImageReader
+
+        img = Image.open(BytesIO(storage.read_bytes('uploads', ttd_path)))
+        img.load()
+
+        # Dari PIL Image (bukan file) agar reportlab tidak membaca ulang fp JPEG bersama
+        reader = ImageReader(img)
+        # Decode sekarang, setelah ini reader hanya dibaca (aman dipakai antar thread)
+        reader.getRGBData()
+        if reader._dataA is not None:
+            reader._dataA.getRGBData()
+        return reader
+
+    def get(self, ttd_path):
+        """
+        Get ImageReader untuk ttd_path (load dari storage jika belum ada)
+
+        Raises:
+            FileNotFoundError: file TTD tidak ada di storage
+        """
+        with self._lock:
+            reader = self._cache.get(ttd_path)
+            if reader is not None:
+                self._cache.move_to_end(ttd_path)
+                return reader
+
+        reader = self._load(ttd_path)
+
+        with self._lock:
+            self._cache[ttd_path] = reader
+            self._cache.move_to_end(ttd_path)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return reader
+
+    def invalidate(self, *ttd_paths):
+        """Hapus entry TTD lama (misal setelah dosen upload TTD baru)"""
+        with self._lock:
+            for ttd_path in ttd_paths:
+                self._cache.pop(ttd_path, None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+# Global signature cache instance
+signature_cache = SignatureReaderCache()
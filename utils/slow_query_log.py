@@ -0,0 +1,235 @@
+# utils/slow_query_log.py
+import os
+import sys
+import json
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+from flask import request, has_request_context
+from sqlalchemy import event
+from utils.query_budget import fingerprint
+
+slow_query_logger = logging.getLogger('app.slow_query')
+
+_MAX_PARAM_CHARS = 2000
+_EXPLAIN_SAVEPOINT = 'slow_query_explain'
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    return str(value)
+
+
+def _caller():
+    """
+    Method repository / service yang memicu query, misal
+    'PermohonanRepository.get_by_dosen_with_filter'
+    """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('app.'):
+            owner = frame.f_locals.get('self')
+            name = frame.f_code.co_name
+            label = f"{type(owner).__name__}.{name}" if owner is not None else f"{module}.{name}"
+            if module.startswith('app.repositories.'):
+                return label
+            fallback = fallback or label
+        frame = frame.f_back
+    return fallback
+
+
+def _explain(conn, statement, parameters):
+    """
+    EXPLAIN (ANALYZE, BUFFERS) di koneksi & transaksi yang sama, dibungkus
+    SAVEPOINT agar error EXPLAIN tidak membatalkan transaksi request.
+    Hanya SELECT: ANALYZE benar-benar mengeksekusi statement.
+    """
+    if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+            cursor.execute(f"RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+            return plan
+        except Exception as e:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+            return f"EXPLAIN failed: {e}"
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """
+    Rekam statement yang lebih lambat dari SLOW_QUERY_THRESHOLD_MS (opt-in)
+
+    Setiap record (JSON per baris) berisi durasi, SQL, bound parameters,
+    method pemanggil, endpoint dan plan EXPLAIN (ANALYZE, BUFFERS) di Postgres.
+    File dirotasi (SLOW_QUERY_LOG_MAX_BYTES x SLOW_QUERY_LOG_BACKUPS).
+    """
+
+    def __init__(self):
+        self.path = None
+        self.backups = 0
+        self.threshold = 0.0
+        self.explain = False
+        self.explain_interval = 0
+        self.explain_max_keys = 1000
+        self._explained = OrderedDict()   # {fingerprint: waktu EXPLAIN terakhir}, urut waktu
+        self._explained_lock = Lock()
+
+    def init_app(self, app):
+        app.extensions['slow_query_log'] = self
+        self.path = app.config['SLOW_QUERY_LOG_PATH']
+        self.backups = app.config.get('SLOW_QUERY_LOG_BACKUPS', 3)
+        if not app.config.get('SLOW_QUERY_LOG_ENABLED', False):
+            return
+
+        self.threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+        self.explain = app.config.get('SLOW_QUERY_EXPLAIN', True)
+        self.explain_interval = app.config.get('SLOW_QUERY_EXPLAIN_INTERVAL', 300)
+        self.explain_max_keys = app.config.get('SLOW_QUERY_EXPLAIN_MAX_KEYS', 1000)
+        self._configure_logger(app.config.get('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024))
+
+        with app.app_context():
+            from extensions import db
+            event.listen(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _configure_logger(self, max_bytes):
+        if slow_query_logger.handlers:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=self.backups)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.INFO)
+        slow_query_logger.propagate = False
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_slow_query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('_slow_query_started')
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        if elapsed < self.threshold:
+            return
+
+        key = fingerprint(statement)
+        plan = None
+        if self.explain and not executemany and conn.dialect.name == 'postgresql' and self._should_explain(key):
+            plan = _explain(conn, statement, parameters)
+
+        slow_query_logger.info(json.dumps({
+            'at': datetime.utcnow().isoformat(),
+            'duration_ms': round(elapsed * 1000, 2),
+            'fingerprint': key,
+            'statement': statement,
+            'parameters': json.dumps(parameters, default=_json_default)[:_MAX_PARAM_CHARS],
+            'caller': _caller(),
+            'endpoint': request.endpoint if has_request_context() else None,
+            'plan': plan,
+        }, default=_json_default))
+
+    def _should_explain(self, key):
+        # EXPLAIN ANALYZE menjalankan ulang query: batasi sekali per interval per fingerprint
+        now = time.monotonic()
+        with self._explained_lock:
+            last = self._explained.get(key)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            self._explained[key] = now
+            self._explained.move_to_end(key)
+            # Fingerprint yang intervalnya sudah lewat tidak perlu diingat lagi
+            while len(self._explained) > 1:
+                oldest = next(iter(self._explained.values()))
+                if now - oldest < self.explain_interval and len(self._explained) <= self.explain_max_keys:
+                    break
+                self._explained.popitem(last=False)
+        return True
+
+    def _iter_records(self):
+        """Baca file aktif + backup rotasi (record rusak dilewati)"""
+        paths = [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]
+        for path in paths:
+            if not path or not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def top_offenders(self, limit=20, sort='total'):
+        """
+        Agregasi per fingerprint SQL
+
+        Args:
+            sort: 'total' (total waktu), 'max', 'count' atau 'avg'
+
+        Returns:
+            list[dict]: count, total_ms, avg_ms, max_ms, last_seen, callers,
+            endpoints, contoh parameter & plan dari eksekusi terlama
+        """
+        groups = {}
+        for record in self._iter_records():
+            group = groups.get(record['fingerprint'])
+            if group is None:
+                group = groups[record['fingerprint']] = {
+                    'fingerprint': record['fingerprint'],
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'last_seen': None,
+                    'callers': set(),
+                    'endpoints': set(),
+                    'slowest': None,
+                }
+            group['count'] += 1
+            group['total_ms'] += record['duration_ms']
+            group['last_seen'] = max(group['last_seen'] or record['at'], record['at'])
+            if record.get('caller'):
+                group['callers'].add(record['caller'])
+            if record.get('endpoint'):
+                group['endpoints'].add(record['endpoint'])
+            if record['duration_ms'] >= group['max_ms']:
+                group['max_ms'] = record['duration_ms']
+                group['slowest'] = {
+                    'statement': record['statement'],
+                    'parameters': record.get('parameters'),
+                    'at': record['at'],
+                }
+            if record.get('plan'):
+                group['plan'] = record['plan']
+
+        offenders = []
+        for group in groups.values():
+            group['total_ms'] = round(group['total_ms'], 2)
+            group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+            group['callers'] = sorted(group['callers'])
+            group['endpoints'] = sorted(group['endpoints'])
+            group.setdefault('plan', None)
+            offenders.append(group)
+
+        sort_key = {'total': 'total_ms', 'max': 'max_ms', 'count': 'count', 'avg': 'avg_ms'}.get(sort, 'total_ms')
+        offenders.sort(key=lambda item: item[sort_key], reverse=True)
+        return offenders[:limit]
+
+
+# Global slow query log instance
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,289 @@
+# utils/storage.py
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from flask import current_app
+
+# Area penyimpanan -> config folder lokal (sama dengan base_folder di get_full_file_path)
+AREA_CONFIG_KEYS = {
+    'uploads': 'UPLOAD_FOLDER',
+    'signed': 'UPLOAD_SIGNED',
+    'qr_codes': 'QR_CODE_FOLDER',
+}
+
+
+def _check_area(area):
+    if area not in AREA_CONFIG_KEYS:
+        raise ValueError(f"Unknown storage area: {area}")
+
+
+def scratch_file(suffix=''):
+    """
+    Path file sementara di disk lokal (UPLOAD_STAGING_FOLDER) untuk hasil proses
+    (misal PDF signed) sebelum diserahkan ke storage.put_file()
+    """
+    scratch_dir = current_app.config['UPLOAD_STAGING_FOLDER']
+    os.makedirs(scratch_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=scratch_dir, prefix='work_', suffix=suffix)
+    os.close(fd)
+    return path
+
+
+class BaseStorage(ABC):
+    """
+    Interface driver storage
+
+    Semua path adalah path relatif di dalam sebuah area ('uploads', 'signed',
+    'qr_codes'), sama seperti yang disimpan di database.
+    """
+
+    name = None
+
+    @abstractmethod
+    def exists(self, area, path):
+        ...
+
+    @abstractmethod
+    def size(self, area, path):
+        ...
+
+    @abstractmethod
+    def put_file(self, area, path, source_path):
+        """Simpan file lokal ke storage; file sumber dipindahkan (tidak ada lagi setelahnya)"""
+
+    @abstractmethod
+    def put_bytes(self, area, path, data, content_type=None):
+        ...
+
+    @abstractmethod
+    def read_bytes(self, area, path):
+        ...
+
+    @abstractmethod
+    def delete(self, area, path):
+        """Returns: True jika file dihapus, False jika tidak ada"""
+
+    @abstractmethod
+    def local_path(self, area, path):
+        """Context manager: path lokal yang bisa dibaca library lain (PyPDF2, reportlab, PIL)"""
+
+    def local_root(self, area):
+        """Folder lokal area ini, None jika storage bukan filesystem lokal"""
+        return None
+
+    def presigned_url(self, area, path, expires_in=None):
+        """URL download langsung (tanpa lewat app server), None jika tidak didukung"""
+        return None
+
+
+class LocalStorage(BaseStorage):
+    """Driver filesystem lokal (folder dari config UPLOAD_FOLDER / UPLOAD_SIGNED / QR_CODE_FOLDER)"""
+
+    name = 'local'
+
+    def local_root(self, area):
+        _check_area(area)
+        return current_app.config[AREA_CONFIG_KEYS[area]]
+
+    def full_path(self, area, path):
+        return os.path.join(self.local_root(area), path)
+
+    def exists(self, area, path):
+        return os.path.isfile(self.full_path(area, path))
+
+    def size(self, area, path):
+        return os.path.getsize(self.full_path(area, path))
+
+    def put_file(self, area, path, source_path):
+        target = self.full_path(area, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.replace(source_path, target)         # atomik jika 1 filesystem
+        except OSError:
+            shutil.move(source_path, target)        # beda filesystem (copy + remove)
+
+    def put_bytes(self, area, path, data, content_type=None):
+        target = self.full_path(area, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Tulis ke file sementara lalu rename, agar pembaca tidak melihat file setengah jadi
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read_bytes(self, area, path):
+        with open(self.full_path(area, path), 'rb') as f:
+            return f.read()
+
+    def delete(self, area, path):
+        try:
+            os.remove(self.full_path(area, path))
+            return True
+        except FileNotFoundError:
+            return False
+
+    @contextmanager
+    def local_path(self, area, path):
+        yield self.full_path(area, path)
+
+
+class S3Storage(BaseStorage):
+    """
+    Driver S3-compatible (AWS S3, MinIO, dsb) via boto3
+
+    Object key: <S3_KEY_PREFIX><area>/<path>. Set S3_ENDPOINT_URL untuk MinIO
+    atau stand-in lokal (moto server).
+    """
+
+    name = 's3'
+
+    def __init__(self, app):
+        try:
+            import boto3
+            from botocore.config import Config as BotoConfig
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)") from e
+
+        self.bucket = app.config['S3_BUCKET']
+        if not self.bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+
+        self.key_prefix = app.config.get('S3_KEY_PREFIX', '')
+        self.presign_expires = app.config.get('S3_PRESIGN_EXPIRES', 300)
+        self.client = boto3.client(
+            's3',
+            endpoint_url=app.config.get('S3_ENDPOINT_URL') or None,
+            region_name=app.config.get('S3_REGION') or None,
+            aws_access_key_id=app.config.get('S3_ACCESS_KEY_ID') or None,
+            aws_secret_access_key=app.config.get('S3_SECRET_ACCESS_KEY') or None,
+            config=BotoConfig(
+                signature_version='s3v4',
+                s3={'addressing_style': app.config.get('S3_ADDRESSING_STYLE', 'auto')},
+                max_pool_connections=app.config.get('S3_MAX_POOL_CONNECTIONS', 10)
+            )
+        )
+
+    def key(self, area, path):
+        _check_area(area)
+        return f"{self.key_prefix}{area}/{path.replace(os.sep, '/')}"
+
+    @staticmethod
+    def _is_not_found(error):
+        code = error.response.get('Error', {}).get('Code')
+        return code in ('404', 'NoSuchKey', 'NotFound')
+
+    def _head(self, area, path):
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.key(area, path))
+        except ClientError as e:
+            if self._is_not_found(e):
+                return None
+            raise
+
+    def exists(self, area, path):
+        return self._head(area, path) is not None
+
+    def size(self, area, path):
+        head = self._head(area, path)
+        if head is None:
+            raise FileNotFoundError(path)
+        return head['ContentLength']
+
+    def put_file(self, area, path, source_path):
+        import mimetypes
+        extra_args = {}
+        content_type = mimetypes.guess_type(path)[0]
+        if content_type:
+            extra_args['ContentType'] = content_type
+        self.client.upload_file(source_path, self.bucket, self.key(area, path), ExtraArgs=extra_args)
+        os.remove(source_path)
+
+    def put_bytes(self, area, path, data, content_type=None):
+        import mimetypes
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.key(area, path),
+            Body=data,
+            ContentType=content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+
+    def read_bytes(self, area, path):
+        from botocore.exceptions import ClientError
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key(area, path))
+        except ClientError as e:
+            if self._is_not_found(e):
+                raise FileNotFoundError(path) from e
+            raise
+        return obj['Body'].read()
+
+    def delete(self, area, path):
+        if not self.exists(area, path):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(area, path))
+        return True
+
+    @contextmanager
+    def local_path(self, area, path):
+        # Download ke scratch file, dihapus setelah selesai dipakai
+        from botocore.exceptions import ClientError
+        tmp_path = scratch_file(os.path.splitext(path)[1])
+        try:
+            try:
+                self.client.download_file(self.bucket, self.key(area, path), tmp_path)
+            except ClientError as e:
+                if self._is_not_found(e):
+                    raise FileNotFoundError(path) from e
+                raise
+            yield tmp_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def presigned_url(self, area, path, expires_in=None):
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': self.key(area, path)},
+            ExpiresIn=expires_in or self.presign_expires
+        )
+
+
+STORAGE_DRIVERS = {
+    'local': lambda app: LocalStorage(),
+    's3': S3Storage,
+}
+
+
+class StorageProxy:
+    """
+    Titik akses global ke driver storage aktif (config STORAGE_BACKEND)
+    Default LocalStorage agar bisa dipakai sebelum init_app (script / shell)
+    """
+
+    def __init__(self):
+        self._driver = LocalStorage()
+
+    def init_app(self, app):
+        backend = app.config.get('STORAGE_BACKEND', 'local')
+        if backend not in STORAGE_DRIVERS:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND: {backend}")
+        self._driver = STORAGE_DRIVERS[backend](app)
+        app.extensions['storage'] = self._driver
+
+    @property
+    def driver(self):
+        return self._driver
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+storage = StorageProxy()
@@ -0,0 +1,146 @@
+# utils/upload_stream.py
+import os
+import hashlib
+import tempfile
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+CHUNK_SIZE = 64 * 1024
+
+# Magic bytes -> jenis file
+MAGIC_SIGNATURES = [
+    (b'%PDF-', 'pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'doc'),   # OLE2 (doc lama)
+    (b'PK\x03\x04', 'docx'),                         # ZIP (docx)
+]
+MAGIC_PREFIX_LENGTH = max(len(signature) for signature, _ in MAGIC_SIGNATURES)
+
+# Ekstensi -> jenis hasil sniffing yang diterima
+EXTENSION_KINDS = {
+    'pdf': 'pdf',
+    'png': 'png',
+    'jpg': 'jpeg',
+    'jpeg': 'jpeg',
+    'gif': 'gif',
+    'doc': 'doc',
+    'docx': 'docx',
+}
+
+
+def sniff_kind(prefix):
+    """Tentukan jenis file dari magic bytes, None jika tidak dikenal"""
+    for signature, kind in MAGIC_SIGNATURES:
+        if prefix.startswith(signature):
+            return kind
+    return None
+
+
+class HashingUploadFile:
+    """
+    File upload yang langsung ditulis ke staging folder per chunk
+    sambil menghitung SHA-256, menangkap magic bytes dan membatasi ukuran
+
+    Dipakai sebagai stream FileStorage, sehingga read()/seek() tetap bisa dipakai
+    (PIL, PyPDF2, dsb). File staging dihapus saat close() jika belum dipindahkan.
+    """
+
+    def __init__(self, staging_dir, max_size=None):
+        os.makedirs(staging_dir, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=staging_dir, prefix='upload_', delete=False)
+        self.path = self._file.name
+        self.max_size = max_size
+        self.size = 0
+        self.prefix = b''
+        self._sha256 = hashlib.sha256()
+        self._moved = False
+
+    # ----- writer (dipanggil oleh form parser Werkzeug) -----
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            # Parser berhenti di sini dan tidak akan menutup file ini, hapus sekarang
+            self.close()
+            raise RequestEntityTooLarge(f"File melebihi batas {self.max_size} bytes")
+        if len(self.prefix) < MAGIC_PREFIX_LENGTH:
+            self.prefix += data[:MAGIC_PREFIX_LENGTH - len(self.prefix)]
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+    @property
+    def kind(self):
+        return sniff_kind(self.prefix)
+
+    # ----- reader -----
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def readline(self, *args):
+        return self._file.readline(*args)
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def flush(self):
+        return self._file.flush()
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def finish(self):
+        """Flush + tutup handle tulis, kembalikan path file staging (untuk storage.put_file)"""
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        return self.path
+
+    def move_to(self, target_path):
+        """Pindahkan file staging ke target secara atomik (os.replace)"""
+        self.finish()
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        os.replace(self.path, target_path)
+        self._moved = True
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self._moved:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class IngestRequest(Request):
+    """
+    Request class yang menulis file upload langsung ke UPLOAD_STAGING_FOLDER
+    dengan hashing dan batas ukuran per file (UPLOAD_MAX_FILE_SIZE)
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        max_size = config.get('UPLOAD_MAX_FILE_SIZE') or config.get('MAX_CONTENT_LENGTH')
+        if max_size is not None and content_length is not None and content_length > max_size:
+            raise RequestEntityTooLarge(f"File melebihi batas {max_size} bytes")
+        return HashingUploadFile(config['UPLOAD_STAGING_FOLDER'], max_size)
@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class VerifyCache:
+    """
+    In-memory LRU cache untuk read model verifikasi dokumen (QR scan)
+    Thread-safe, dengan TTL sebagai batas basi antar worker
+    """
+
+    def __init__(self, max_size=2048, ttl_seconds=300):
+        self._cache = OrderedDict()  # {permohonan_id: (expires_at, data)}
+        self._lock = Lock()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+    def configure(self, max_size=None, ttl_seconds=None):
+        """Atur ukuran dan TTL cache dari config app"""
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl_seconds is not None:
+                self.ttl_seconds = ttl_seconds
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def get(self, permohonan_id):
+        """
+        Get cached read model
+
+        Returns:
+            dict or None: data jika ada dan belum kadaluarsa
+        """
+        with self._lock:
+            cached = self._cache.get(permohonan_id)
+            if not cached:
+                return None
+
+            expires_at, data = cached
+            if time.monotonic() > expires_at:
+                del self._cache[permohonan_id]
+                return None
+
+            self._cache.move_to_end(permohonan_id)
+            return data
+
+    def set(self, permohonan_id, data):
+        """Simpan read model untuk permohonan_id"""
+        with self._lock:
+            self._cache[permohonan_id] = (time.monotonic() + self.ttl_seconds, data)
+            self._cache.move_to_end(permohonan_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, *permohonan_ids):
+        """Hapus cache untuk permohonan yang statusnya berubah"""
+        with self._lock:
+            for permohonan_id in permohonan_ids:
+                self._cache.pop(permohonan_id, None)
+
+    def clear(self):
+        """Kosongkan seluruh cache"""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+
+# Global verify cache instance
+verify_cache = VerifyCache()